@@ -3,15 +3,9 @@ import contextlib
 import logging
 import sys
 
-import pytest
 from rich import print as rprint
-from rich.syntax import Syntax
 import rich_click as click
-import yaml
 
-from rizza import genetic_tester
-from rizza.entity_tester import EntityTester
-from rizza.helpers import prune as prune_helper
 from rizza.helpers.config import Config
 
 logger = logging.getLogger(__name__)
@@ -58,13 +52,55 @@ def cli(ctx):
     show_default=True,
     help="The maximum number of tests to run asynchronously. (default is 100)",
 )
+@click.option(
+    "--executor",
+    type=click.Choice(["thread", "process"]),
+    default="thread",
+    show_default=True,
+    help="Evaluate async tests in threads or in worker processes. 'process' implies --run-async.",
+)
+@click.option(
+    "--steady-state",
+    "steady_state",
+    is_flag=True,
+    help="Replace organisms as soon as their tests finish, instead of a generation at a time. "
+    "Implies --run-async.",
+)
+@click.option(
+    "--islands",
+    type=int,
+    default=None,
+    help="Split the population between this many islands that evolve in parallel and "
+    "trade their best organisms.",
+)
+@click.option(
+    "--campaign",
+    is_flag=True,
+    help="Test every method of the entity (create first, delete last), ignoring --method.",
+)
 @click.option("--fresh", is_flag=True, help="Don't attempt to load in saved results.")
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Continue from the run's last checkpoint instead of starting over.",
+)
 @click.option(
     "--prune",
     is_flag=True,
     help="Remove positive tests that don't pass. Can specify 'All' for entity",
 )
 @click.option("--cleanup", is_flag=True, help="Clean up created entities after test run.")
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Profile each generation and write the results under logs/profile/.",
+)
+@click.option(
+    "--no-result-cache",
+    "no_result_cache",
+    is_flag=True,
+    help="Don't reuse or store raw API results in the persistent result cache.",
+)
 @click.option("--debug", is_flag=True, help="Enable debug logging level.")
 @click.pass_context
 def genetic(
@@ -75,13 +111,29 @@ def genetic(
     disable_dependencies,
     run_async,
     async_limit,
+    executor,
+    steady_state,
+    islands,
+    campaign,
     fresh,
+    resume,
     prune,
     cleanup,
+    profile,
+    no_result_cache,
     debug,
 ):
     """Use genetic algorithms to learn how to use an entity's method."""
+    from rizza import genetic_tester
+    from rizza.helpers import metrics
+
     conf = ctx.obj
+    if executor == "process" or steady_state:
+        run_async = True
+    if islands and islands > 1 and run_async:
+        raise click.UsageError(
+            "--islands can't be combined with --run-async, --steady-state or --executor process."
+        )
     args_dict = {
         "entity": entity,
         "method": method,
@@ -89,14 +141,26 @@ def genetic(
         "disable_dependencies": disable_dependencies,
         "run_async": run_async,
         "async_limit": async_limit,
+        "executor": executor,
+        "steady_state": steady_state,
+        "islands": islands,
+        "campaign": campaign,
         "fresh": fresh,
+        "resume": resume,
         "prune": prune,
         "cleanup": cleanup,
+        "profile": profile,
+        "no_result_cache": no_result_cache,
         "debug": debug,
     }
     conf.load_cli_args(type("Args", (), args_dict), command=True)
+    metrics.report_on_signal(conf)
+    if profile:
+        _start_profile(ctx, conf, "prune" if prune else f"{entity} {method}")
 
     if prune:
+        from rizza.helpers import prune as prune_helper
+
         conf.init_logger(
             path=conf.base_dir.joinpath("logs/prune.log"),
             level="debug" if debug else None,
@@ -105,6 +169,29 @@ def genetic(
             prune_helper.async_genetic_prune(conf, entity, async_limit)
         else:
             prune_helper.genetic_prune(conf, entity)
+    elif campaign:
+        if entity == "All":
+            raise click.UsageError("--campaign needs a single entity, not All.")
+        conf.init_connection()
+        genetic_tester.run_campaign(
+            debug=debug,
+            async_mode=run_async,
+            config=conf,
+            entity=entity,
+            disable_dependencies=disable_dependencies,
+            seek_bad=seek_bad,
+            fresh=fresh,
+            resume=resume,
+            islands=islands,
+            disable_result_cache=no_result_cache,
+            max_running=async_limit,
+            executor=executor,
+            steady_state=steady_state,
+        )
+        if cleanup:
+            from rizza import apix_loader
+
+            apix_loader.get_satellite_class()().clean_session()
     elif entity == "All":
         conf.init_connection()
         genetic_tester.run_all_entities(
@@ -116,7 +203,12 @@ def genetic(
             disable_dependencies=disable_dependencies,
             seek_bad=seek_bad,
             fresh=fresh,
+            resume=resume,
+            islands=islands,
+            disable_result_cache=no_result_cache,
             max_running=async_limit,
+            executor=executor,
+            steady_state=steady_state,
         )
     elif run_async:
         conf.init_connection()
@@ -127,7 +219,11 @@ def genetic(
             disable_dependencies=disable_dependencies,
             seek_bad=seek_bad,
             fresh=fresh,
+            resume=resume,
+            disable_result_cache=no_result_cache,
             max_running=async_limit,
+            executor=executor,
+            steady_state=steady_state,
         )
         conf.init_logger(
             path=conf.base_dir.joinpath(f"logs/genetic/{gtester.test_name}.log"),
@@ -147,6 +243,9 @@ def genetic(
             disable_dependencies=disable_dependencies,
             seek_bad=seek_bad,
             fresh=fresh,
+            resume=resume,
+            islands=islands,
+            disable_result_cache=no_result_cache,
         )
         conf.init_logger(
             path=conf.base_dir.joinpath(f"logs/genetic/{gtester.test_name}.log"),
@@ -171,6 +270,9 @@ def config(ctx):
 @click.pass_context
 def view(ctx, chunk):
     """View the full config or a specific chunk (e.g. genetics.criteria.pass)."""
+    from rich.syntax import Syntax
+    import yaml
+
     conf = ctx.obj
     try:
         value = conf.get_chunk(chunk)
@@ -190,6 +292,8 @@ def view(ctx, chunk):
 @click.pass_context
 def config_set(ctx, chunk, value):
     """Set a config value by chunk path (e.g. connection.hostname myhost.example.com)."""
+    import yaml
+
     conf = ctx.obj
     try:
         conf.set_chunk(chunk, value)
@@ -213,6 +317,212 @@ def config_init(ctx, force):
         click.echo(f"Skipped (already exist): {skipped} (use --force to overwrite)")
 
 
+@cli.group()
+@click.pass_context
+def store(ctx):
+    """Manage saved genetic tests."""
+    pass
+
+
+@store.command(name="import")
+@click.option(
+    "-p",
+    "--path",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="YAML test directory to import (default: ~/rizza/data/genetic_tests).",
+)
+@click.pass_context
+def store_import(ctx, path):
+    """Import saved tests from a directory of per-entity YAML files."""
+    from rizza.helpers.storage import get_test_store
+
+    conf = ctx.obj
+    path = path or conf.base_dir.joinpath("data/genetic_tests")
+    count = get_test_store(conf).import_yaml(path)
+    click.echo(f"Imported {count} tests from {path}")
+
+
+@store.command(name="export")
+@click.option(
+    "-p",
+    "--path",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Directory to write per-entity YAML files to (default: ~/rizza/data/genetic_tests).",
+)
+@click.pass_context
+def store_export(ctx, path):
+    """Export saved tests to a directory of per-entity YAML files."""
+    from rizza.helpers.storage import get_test_store
+
+    conf = ctx.obj
+    path = path or conf.base_dir.joinpath("data/genetic_tests")
+    count = get_test_store(conf).export_yaml(path)
+    click.echo(f"Exported {count} tests to {path}")
+
+
+@cli.command()
+@click.option(
+    "--host", type=str, default="127.0.0.1", show_default=True, help="Interface to bind."
+)
+@click.option("--port", type=int, default=8080, show_default=True, help="Port to listen on.")
+@click.option(
+    "--spec",
+    type=click.Path(dir_okay=False, exists=True),
+    default=None,
+    help="YAML file of entities with their required, unique and choices fields.",
+)
+@click.option("--strict", is_flag=True, help="Answer 404 for entities missing from the spec.")
+@click.option("--latency", type=float, default=0.0, help="Seconds to delay every response.")
+@click.option("--jitter", type=float, default=0.0, help="Up to this many extra seconds of delay.")
+@click.option(
+    "--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 500."
+)
+@click.option("--seed", type=int, default=None, help="Seed for jitter and injected errors.")
+@click.option("--auth", type=str, default=None, help="Required 'user:password' (default: any).")
+@click.option("--debug", is_flag=True, help="Enable debug logging level.")
+@click.pass_context
+def standin(ctx, *, host, port, spec, strict, latency, jitter, error_rate, seed, auth, debug):
+    """Serve a local stand-in for the Satellite API, for offline testing."""
+    from rizza.helpers import standin as standin_helper
+
+    conf = ctx.obj
+    conf.init_logger(
+        path=conf.base_dir.joinpath("logs/standin.log"), level="debug" if debug else None
+    )
+    api = standin_helper.StandInAPI(
+        strict=strict, latency=latency, jitter=jitter, error_rate=error_rate, seed=seed
+    )
+    if spec:
+        api.entities = standin_helper.load_entities(spec)
+    server = standin_helper.StandInServer(api=api, host=host, port=port, auth=auth)
+    click.echo(f"Serving a Satellite stand-in at {server.url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    click.echo(f"Responses by status: {dict(sorted(api.statuses.items()))}")
+
+
+@cli.group()
+@click.pass_context
+def distributed(ctx):
+    """Run genetic tests across machines: one coordinator, many workers."""
+
+
+@distributed.command()
+@click.option(
+    "-e",
+    "--entity",
+    "entities",
+    type=str,
+    multiple=True,
+    help="Entity to queue (repeatable). Defaults to every entity.",
+)
+@click.option("-m", "--method", type=str, default="create", show_default=True)
+@click.option(
+    "--mode",
+    type=click.Choice(["positive", "negative", "both"]),
+    default="positive",
+    show_default=True,
+    help="Which kind of test to learn for each entity.",
+)
+@click.option(
+    "--host",
+    type=str,
+    default="127.0.0.1",
+    show_default=True,
+    help="Interface to bind. Binding one other machines can reach requires --token.",
+)
+@click.option("--port", type=int, default=8765, show_default=True, help="Port to listen on.")
+@click.option(
+    "--lease",
+    type=int,
+    default=900,
+    show_default=True,
+    help="Seconds a silent worker keeps a job before it's requeued.",
+)
+@click.option("--max-attempts", type=int, default=3, show_default=True)
+@click.option("--token", type=str, default=None, help="Shared secret workers must send.")
+@click.option("--debug", is_flag=True, help="Enable debug logging level.")
+@click.pass_context
+def coordinate(ctx, *, entities, method, mode, host, port, lease, max_attempts, token, debug):
+    """Queue genetic test jobs and hand them out to workers."""
+    from rizza import distributed as distributed_helper
+
+    conf = ctx.obj
+    conf.init_logger(
+        path=conf.base_dir.joinpath("logs/coordinator.log"), level="debug" if debug else None
+    )
+    modes = ("positive", "negative") if mode == "both" else (mode,)
+    jobs = distributed_helper.plan_jobs(method, modes, list(entities) or None)
+    try:
+        coordinator = distributed_helper.Coordinator(
+            jobs=jobs,
+            config=conf,
+            host=host,
+            port=port,
+            lease=lease,
+            max_attempts=max_attempts,
+            token=token,
+        )
+    except ValueError as err:
+        raise click.UsageError(str(err)) from err
+    click.echo(f"Coordinating {len(jobs)} jobs on {host}:{coordinator.port} (Ctrl+C to stop)")
+    with coordinator, contextlib.suppress(KeyboardInterrupt):
+        coordinator.wait()
+    click.echo(f"{len(coordinator.completed)} jobs finished, {len(coordinator.failed)} failed.")
+
+
+@distributed.command()
+@click.option("--host", type=str, default="127.0.0.1", show_default=True, help="Coordinator.")
+@click.option("--port", type=int, default=8765, show_default=True, help="Coordinator port.")
+@click.option("--token", type=str, default=None, help="Shared secret the coordinator expects.")
+@click.option("--mock", is_flag=True, help="Run mock tests instead of calling the API.")
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Profile each generation and write the results under logs/profile/.",
+)
+@click.option("--debug", is_flag=True, help="Enable debug logging level.")
+@click.pass_context
+def work(ctx, *, host, port, token, mock, profile, debug):
+    """Run genetic test jobs from a coordinator until there are none left."""
+    from rizza import distributed as distributed_helper
+
+    conf = ctx.obj
+    conf.init_logger(
+        path=conf.base_dir.joinpath("logs/worker.log"), level="debug" if debug else None
+    )
+    if not mock:
+        conf.init_connection()
+    if profile:
+        _start_profile(ctx, conf, "worker")
+    worker = distributed_helper.Worker(
+        address=(host, port),
+        runner=lambda job: distributed_helper.run_job(conf, job, mock),
+        token=token,
+    )
+    click.echo(f"Worker {worker.name} ran {worker.run()} jobs.")
+
+
+def _start_profile(ctx, conf, name):
+    """Profile the command, printing a hot-function summary when it finishes."""
+    from rizza.helpers import profiling
+
+    profiling.start(conf, name)
+
+    def finish():
+        profiler = profiling.finish(conf)
+        click.echo(profiler.summary())
+        rprint(f"[bold]Profile written to[/bold] {profiler.directory}")
+
+    ctx.call_on_close(finish)
+
+
 @cli.command(name="list")  # Renamed to avoid conflict with Python's list
 @click.argument(
     "subject", type=click.Choice(["entities", "methods", "fields", "args", "input-methods"])
@@ -230,28 +540,34 @@ def list_cmd(ctx, subject, entity, method):
         "method": method,
     }
     conf.load_cli_args(type("Args", (), args_dict))
-    from rizza import apix_loader
+    from rizza import apix_index, apix_loader
 
     lib_path = getattr(conf.rizza, "apix_lib_path", None)
     if lib_path:
-        with contextlib.suppress(FileNotFoundError):
-            apix_loader.get_apix_module(path=lib_path)
-    _list_subject(subject, entity, method)
+        apix_loader.use_path(lib_path)
+    if subject == "input-methods":
+        _list_input_methods()
+        return
+    # Reads the apix file without importing it
+    try:
+        index = apix_index.get_index()
+    except Exception as err:
+        logger.warning(f"Could not load apix module: {err}")
+        index = apix_index.ApixIndex(module=None)
+    _list_subject(index, subject, entity, method)
 
 
-def _list_subject(subject, entity_name, method_name):
+def _list_subject(index, subject, entity_name, method_name):
     """Helper function to handle listing logic for different subjects."""
     if subject == "entities":
-        _list_entities()
-    elif subject == "input-methods":
-        _list_input_methods()
+        _list_entities(index)
     else:
-        _list_entity_details(subject, entity_name, method_name)
+        _list_entity_details(index, subject, entity_name, method_name)
 
 
-def _list_entities():
+def _list_entities(index):
     """List all available entities."""
-    entities_list = list(EntityTester.pull_entities().keys())
+    entities_list = index.entity_names()
     if entities_list:
         for item in entities_list:
             rprint(item)
@@ -261,6 +577,8 @@ def _list_entities():
 
 def _list_input_methods():
     """List all available input methods."""
+    from rizza.entity_tester import EntityTester
+
     input_methods_list = list(EntityTester.pull_input_methods().keys())
     if input_methods_list:
         for item in input_methods_list:
@@ -269,28 +587,26 @@ def _list_input_methods():
         click.echo("No input methods found.")
 
 
-def _list_entity_details(subject, entity_name, method_name):
+def _list_entity_details(index, subject, entity_name, method_name):
     """List details (methods, fields, args) for a specific entity."""
-    pulled_entities = EntityTester.pull_entities()
-    if entity_name not in pulled_entities:
+    if entity_name not in index.data:
         click.echo(f"Entity '{entity_name}' not found.", err=True)
         return
 
-    entity_data = pulled_entities[entity_name]
     if subject == "methods":
-        _list_entity_methods(entity_data, entity_name)
+        _list_entity_methods(index, entity_name)
     elif subject == "fields":
-        _list_entity_fields(entity_data, entity_name)
+        _list_entity_fields(index, entity_name)
     elif subject == "args":
-        _list_method_args(entity_data, entity_name, method_name)
+        _list_method_args(index, entity_name, method_name)
     else:
         # Should not happen due to click.Choice
         click.echo(f"Unknown subject '{subject}' for entity listing.", err=True)
 
 
-def _list_entity_methods(entity_data, entity_name):
+def _list_entity_methods(index, entity_name):
     """List methods for a given entity."""
-    methods_list = list(EntityTester.pull_methods(entity_data).keys())
+    methods_list = index.method_names(entity_name)
     if methods_list:
         for item in methods_list:
             rprint(item)
@@ -298,9 +614,9 @@ def _list_entity_methods(entity_data, entity_name):
         click.echo(f"No methods found for entity '{entity_name}'.")
 
 
-def _list_entity_fields(entity_data, entity_name):
+def _list_entity_fields(index, entity_name):
     """List fields for a given entity."""
-    fields_list = list(EntityTester.pull_fields(entity_data).keys())
+    fields_list = list(index.fields(entity_name))
     if fields_list:
         for item in fields_list:
             rprint(item)
@@ -308,11 +624,10 @@ def _list_entity_fields(entity_data, entity_name):
         click.echo(f"No fields found for entity '{entity_name}'.")
 
 
-def _list_method_args(entity_data, entity_name, method_name):
+def _list_method_args(index, entity_name, method_name):
     """List arguments for a specific method of an entity."""
-    method_data = EntityTester.pull_methods(entity_data).get(method_name, None)
-    if method_data:
-        args_list = EntityTester.pull_args(method_data)
+    if method_name in index.method_names(entity_name):
+        args_list = index.args(entity_name, method_name)
         if args_list:
             for item in args_list:
                 rprint(item)
@@ -332,6 +647,8 @@ def _list_method_args(entity_data, entity_name, method_name):
 )
 def test(pytest_args):
     """Run pytest tests."""
+    import pytest
+
     pyargs = list(pytest_args) if pytest_args else ["-q"]
     errno = pytest.cmdline.main(args=pyargs)
     sys.exit(errno)
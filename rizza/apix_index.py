@@ -0,0 +1,451 @@
+"""A persistent introspection index over the apix module.
+
+Building the index walks every entity class once, recording its API methods, their
+parameter names and parsed annotations, and its __init__ parameters. When the apix
+file is on disk, it's read with ast rather than imported, so listing entities or
+building type pools doesn't execute the module or need its dependencies; the module
+itself is only imported once an entity class is needed to make a call. The result is
+keyed by a content hash of the apix file and saved under ~/rizza/data/apix_index/,
+so later processes can load it instead of reading the module again.
+"""
+
+import ast
+import hashlib
+import inspect
+import json
+import logging
+from pathlib import Path
+from types import MappingProxyType
+import typing
+
+import attr
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 3
+INDEX_DIR = Path.home().joinpath("rizza/data/apix_index")
+
+_index = None
+
+_BUILTIN_TYPES = {
+    cls.__name__: cls for cls in (str, int, float, bool, bytes, dict, list, tuple, set)
+} | {"None": None}
+
+
+def file_hash(path):
+    """Return the sha256 hex digest of a file's contents."""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def entity_method_names(entity, satellite):
+    """Return the API method names for an entity class.
+
+    :param entity: Entity class.
+    :param satellite: The apix Satellite base class.
+    """
+    api_methods = getattr(entity, "_api_methods", None)
+    if api_methods:
+        return [name for name in api_methods if hasattr(entity, name)]
+    # Fall back: subtract Satellite base methods from entity's methods
+    base_methods = set(dir(satellite))
+    return [
+        name
+        for name in dir(entity)
+        if not name.startswith("_")
+        and name not in base_methods
+        and callable(getattr(entity, name, None))
+    ]
+
+
+def signature_args(method):
+    """Return a list of parameter names for a callable (excluding 'self')."""
+    try:
+        return [arg for arg in inspect.signature(method).parameters if arg != "self"]
+    except (TypeError, ValueError):
+        return []
+
+
+def parse_annotations(method):
+    """Return a {param_name: field_info} dict from a callable's annotations."""
+    from rizza.helpers.typed_inputs import _parse_single_annotation
+
+    annotations = getattr(method, "__annotations__", {})
+    return {
+        param: _parse_single_annotation(annotation)
+        for param, annotation in annotations.items()
+        if param != "return"
+    }
+
+
+def _annotation_value(node):
+    """Rebuild the object an annotation's AST node evaluates to, without importing anything.
+
+    Builtins and typing names evaluate to themselves; any other name or attribute stands
+    for a class of that name defined in (or imported by) the apix module.
+
+    :raises ValueError: For expressions other than names, subscripts, "|" and constants.
+    """
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        if node.id in _BUILTIN_TYPES:
+            return _BUILTIN_TYPES[node.id]
+        if node.id in typing.__all__:
+            return getattr(typing, node.id)
+        return type(node.id, (), {})
+    if isinstance(node, ast.Attribute):
+        if getattr(node.value, "id", None) == "typing" and node.attr in typing.__all__:
+            return getattr(typing, node.attr)
+        return type(node.attr, (), {})
+    if isinstance(node, ast.Subscript):
+        args = node.slice.elts if isinstance(node.slice, ast.Tuple) else [node.slice]
+        values = tuple(_annotation_value(arg) for arg in args)
+        return _annotation_value(node.value)[values if len(values) > 1 else values[0]]
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        return _annotation_value(node.left) | _annotation_value(node.right)
+    raise ValueError(f"Can't rebuild annotation {ast.unparse(node)}")
+
+
+def _annotation_info(node, future):
+    """Parse an annotation's AST node into the field_info its runtime value would give."""
+    from rizza.helpers.typed_inputs import _parse_single_annotation
+
+    if future:
+        # At runtime the annotation is its source text
+        return _parse_single_annotation(ast.unparse(node))
+    try:
+        return _parse_single_annotation(_annotation_value(node))
+    except (TypeError, ValueError) as err:
+        logger.debug(f"Treating annotation as a plain string: {err}")
+        return {"type": "str", "required": False}
+
+
+def _describe_function(node, future):
+    """Describe a function's AST node the way _describe_callable describes the function.
+
+    :param node: FunctionDef node, or None for a class that inherits object.__init__.
+    :param future: Whether the module uses from __future__ import annotations.
+    """
+    if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        return {"args": ["args", "kwargs"] if node is None else [], "annotations": {}}
+    arguments = node.args
+    params = [*arguments.posonlyargs, *arguments.args]
+    decorators = {getattr(decorator, "id", None) for decorator in node.decorator_list}
+    if "classmethod" in decorators:
+        # Looked up on the class, a classmethod is already bound to it
+        params = params[1:]
+    params += [
+        param
+        for param in (arguments.vararg, *arguments.kwonlyargs, arguments.kwarg)
+        if param is not None
+    ]
+    return {
+        "args": [param.arg for param in params if param.arg != "self"],
+        "annotations": {
+            param.arg: _annotation_info(param.annotation, future)
+            for param in params
+            if param.annotation is not None
+        },
+    }
+
+
+def _class_members(classes, name):
+    """Return {attribute: AST node} for a class, its own attributes before its bases'."""
+    members = {}
+    for class_name in _class_order(classes, name):
+        for node in classes[class_name].body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                members.setdefault(node.name, node)
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    if isinstance(target, ast.Name):
+                        members.setdefault(target.id, node)
+    return members
+
+
+def _class_order(classes, name, seen=None):
+    """Return a class and the module's classes it inherits from, nearest first."""
+    seen = set() if seen is None else seen
+    if name in seen or name not in classes:
+        return []
+    seen.add(name)
+    order = [name]
+    for base in classes[name].bases:
+        if isinstance(base, ast.Name):
+            order += _class_order(classes, base.id, seen)
+    return order
+
+
+def extract(source):
+    """Return index data for apix source code, read with ast instead of importing it.
+
+    :param source: The apix module's source code.
+    :returns: The same {entity_name: {"init": {...}, "methods": {...}}} data that
+        ApixIndex.build gets by introspecting the imported module.
+    :raises ValueError: If the source has no Satellite class.
+    """
+    tree = ast.parse(source)
+    classes = {node.name: node for node in tree.body if isinstance(node, ast.ClassDef)}
+    if "Satellite" not in classes:
+        raise ValueError("The apix source has no Satellite class.")
+    future = any(
+        isinstance(node, ast.ImportFrom)
+        and node.module == "__future__"
+        and any(alias.name == "annotations" for alias in node.names)
+        for node in tree.body
+    )
+    base_members = _class_members(classes, "Satellite")
+    data = {}
+    for name in sorted(classes):
+        if name == "Satellite" or "Satellite" not in _class_order(classes, name):
+            continue
+        members = _class_members(classes, name)
+        api_methods = None
+        api_node = members.get("_api_methods")
+        if api_node is not None and api_node.value is not None:
+            try:
+                api_methods = ast.literal_eval(api_node.value)
+            except ValueError:
+                api_methods = None
+        if api_methods:
+            method_names = [method for method in api_methods if method in members]
+        else:
+            method_names = sorted(
+                method
+                for method, node in members.items()
+                if not method.startswith("_")
+                and method not in base_members
+                and isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+            )
+        data[name] = {
+            "init": _describe_function(members.get("__init__"), future),
+            "methods": {
+                method: _describe_function(members[method], future) for method in method_names
+            },
+        }
+    return data
+
+
+def _describe_callable(method):
+    return {"args": signature_args(method), "annotations": parse_annotations(method)}
+
+
+def _describe_entity(entity, satellite):
+    return {
+        "init": _describe_callable(entity.__init__),
+        "methods": {
+            name: _describe_callable(getattr(entity, name))
+            for name in entity_method_names(entity, satellite)
+        },
+    }
+
+
+@attr.s()
+class ApixIndex:
+    """Introspection results for every entity in an apix module.
+
+    :param module: The loaded apix module the index describes, or None until an entity
+        class is first needed.
+    :param apix_hash: Content hash of the module's source file, if it has one.
+    :param data: {entity_name: {"init": {...}, "methods": {name: {...}}}} where each
+        callable entry holds its "args" list and parsed "annotations" dict.
+    :param source: Path of the module's source file, if it has one.
+    """
+
+    module = attr.ib(repr=False)
+    apix_hash = attr.ib(default=None)
+    data = attr.ib(default=attr.Factory(dict), repr=False)
+    source = attr.ib(default=None)
+
+    def __attrs_post_init__(self):
+        """Entity classes are resolved from the module on first use."""
+        self._entities = None
+
+    @classmethod
+    def build(cls, module, satellite, apix_hash=None):
+        """Introspect every entity class in the module."""
+        data = {
+            name: _describe_entity(entity, satellite)
+            for name, entity in inspect.getmembers(module, inspect.isclass)
+            if issubclass(entity, satellite) and entity is not satellite
+        }
+        return cls(module=module, apix_hash=apix_hash, data=data)
+
+    @classmethod
+    def from_source(cls, source, module=None, index_dir=None):
+        """Load the saved index for an apix file, reading the file with ast if needed.
+
+        :raises ValueError: If the file can't be read with ast.
+        """
+        apix_hash = file_hash(source)
+        index_file = Path(index_dir or INDEX_DIR).joinpath(f"{apix_hash}.json")
+        if index_file.exists():
+            try:
+                saved = json.loads(index_file.read_text())
+                if saved.get("version") == INDEX_VERSION:
+                    logger.debug(f"Loaded apix index from {index_file}")
+                    return cls(
+                        module=module, apix_hash=apix_hash, data=saved["entities"], source=source
+                    )
+            except (ValueError, KeyError) as err:
+                logger.warning(f"Ignoring unreadable apix index {index_file}: {err}")
+
+        try:
+            data = extract(Path(source).read_text())
+        except SyntaxError as err:
+            raise ValueError(f"Can't parse {source}: {err}") from err
+        index = cls(module=module, apix_hash=apix_hash, data=data, source=source)
+        index.save(index_file)
+        return index
+
+    @classmethod
+    def load(cls, module, satellite, index_dir=None):
+        """Load the saved index for a module, building and saving it if needed."""
+        source = getattr(module, "__file__", None)
+        if not source or not Path(source).exists():
+            return cls.build(module, satellite)
+        try:
+            return cls.from_source(str(Path(source).resolve()), module, index_dir)
+        except ValueError as err:
+            logger.warning(f"Introspecting the apix module instead: {err}")
+        index = cls.build(module, satellite, apix_hash=file_hash(source))
+        index.source = str(Path(source).resolve())
+        return index
+
+    def save(self, path):
+        """Write the index to disk."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = path.with_suffix(".tmp")
+        tmp_file.write_text(
+            json.dumps({"version": INDEX_VERSION, "entities": self.data}, default=str)
+        )
+        tmp_file.replace(path)
+        logger.debug(f"Saved apix index to {path}")
+
+    def entities(self):
+        """Return a read-only {name: class} mapping of all entities.
+
+        This imports the apix module if it hasn't been yet.
+        """
+        if self._entities is None:
+            if self.module is None:
+                from rizza import apix_loader
+
+                self.module = apix_loader.get_apix_module(path=self.source)
+            self._entities = MappingProxyType(
+                {name: getattr(self.module, name) for name in self.data}
+            )
+        return self._entities
+
+    def entity(self, name):
+        """Return the entity class for a name, or None."""
+        return self.entities().get(name)
+
+    def entity_name(self, entity):
+        """Return the indexed name of an entity class, or None if it isn't indexed."""
+        name = getattr(entity, "__name__", None)
+        if name is not None and self.entity(name) is entity:
+            return name
+        return None
+
+    def entity_names(self):
+        """Return the names of all entities, without importing the apix module."""
+        return list(self.data)
+
+    def method_names(self, entity_name):
+        """Return the API method names for an indexed entity."""
+        return list(self.data[entity_name]["methods"])
+
+    def fields(self, entity_name):
+        """Return {param_name: field_info} merged across an indexed entity's API methods."""
+        merged = {}
+        for method_name in self.method_names(entity_name):
+            merged.update(self.annotations(entity_name, method_name))
+        return merged
+
+    def _callable_entry(self, entity_name, method_name):
+        entry = self.data.get(entity_name)
+        if entry is None:
+            return None
+        if method_name == "__init__":
+            return entry["init"]
+        return entry["methods"].get(method_name)
+
+    def init_params(self, entity_name):
+        """Return the __init__ parameter names for an indexed entity."""
+        return list(self.data[entity_name]["init"]["args"])
+
+    def args(self, entity_name, method_name):
+        """Return the parameter names for an entity method ("__init__" included)."""
+        entry = self._callable_entry(entity_name, method_name)
+        return list(entry["args"]) if entry else None
+
+    def annotations(self, entity_name, method_name):
+        """Return {param_name: field_info} for an entity method ("__init__" included)."""
+        entry = self._callable_entry(entity_name, method_name)
+        if entry is None:
+            return None
+        return {param: dict(info) for param, info in entry["annotations"].items()}
+
+    def locate(self, method):
+        """Return the (entity_name, method_name) an indexed callable belongs to, or None."""
+        qualname = getattr(method, "__qualname__", "")
+        if self.module is None or getattr(method, "__module__", None) != self.module.__name__:
+            return None
+        entity_name, _, method_name = qualname.rpartition(".")
+        entity = self.entity(entity_name)
+        if entity is None or getattr(entity, method_name, None) is not method:
+            return None
+        if self._callable_entry(entity_name, method_name) is None:
+            return None
+        return entity_name, method_name
+
+
+def get_index():
+    """Return the introspection index for the apix module.
+
+    Until the module has been loaded, the index is read from its source file without
+    importing it. Raises whatever the apix loader raises if there's no module to read.
+    """
+    global _index
+    from rizza import apix_loader
+
+    module = apix_loader.loaded_module()
+    if module is None:
+        source = apix_loader.resolve_path()
+        if source.exists():
+            source = str(source)
+            if _index is not None and _index.source == source:
+                return _index
+            try:
+                _index = ApixIndex.from_source(source)
+            except ValueError as err:
+                logger.warning(f"Importing the apix module to index it: {err}")
+            else:
+                return _index
+        module = apix_loader.get_apix_module()
+    if (
+        _index is not None
+        and _index.module is None
+        and _index.source == getattr(module, "__file__", None)
+    ):
+        _index.module = module
+    elif _index is None or _index.module is not module:
+        _index = ApixIndex.load(module, apix_loader.get_satellite_class())
+    return _index
+
+
+def current_index():
+    """Return the index if an apix module is loadable, otherwise None."""
+    try:
+        return get_index()
+    except Exception:
+        return None
+
+
+def reset():
+    """Clear the cached index (useful for testing)."""
+    global _index
+    _index = None
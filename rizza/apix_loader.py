@@ -5,21 +5,41 @@ from pathlib import Path
 import sys
 
 _module = None
+_path = None
 _DEFAULT_PATH = "~/rizza/apix_generated.py"
 
 
+def use_path(path):
+    """Set the path later calls find apix_generated.py at, unless they pass their own."""
+    global _path
+    _path = path
+
+
+def resolve_path(path=None):
+    """Return the absolute path apix_generated.py is loaded from.
+
+    :param path: Override the path to apix_generated.py. Falls back to the path set
+        with use_path(), the APIX_LIB_PATH environment variable, then the default location.
+    """
+    resolved_path = path or _path or os.environ.get("APIX_LIB_PATH") or _DEFAULT_PATH
+    return Path(resolved_path).expanduser().resolve()
+
+
+def loaded_module():
+    """Return the apix module if it has been loaded, without loading it."""
+    return _module
+
+
 def get_apix_module(path=None):
     """Load and cache the apix_generated module.
 
-    :param path: Override the path to apix_generated.py. Falls back to the
-        APIX_LIB_PATH environment variable, then to the default location.
+    :param path: Override the path to apix_generated.py (see resolve_path).
     """
     global _module
     if _module is not None:
         return _module
 
-    resolved_path = path or os.environ.get("APIX_LIB_PATH") or _DEFAULT_PATH
-    resolved_path = Path(resolved_path).expanduser().resolve()
+    resolved_path = resolve_path(path)
 
     if not resolved_path.exists():
         raise FileNotFoundError(
@@ -46,6 +66,10 @@ def get_connection_class():
 
 
 def reset():
-    """Clear the cached module (useful for testing)."""
-    global _module
+    """Clear the cached module, path and introspection index (useful for testing)."""
+    global _module, _path
+    from rizza import apix_index
+
     _module = None
+    _path = None
+    apix_index.reset()
@@ -0,0 +1,418 @@
+"""Spread genetic runs across machines with a coordinator and any number of workers.
+
+The coordinator holds a queue of (entity, method, mode) jobs and serves it over TCP.
+Each request is one line of JSON answered by one line of JSON, on its own connection:
+
+- {"op": "get", "worker": name} leases the next job ({"job": null} when none is ready,
+  with "done" set once every job is finished). The job carries the saved create tests
+  of the entities it depends on, which the worker adds to its own test store.
+- {"op": "heartbeat", "job": id} extends a job's lease while it runs.
+- {"op": "result", "job": id, "ok": bool, "test": ..., "cache": [...]} finishes a job.
+  The worker's saved test and new result-cache entries are stored on the coordinator.
+
+A job whose worker fails, or stops sending heartbeats before its lease runs out, goes
+back on the queue until it has been tried max_attempts times. Jobs are handed out a
+dependency level at a time (see planner.plan_levels), so an entity's dependencies have
+their create tests saved, and shipped with its job, before the entity itself is run.
+"""
+
+import hmac
+import ipaddress
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+import time
+
+import attr
+
+from rizza import apix_index, entity_tester
+from rizza.helpers import planner, result_cache, storage
+
+logger = logging.getLogger(__name__)
+
+MODES = ("positive", "negative")
+
+
+@attr.s(slots=True)
+class Job:
+    """One genetic run for a worker to do."""
+
+    id = attr.ib()
+    entity = attr.ib()
+    method = attr.ib()
+    mode = attr.ib(default="positive", validator=attr.validators.in_(MODES))
+    level = attr.ib(default=0)
+    dependencies = attr.ib(factory=tuple, converter=tuple)
+    attempts = attr.ib(default=0)
+
+    def to_dict(self):
+        """Return the fields a worker needs."""
+        return {"id": self.id, "entity": self.entity, "method": self.method, "mode": self.mode}
+
+
+def plan_jobs(method="create", modes=("positive",), entities=None):
+    """Return a Job for every entity and mode, levelled by the entities' dependencies.
+
+    :param entities: Entity names to include; defaults to every entity in the apix module.
+    """
+    if entities is None:
+        entities = entity_tester.EntityTester.pull_entity_names()
+    methods = ("create",) if method == "create" else ("create", method)
+    graph = planner.dependency_graph(apix_index.get_index(), entities, methods)
+    jobs = []
+    for level, level_entities in enumerate(planner.plan_levels(graph)):
+        for entity in level_entities:
+            dependencies = _closure(graph, entity)
+            if method != "create":
+                # Methods other than create need an existing entity of their own
+                dependencies.add(entity)
+            for mode in modes:
+                jobs.append(
+                    Job(
+                        id=len(jobs),
+                        entity=entity,
+                        method=method,
+                        mode=mode,
+                        level=level,
+                        dependencies=sorted(dependencies),
+                    )
+                )
+    return jobs
+
+
+def _closure(graph, entity):
+    """Return every entity the entity depends on, directly or through another one."""
+    found, stack = set(), list(graph.get(entity, ()))
+    while stack:
+        dep = stack.pop()
+        if dep not in found and dep != entity:
+            found.add(dep)
+            stack.extend(graph.get(dep, ()))
+    return found
+
+
+def _request(address, message, timeout=30):
+    """Send one message to a coordinator and return its reply."""
+    with socket.create_connection(address, timeout=timeout) as conn:
+        conn.sendall(json.dumps(message).encode() + b"\n")
+        reply = conn.makefile("rb").readline()
+    if not reply:
+        raise ConnectionError(f"No reply from the coordinator at {address[0]}:{address[1]}")
+    return json.loads(reply)
+
+
+def is_loopback(host):
+    """Whether host only accepts connections from this machine."""
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return host == "localhost"
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Answer one JSON line from a worker."""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            reply = self.server.coordinator.dispatch(json.loads(line))
+        except (ValueError, KeyError, TypeError) as err:
+            reply = {"error": f"Bad request: {err}"}
+        self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+
+@attr.s()
+class Coordinator:
+    """Lease jobs to workers and collect what they learn.
+
+    :param jobs: The Jobs to run.
+    :param config: Config whose test store and result cache receive the workers' results,
+        and whose saved create tests are sent along with the jobs that depend on them.
+        Without one, only the create tests finished in this run are sent.
+    :param host: Interface to listen on. Interfaces other machines can reach need a token.
+    :param port: Port to listen on (0 picks a free one).
+    :param lease: Seconds a worker may hold a job without a heartbeat.
+    :param max_attempts: Tries a job gets before it's given up on.
+    :param token: Shared secret workers must send, or None to accept any worker.
+    """
+
+    jobs = attr.ib(converter=list)
+    config = attr.ib(default=None)
+    host = attr.ib(default="127.0.0.1")
+    port = attr.ib(default=0)
+    lease = attr.ib(default=900)
+    max_attempts = attr.ib(default=3)
+    token = attr.ib(default=None)
+
+    def __attrs_post_init__(self):
+        """Queue the jobs and bind the listening socket."""
+        if self.token is None and not is_loopback(self.host):
+            raise ValueError(f"Set a token to accept workers on {self.host}.")
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._pending = sorted(self.jobs, key=lambda job: (job.level, job.id))
+        self._leased = {}
+        # {entity: saved positive create test} reported by workers during this run
+        self._tests = {}
+        # {job id: {"worker": name, "test": saved?, "cache": entries received}}
+        self.completed = {}
+        self.failed = []
+        self._server = socketserver.ThreadingTCPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.coordinator = self
+        self.port = self._server.server_address[1]
+        self._thread = None
+        self._check_done()
+
+    @property
+    def address(self):
+        """(host, port) workers should connect to."""
+        return (self.host, self.port)
+
+    def _check_done(self):
+        if not self._pending and not self._leased:
+            self._done.set()
+
+    def _requeue_expired(self):
+        now = time.time()
+        for job_id, (job, worker, deadline) in list(self._leased.items()):
+            if deadline < now:
+                logger.warning(f"{worker} stopped reporting on job {job_id}; requeueing it.")
+                del self._leased[job_id]
+                self._retry(job, "lease expired")
+
+    def _retry(self, job, reason):
+        if job.attempts >= self.max_attempts:
+            logger.error(f"Giving up on {job.entity}.{job.method} ({job.mode}): {reason}")
+            self.failed.append(job)
+        else:
+            self._pending.append(job)
+            self._pending.sort(key=lambda queued: (queued.level, queued.id))
+
+    def dispatch(self, message):
+        """Handle one decoded worker message and return the reply."""
+        if not isinstance(message, dict):
+            return {"error": "Bad request: expected a JSON object"}
+        if self.token is not None and not hmac.compare_digest(
+            str(message.get("token")).encode(), self.token.encode()
+        ):
+            return {"error": "Bad token"}
+        handler = {
+            "get": self._get,
+            "heartbeat": self._heartbeat,
+            "result": self._result,
+        }.get(message["op"])
+        if handler is None:
+            return {"error": f"Unknown op {message['op']!r}"}
+        with self._lock:
+            self._requeue_expired()
+            reply = handler(message)
+            self._check_done()
+        return reply
+
+    def _get(self, message):
+        if not self._pending:
+            return {"job": None, "done": not self._leased}
+        level = self._pending[0].level
+        if any(job.level < level for job, _, _ in self._leased.values()):
+            # Wait for the current level to finish before starting the next one
+            return {"job": None, "done": False}
+        job = self._pending.pop(0)
+        job.attempts += 1
+        worker = message.get("worker", "a worker")
+        self._leased[job.id] = (job, worker, time.time() + self.lease)
+        logger.info(f"Leased {job.entity}.{job.method} ({job.mode}) to {worker}.")
+        return {
+            "job": {**job.to_dict(), "tests": self._dependency_tests(job)},
+            "lease": self.lease,
+        }
+
+    def _dependency_tests(self, job):
+        """Return {entity: saved create test} for the job's dependencies that have one."""
+        store = None if self.config is None else storage.get_test_store(self.config)
+        tests = {}
+        for entity in job.dependencies:
+            test = self._tests.get(entity)
+            if test is None and store is not None:
+                test = store.get(entity, "create", "positive")
+            if test:
+                tests[entity] = test
+        return tests
+
+    def _heartbeat(self, message):
+        leased = self._leased.get(message["job"])
+        if leased is None:
+            return {"ok": False}
+        job, worker, _ = leased
+        self._leased[job.id] = (job, worker, time.time() + self.lease)
+        return {"ok": True}
+
+    def _result(self, message):
+        leased = self._leased.pop(message["job"], None)
+        if leased is None:
+            # Already requeued after its lease expired; the rerun will report instead
+            return {"ok": False}
+        job, worker, _ = leased
+        if not message.get("ok"):
+            self._retry(job, message.get("error") or f"failed on {worker}")
+            return {"ok": True}
+        self.completed[job.id] = {
+            "worker": worker,
+            "test": bool(message.get("test")),
+            "cache": len(message.get("cache") or ()),
+        }
+        if message.get("test") and job.method == "create" and job.mode == "positive":
+            self._tests[job.entity] = message["test"]
+        self._store(job, message)
+        logger.info(f"{worker} finished {job.entity}.{job.method} ({job.mode}).")
+        return {"ok": True}
+
+    def _store(self, job, message):
+        if self.config is None:
+            return
+        if message.get("test"):
+            storage.get_test_store(self.config).put(
+                job.entity, job.method, job.mode, message["test"]
+            )
+        cache = result_cache.get_result_cache(self.config)
+        if cache is not None:
+            for entry in message.get("cache") or ():
+                cache.put_entry(entry)
+
+    def start(self):
+        """Serve workers from a background thread."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="rizza-coordinator", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        """Block until every job has finished or been given up on.
+
+        :returns: True if everything finished before the timeout.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while not self._done.wait(1):
+            with self._lock:
+                self._requeue_expired()
+                self._check_done()
+            if deadline is not None and time.time() > deadline:
+                return False
+        return True
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def run_job(config, job, mock=False):
+    """Run one job with a GeneticEntityTester and gather what it saved.
+
+    The dependency tests sent with the job are saved first, so genetic_known can create
+    the entities the job depends on.
+
+    :returns: {"test": saved task dict or None, "cache": [new result-cache entries]}
+    """
+    from rizza.genetic_tester import GeneticEntityTester
+
+    store = storage.get_test_store(config)
+    for entity, test in (job.get("tests") or {}).items():
+        store.put(entity, "create", "positive", test)
+    started = time.time()
+    GeneticEntityTester(
+        config=config,
+        entity=job["entity"],
+        method=job["method"],
+        seek_bad=job["mode"] == "negative",
+    ).run(mock=mock)
+    cache = result_cache.get_result_cache(config)
+    return {
+        "test": store.get(job["entity"], job["method"], job["mode"]),
+        "cache": cache.entries(since=started) if cache is not None and not mock else [],
+    }
+
+
+@attr.s()
+class Worker:
+    """Pull jobs from a coordinator and run them until there are none left.
+
+    :param address: (host, port) of the coordinator.
+    :param runner: Callable(job dict) returning {"test": ..., "cache": [...]}.
+    :param name: Name the coordinator knows this worker by.
+    :param token: Shared secret the coordinator expects.
+    :param poll: Seconds to wait before asking again when no job is ready.
+    """
+
+    address = attr.ib(converter=tuple)
+    runner = attr.ib()
+    name = attr.ib(factory=lambda: f"{socket.gethostname()}:{os.getpid()}")
+    token = attr.ib(default=None)
+    poll = attr.ib(default=2.0)
+
+    def _send(self, message):
+        return _request(self.address, {**message, "token": self.token})
+
+    def _keep_alive(self, job_id, interval, stop):
+        while not stop.wait(interval):
+            try:
+                self._send({"op": "heartbeat", "job": job_id})
+            except OSError as err:
+                logger.warning(f"Heartbeat for job {job_id} failed: {err}")
+
+    def run_one(self):
+        """Lease and run one job.
+
+        :returns: True if a job ran, False if none was ready, None when all are done.
+        """
+        reply = self._send({"op": "get", "worker": self.name})
+        if "error" in reply:
+            raise RuntimeError(f"Coordinator refused {self.name}: {reply['error']}")
+        job = reply.get("job")
+        if job is None:
+            return None if reply.get("done") else False
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._keep_alive, args=(job["id"], reply["lease"] / 3, stop), daemon=True
+        )
+        heartbeat.start()
+        try:
+            outcome = {"ok": True, **self.runner(job)}
+        except Exception as err:
+            logger.exception(f"Job {job['id']} failed")
+            outcome = {"ok": False, "error": f"{err.__class__.__name__}: {err}"}
+        finally:
+            stop.set()
+            heartbeat.join()
+        self._send({"op": "result", "job": job["id"], **outcome})
+        return True
+
+    def run(self):
+        """Run jobs until the coordinator has none left.
+
+        :returns: The number of jobs this worker ran.
+        """
+        ran = 0
+        while True:
+            outcome = self.run_one()
+            if outcome is None:
+                return ran
+            if outcome:
+                ran += 1
+            else:
+                time.sleep(self.poll)
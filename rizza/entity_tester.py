@@ -1,12 +1,16 @@
 """A module that provides utilities to test apix entities."""
-import inspect
 import logging
 
 import attr
 
 logger = logging.getLogger(__name__)
 
-from rizza.helpers import inputs
+# Methods that destroy the entity they're called on
+DESTRUCTIVE_METHODS = ("delete", "destroy")
+
+from rizza import apix_index
+from rizza.helpers import inputs, profiling
+from rizza.helpers.metrics import get_metrics
 from rizza.helpers.misc import (
     dictionary_exclusion,
     form_input,
@@ -20,15 +24,11 @@ def _parse_annotations(method):
     :param method: A callable with optional __annotations__.
     :returns: Dict mapping parameter names to field_info dicts.
     """
-    from rizza.helpers.typed_inputs import _parse_single_annotation
-
-    annotations = getattr(method, "__annotations__", {})
-    result = {}
-    for param, annotation in annotations.items():
-        if param == "return":
-            continue
-        result[param] = _parse_single_annotation(annotation)
-    return result
+    index = apix_index.current_index()
+    location = index.locate(method) if index else None
+    if location:
+        return index.annotations(*location)
+    return apix_index.parse_annotations(method)
 
 
 @attr.s()
@@ -69,56 +69,63 @@ class EntityTester:
         return 0
 
     @staticmethod
+    @profiling.counted("pull_entities")
     def pull_entities(exclude=None):
-        """Return a dict of {name: class} for all apix entity classes."""
+        """Return a read-only {name: class} mapping for all apix entity classes."""
         try:
-            from rizza import apix_loader
-
-            module = apix_loader.get_apix_module()
-            Satellite = apix_loader.get_satellite_class()
+            index = apix_index.get_index()
         except Exception as err:
             logger.warning(f"Could not load apix module: {err}")
             return {}
+        return dictionary_exclusion(index.entities(), exclude)
 
-        entities = {
-            name: cls
-            for name, cls in inspect.getmembers(module, inspect.isclass)
-            if issubclass(cls, Satellite) and cls is not Satellite
-        }
-        return dictionary_exclusion(entities, exclude)
+    @staticmethod
+    def pull_entity_names():
+        """Return the names of all apix entities, without importing the apix module."""
+        try:
+            index = apix_index.get_index()
+        except Exception as err:
+            logger.warning(f"Could not load apix module: {err}")
+            return []
+        return index.entity_names()
 
     @staticmethod
     def pull_methods(entity=None, exclude=None):
-        """Return a dict of {name: method} for an entity's API methods."""
+        """Return a dict of {name: method} for an entity's API methods.
+
+        Indexed entities get their method names from the index; only an entity the
+        index doesn't know needs the apix Satellite class to find them.
+        """
         if entity is None:
             return {}
 
         try:
-            from rizza import apix_loader
+            index = apix_index.get_index()
+            entity_name = index.entity_name(entity)
+            if entity_name:
+                names = index.method_names(entity_name)
+            else:
+                from rizza import apix_loader
 
-            Satellite = apix_loader.get_satellite_class()
+                names = apix_index.entity_method_names(entity, apix_loader.get_satellite_class())
         except Exception as err:
             logger.warning(f"Could not load apix module: {err}")
             return {}
-
-        api_methods = getattr(entity, "_api_methods", None)
-        if api_methods:
-            methods = {
-                name: getattr(entity, name) for name in api_methods if hasattr(entity, name)
-            }
-        else:
-            # Fall back: subtract Satellite base methods from entity's methods
-            base_methods = set(dir(Satellite))
-            methods = {
-                name: getattr(entity, name)
-                for name in dir(entity)
-                if not name.startswith("_")
-                and name not in base_methods
-                and callable(getattr(entity, name, None))
-            }
-
+        methods = {name: getattr(entity, name) for name in names}
         return dictionary_exclusion(methods, exclude)
 
+    @staticmethod
+    def pull_method_names(entity_name):
+        """Return an entity's API method names, without importing the apix module."""
+        try:
+            index = apix_index.get_index()
+        except Exception as err:
+            logger.warning(f"Could not load apix module: {err}")
+            return []
+        if entity_name not in index.entity_names():
+            return []
+        return index.method_names(entity_name)
+
     @staticmethod
     def pull_fields(entity=None, exclude=None, method=None):
         """Return a merged {param_name: field_info} dict from entity API method annotations.
@@ -150,7 +157,11 @@ class EntityTester:
     def pull_args(method=None):
         """Return a list of parameter names for a method (excluding 'self')."""
         if method:
-            return [arg for arg in inspect.signature(method).parameters if arg != "self"]
+            index = apix_index.current_index()
+            location = index.locate(method) if index else None
+            if location:
+                return index.args(*location)
+            return apix_index.signature_args(method)
 
     @staticmethod
     def pull_input_methods(exclude=None):
@@ -174,6 +185,7 @@ class EntityTestTask:
     arg_dict = attr.ib(validator=attr.validators.instance_of(dict))
     config = attr.ib(default=None, repr=False)
 
+    @profiling.counted("execute")
     def execute(self, mock=False):
         """Execute the task.
 
@@ -187,8 +199,12 @@ class EntityTestTask:
 
         # Resolve arg_dict input method names to actual values
         # Build field_info map from entity annotations for type-aware resolution
-        pulled_entities = EntityTester.pull_entities()
-        entity_cls = pulled_entities.get(self.entity)
+        try:
+            index = apix_index.get_index()
+        except Exception as err:
+            logger.error(f"Could not load apix module: {err}")
+            return {"fail": {"ApixLoadError": str(err)}}
+        entity_cls = index.entity(self.entity)
         if not entity_cls:
             logger.error(f"Entity '{self.entity}' not found in apix module.")
             return {"fail": f"Entity '{self.entity}' not found."}
@@ -198,7 +214,9 @@ class EntityTestTask:
             logger.error(f"Method '{self.method}' not found on entity '{self.entity}'.")
             return {"fail": f"Method '{self.method}' not found."}
 
-        field_info_map = _parse_annotations(method_obj)
+        field_info_map = index.annotations(self.entity, self.method) or _parse_annotations(
+            method_obj
+        )
 
         resolved_args = {}
         cut_list = []
@@ -214,25 +232,31 @@ class EntityTestTask:
 
         logger.debug(f"Executing: {self.entity}.{self.method}({resolved_args})")
 
+        metrics = get_metrics(self.config)
         try:
-            import inspect
-
-            init_param_names = set(inspect.signature(entity_cls.__init__).parameters) - {"self"}
+            init_param_names = set(index.init_params(self.entity))
             init_args = {k: v for k, v in resolved_args.items() if k in init_param_names}
             method_args = {k: v for k, v in resolved_args.items() if k not in init_param_names}
-            entity_inst = entity_cls(**init_args)
+            with metrics.timer("construct", self.entity, self.method):
+                entity_inst = entity_cls(**init_args)
             try:
-                result = getattr(entity_inst, self.method)(**method_args)
+                with metrics.timer("call", self.entity, self.method) as timing:
+                    result = getattr(entity_inst, self.method)(**method_args)
+                    timing.status = "pass"
             except AttributeError as ae:
                 if "has no attribute 'id'" not in str(ae):
                     raise
                 # Method needs self.id — try to get a real ID via genetic_known
                 from rizza.helpers.inputs import genetic_known
 
-                entity_id = genetic_known(self.config, self.entity)
+                entity_id = genetic_known(
+                    self.config, self.entity, exclusive=self.method in DESTRUCTIVE_METHODS
+                )
                 if entity_id and entity_id not in (-1, "~"):
                     entity_inst.id = entity_id
-                    result = getattr(entity_inst, self.method)(**method_args)
+                    with metrics.timer("call", self.entity, self.method) as timing:
+                        result = getattr(entity_inst, self.method)(**method_args)
+                        timing.status = "pass"
                 else:
                     raise
             return {"pass": result.json() if hasattr(result, "json") else result}
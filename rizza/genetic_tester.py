@@ -1,9 +1,10 @@
 """A module that provides utilities to test entities via genetic algorithms."""
 
 import asyncio
-import inspect
+from concurrent.futures import as_completed
 import logging
 import random
+import time
 
 import attr
 from rich.progress import (
@@ -16,13 +17,32 @@ from rich.progress import (
 )
 import yaml
 
-from rizza import entity_tester
-from rizza.helpers import genetics
-from rizza.helpers.logging import console
-from rizza.helpers.misc import dict_search
+from rizza import apix_index, entity_tester
+from rizza.helpers import (
+    checkpoint,
+    concurrency,
+    constraints,
+    criteria,
+    dependency_pool,
+    events,
+    executors,
+    genetics,
+    metrics,
+    planner,
+    profiling,
+    result_cache,
+    storage,
+    surrogate,
+)
+from rizza.helpers.genome import Genome
+from rizza.helpers.logging import console, log_to
 
 logger = logging.getLogger(__name__)
 
+# Islands cycle through these, so neighbouring islands search differently
+ISLAND_CROSSOVERS = ("single_point", "uniform")
+ISLAND_MUTATION_SCALES = (1.0, 0.5, 1.5)
+
 
 def _make_progress():
     return Progress(
@@ -35,65 +55,201 @@ def _make_progress():
     )
 
 
-def _entity_from_param_name(param_name, known_entity_names_lower):
-    """If param ends in _id/_ids and its base matches a known entity, return that entity's name."""
-    name = param_name.lower()
-    if name.endswith("_ids"):
-        base = name[:-4]
-    elif name.endswith("_id"):
-        base = name[:-3]
-    else:
-        return None
-    return known_entity_names_lower.get(base)
+def _run_with_runtime(runner, kwargs):
+    """Call runner(debug, async_mode, **kwargs), sharing one async runtime in async mode.
+
+    The run's metrics report is written once the runner finishes.
+    """
+    debug = kwargs.pop("debug")
+    async_mode = kwargs.pop("async_mode")
+    try:
+        if not async_mode:
+            del kwargs["max_running"]
+            kwargs.pop("executor", None)
+            kwargs.pop("steady_state", None)
+            return runner(debug, async_mode, **kwargs)
+        # One event loop and executor serve every async tester
+        with executors.async_runtime(kwargs["config"], kwargs["max_running"]):
+            return runner(debug, async_mode, **kwargs)
+    finally:
+        metrics.write_report(kwargs["config"])
+        events.flush(kwargs["config"])
 
 
 def run_all_entities(**kwargs):
     """Iterate through all known entities and attempt to test them."""
-    debug = kwargs.pop("debug")
-    async_mode = kwargs.pop("async_mode")
-    if not async_mode:
-        del kwargs["max_running"]
+    _run_with_runtime(_run_entities, kwargs)
+
+
+def run_campaign(**kwargs):
+    """Test every method of one entity, reusing the entities created along the way.
+
+    :returns: {method: whether a passing test was found}
+    """
+    return _run_with_runtime(_run_campaign, kwargs)
+
+
+def _run_entities(debug, async_mode, **kwargs):
+    """Run a tester for each known entity, in dependency order.
 
-    pulled_entities = entity_tester.EntityTester.pull_entities()
+    Entities are tested a level at a time, so everything an entity depends on has had
+    its create test learned and saved first. In async mode, the entities within a level
+    run concurrently (up to genetics.entity_workers at once).
+    """
+    pulled_entities = entity_tester.EntityTester.pull_entity_names()
     if not pulled_entities:
         logger.warning("Genetic tests: No entities found to test.")
         return
 
-    entity_list = list(pulled_entities)
     config = kwargs["config"]
+    method = kwargs["method"]
+    methods = ("create",) if method == "create" else ("create", method)
+    graph = planner.dependency_graph(apix_index.get_index(), pulled_entities, methods)
+    levels = planner.plan_levels(graph)
+
+    # Learn create for anything depended on before testing another method
+    runs = []
+    if method != "create":
+        store = storage.get_test_store(config)
+        required = planner.dependencies_of(graph)
+        for level in levels:
+            missing = [
+                entity
+                for entity in level
+                if entity in required and not store.get(entity, "create", "positive")
+            ]
+            if missing:
+                runs.append((missing, {"method": "create", "seek_bad": False}))
+    runs.extend((level, {}) for level in levels)
+
+    workers = 1
+    if async_mode:
+        workers = max(1, getattr(config.rizza.genetics, "entity_workers", 4))
+    # Each entity's records are routed to its own file; the rest go to this one
+    config.init_logger(
+        path=config.base_dir.joinpath(f"logs/genetic/All {method}.log"),
+        level="debug" if debug else None,
+    )
 
     progress = _make_progress()
     config._progress = progress
-    entity_task = progress.add_task("[bold]Entities[/bold]", total=len(entity_list))
+    entity_task = progress.add_task(
+        "[bold]Entities[/bold]", total=sum(len(entities) for entities, _ in runs)
+    )
 
-    try:
-        with progress:
-            for entity in entity_list:
-                kwargs["entity"] = entity
-                progress.update(entity_task, description=f"[bold]Entity:[/bold] {entity}")
+    def run_entity(entity, overrides):
+        progress.update(entity_task, description=f"[bold]Entity:[/bold] {entity}")
+        try:
+            tester_class = AsyncGeneticEntityTester if async_mode else GeneticEntityTester
+            gtester = tester_class(**{**kwargs, "entity": entity, **overrides})
+        except Exception as err:
+            progress.console.print(
+                f"[yellow]Warning:[/yellow] Unable to create a tester for {entity}: {err}"
+            )
+            return
+        with log_to(config.base_dir.joinpath(f"logs/genetic/{gtester.test_name}.log")):
+            gtester.run()
+
+    def run_level(entities, overrides):
+        if workers == 1:
+            for entity in entities:
+                run_entity(entity, overrides)
+                progress.advance(entity_task)
+            return
+        with executors.ContextThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(run_entity, entity, overrides): entity for entity in entities}
+            for future in as_completed(futures):
                 try:
-                    if async_mode:
-                        gtester = AsyncGeneticEntityTester(**kwargs)
-                    else:
-                        gtester = GeneticEntityTester(**kwargs)
+                    future.result()
                 except Exception as err:
                     progress.console.print(
-                        f"[yellow]Warning:[/yellow] Unable to create a tester for {entity}: {err}"
+                        f"[yellow]Warning:[/yellow] Testing {futures[future]} failed: {err}"
                     )
-                    progress.advance(entity_task)
-                    continue
-                config.init_logger(
-                    path=config.base_dir.joinpath(f"logs/genetic/{gtester.test_name}.log"),
-                    level="debug" if debug else None,
-                )
-                gtester.run()
                 progress.advance(entity_task)
+
+    try:
+        with progress:
+            for entities, overrides in runs:
+                run_level(entities, overrides)
     finally:
         config._progress = None
 
     logger.info("Finished testing all entities!")
 
 
+def _run_campaign(debug, async_mode, **kwargs):
+    """Run a tester for each of an entity's methods, create first and delete last.
+
+    Passing create results seed the dependency pool, so the update, custom action and
+    delete evaluations that need an existing entity lease those IDs instead of creating
+    a new entity each. In async mode, the methods within a level run concurrently.
+    """
+    config = kwargs["config"]
+    entity = kwargs["entity"]
+    kwargs.pop("method", None)
+    if entity not in entity_tester.EntityTester.pull_entity_names():
+        logger.warning(f"Campaign: Entity '{entity}' not found in apix module.")
+        return {}
+    levels = planner.method_levels(entity_tester.EntityTester.pull_method_names(entity))
+    if not levels:
+        logger.warning(f"Campaign: {entity} has no methods to test.")
+        return {}
+
+    config.init_logger(
+        path=config.base_dir.joinpath(f"logs/genetic/{entity} campaign.log"),
+        level="debug" if debug else None,
+    )
+    workers = 1
+    if async_mode:
+        workers = max(1, getattr(config.rizza.genetics, "entity_workers", 4))
+
+    progress = _make_progress()
+    config._progress = progress
+    method_task = progress.add_task(
+        f"[bold]{entity}[/bold] methods", total=sum(len(level) for level in levels)
+    )
+    outcomes = {}
+
+    def run_method(method):
+        try:
+            tester_class = AsyncGeneticEntityTester if async_mode else GeneticEntityTester
+            outcomes[method] = tester_class(**{**kwargs, "method": method}).run() is True
+        except Exception as err:
+            progress.console.print(
+                f"[yellow]Warning:[/yellow] Testing {entity}.{method} failed: {err}"
+            )
+            outcomes[method] = False
+        progress.advance(method_task)
+
+    try:
+        with progress:
+            for level in levels:
+                if workers == 1 or len(level) == 1:
+                    for method in level:
+                        run_method(method)
+                    continue
+                with executors.ContextThreadPoolExecutor(
+                    max_workers=min(workers, len(level))
+                ) as pool:
+                    list(pool.map(run_method, level))
+    finally:
+        config._progress = None
+
+    passed = sorted(method for method, ok in outcomes.items() if ok)
+    passed_note = f" ({', '.join(passed)})" if passed else ""
+    logger.info(
+        f"Campaign for {entity} finished: "
+        f"{len(passed)} of {len(outcomes)} methods passed{passed_note}."
+    )
+    pool = dependency_pool.get_dependency_pool(config)
+    if pool is not None:
+        logger.info(
+            f"Dependency pool: {pool.created} entities created, {pool.harvested} harvested "
+            f"and {pool.leased} leases handed out."
+        )
+    return outcomes
+
+
 @attr.s()
 class GeneticEntityTester:
     """Class that handles all aspects of genetic algorithm-based testing.
@@ -105,6 +261,9 @@ class GeneticEntityTester:
     :param max_generations: Integer specifying the max number of generations.
     :param seek_bad: Boolean noting whether to favor bad results.
     :param fresh: Boolean noting whether to use the last best saved result.
+    :param disable_result_cache: Boolean noting whether to skip the persistent result cache.
+    :param resume: Boolean noting whether to continue from the run's last checkpoint.
+    :param islands: Number of island populations to split the search between.
     """
 
     config = attr.ib()
@@ -118,16 +277,20 @@ class GeneticEntityTester:
     disable_recursion = attr.ib(default=None)
     seek_bad = attr.ib(default=False)
     fresh = attr.ib(default=False)
+    disable_result_cache = attr.ib(default=None)
+    resume = attr.ib(default=False)
+    islands = attr.ib(default=None)
 
     def __attrs_post_init__(self):
         """Perform more complex class initialization."""
-        self.test_name = "{} {} {}".format(
-            self.entity, self.method, "negative" if self.seek_bad else "positive"
-        )
+        self.mode = "negative" if self.seek_bad else "positive"
+        self.test_name = storage.format_test_name(self.entity, self.method, self.mode)
         if not self.population_count:
             self.population_count = self.config.rizza.genetics.population_count
         if not self.max_generations:
             self.max_generations = self.config.rizza.genetics.max_generations
+        if not self.islands:
+            self.islands = getattr(self.config.rizza.genetics, "islands", 1)
 
         # Apply CLI overrides to config
         if self.max_recursive_generations:
@@ -138,6 +301,15 @@ class GeneticEntityTester:
             self.config.rizza.genetics.allow_recursion = False
         if self.max_recursive_depth:
             self.config.rizza.genetics.max_recursive_depth = self.max_recursive_depth
+        if self.disable_result_cache:
+            self.config.rizza.genetics.result_cache = False
+        self._criteria = criteria.CriteriaMatcher.from_config(self.config)
+        self._surrogate = surrogate.get_surrogate(self.config, maximize=not self.seek_bad)
+        self._checkpoint = checkpoint.Checkpoint(
+            checkpoint.checkpoint_path(self.config, self.test_name)
+        )
+        self._fitness_cache = {}
+        self._events = events.get_event_log(self.config)
 
         # Resolve entity and method from apix module
         pulled_entities = entity_tester.EntityTester.pull_entities()
@@ -145,9 +317,7 @@ class GeneticEntityTester:
         if self._entity_cls:
             methods = entity_tester.EntityTester.pull_methods(self._entity_cls)
             self._method = methods.get(self.method)
-            self._init_params = [
-                p for p in inspect.signature(self._entity_cls.__init__).parameters if p != "self"
-            ]
+            self._init_params = apix_index.get_index().init_params(self.entity)
         else:
             logger.warning(f"GeneticTester: Entity '{self.entity}' not found in apix module.")
             self._entity_cls = None
@@ -163,30 +333,36 @@ class GeneticEntityTester:
         )
         self._available_params = list(dict.fromkeys(self._init_params + method_params))
 
+        # Negative runs still learn constraints, but don't repair genes into valid input
+        store = constraints.get_constraint_store(self.config)
+        self._constraints = (
+            store.get(self.entity, self.method) if store and not self.seek_bad else None
+        )
+
     def _build_type_pools(self):
         """Build a {param_name: [compatible_inputs]} map for __init__ + method params."""
         if not self._entity_cls:
             return {}
 
-        from rizza.helpers.typed_inputs import _parse_single_annotation, get_compatible_inputs
+        from rizza.helpers.typed_inputs import get_compatible_inputs
 
         all_inputs = list(entity_tester.EntityTester.pull_input_methods(exclude=["long"]).keys())
-        known_entities = entity_tester.EntityTester.pull_entities()
-        known_entity_names_lower = {name.lower(): name for name in known_entities}
+        index = apix_index.get_index()
+        known_entity_names_lower = {name.lower(): name for name in index.entity_names()}
         pools = {}
 
-        for annotations in (
-            getattr(self._entity_cls.__init__, "__annotations__", {}),
-            getattr(self._method, "__annotations__", {}) if self._method else {},
+        for field_infos in (
+            index.annotations(self.entity, "__init__") or {},
+            (index.annotations(self.entity, self.method) or {}) if self._method else {},
         ):
-            for param, annotation in annotations.items():
-                if param == "return" or param in pools:
+            for param, parsed_info in field_infos.items():
+                if param in pools:
                     continue
-                field_info = _parse_single_annotation(annotation)
+                field_info = parsed_info
                 # If not already an entity ref, check if param name implies one:
                 # - ends in '_id' or '_ids' and the prefix matches a known entity name
                 if not field_info.get("entity"):
-                    entity_name = _entity_from_param_name(param, known_entity_names_lower)
+                    entity_name = planner.entity_from_param_name(param, known_entity_names_lower)
                     if entity_name:
                         field_info = {**field_info, "entity": entity_name}
                 pools[param] = get_compatible_inputs(field_info, all_inputs)
@@ -194,63 +370,214 @@ class GeneticEntityTester:
         return pools
 
     def _save_organism(self, test):
-        """Save the test organism to the appropriate file in data/genetic_tests."""
-        test_file = self.config.base_dir.joinpath(f"data/genetic_tests/{self.entity}.yaml")
-        test_file.parent.mkdir(parents=True, exist_ok=True)
-        try:
-            existing = yaml.load(test_file.open("r+"), Loader=yaml.FullLoader) or {}
-        except FileNotFoundError:
-            existing = {}
+        """Save the test organism to the configured test store."""
         task = self._genes_to_task(test.genes)
-        existing[self.test_name] = attr.asdict(task, filter=lambda a, value: a.name != "config")
-        yaml.dump(existing, test_file.open("w+"), default_flow_style=False)
+        storage.get_test_store(self.config).put(
+            self.entity,
+            self.method,
+            self.mode,
+            attr.asdict(task, filter=lambda a, value: a.name != "config"),
+        )
 
     def _load_test(self):
-        """Load in the last test stored in data/genetic_tests, if any exist.
+        """Load in the last test saved in the test store, if any exist.
 
         :returns: 2-list [param_names, param_inputs] or False.
         """
-        test_file = self.config.base_dir.joinpath(f"data/genetic_tests/{self.entity}.yaml")
-        test_file.parent.mkdir(parents=True, exist_ok=True)
-        if test_file.exists():
-            tests = yaml.load(test_file.open("r"), Loader=yaml.FullLoader) or {}
-            best = tests.get(self.test_name, False)
-            if best and "arg_dict" in best:
-                arg_dict = best["arg_dict"]
-                return [list(arg_dict.keys()), list(arg_dict.values())]
-        else:
-            test_file.touch()
+        best = storage.get_test_store(self.config).get(self.entity, self.method, self.mode)
+        if best and "arg_dict" in best:
+            arg_dict = best["arg_dict"]
+            return [list(arg_dict.keys()), list(arg_dict.values())]
         return False
 
+    @profiling.counted("_judge")
     def _judge(self, result=None, mock=False):
         """Return a numeric value for the given result."""
         if mock:
             return random.randint(-1000, 1000)
-        total = 0
-        for criteria, points in self.config.rizza.genetics.criteria.items():
-            if dict_search(criteria, result):
-                total += points
-        return total
+        return self._criteria.score(result)
+
+    def _judge_many(self, results, mock=False):
+        """Return a numeric value for each of the given results, in order."""
+        if mock:
+            return [random.randint(-1000, 1000) for _ in results]
+        return self._criteria.score_many(results)
 
     def _genes_to_task(self, genes):
         """Turn a 2-list gene into an EntityTestTask.
 
-        :param genes: [param_names, param_inputs]
+        :param genes: [param_names, param_inputs] or an equivalent Genome. Repeated params
+            (breeding/mutation can introduce them) keep their first input.
         """
-        # Deduplicate params (breeding/mutation can introduce repeats); keep first occurrence.
-        seen = set()
-        arg_dict = {}
-        for param, inpt in zip(genes[0], genes[1], strict=False):
-            if param not in seen:
-                seen.add(param)
-                arg_dict[param] = inpt
+        if not isinstance(genes, Genome):
+            genes = Genome.from_genes(genes)
         return entity_tester.EntityTestTask(
             entity=self.entity,
             method=self.method,
-            arg_dict=arg_dict,
+            arg_dict=genes.arg_dict(),
             config=self.config,
         )
 
+    def _cached_result(self, task, mock=False, info=None):
+        """Return a task's result from the persistent cache, or None, counting the lookup.
+
+        :param info: Optional dict whose "cache" is set to "result" on a cache hit.
+        """
+        recorder = metrics.get_metrics(self.config)
+        recorder.count("evaluations")
+        cache = None if mock else result_cache.get_result_cache(self.config)
+        if cache is None:
+            return None
+        result = cache.get(task)
+        recorder.count("cache_misses" if result is None else "cache_hits")
+        if result is not None and info is not None:
+            info["cache"] = "result"
+        return result
+
+    def _execute_task(self, task, mock=False, info=None):
+        """Execute a task, reusing a raw result from the persistent cache when possible.
+
+        Results that show an overloaded server are returned but not cached or learned from.
+
+        :param info: Optional dict told whether the result cache answered.
+        """
+        result = self._cached_result(task, mock, info)
+        if result is not None:
+            return result
+        cache = None if mock else result_cache.get_result_cache(self.config)
+        recorder = metrics.get_metrics(self.config)
+        with recorder.tracking(), recorder.timer("evaluation", task.entity, task.method) as timing:
+            result = self._run_task(task, mock)
+            timing.status = metrics.outcome(result)
+        if concurrency.is_overload(result):
+            return result
+        if cache is not None:
+            cache.put(task, result)
+        self._harvest(task, result)
+        if not mock:
+            self._learn(task, result)
+        return result
+
+    def _record_event(self, organism, result, generation=None, *, latency=None, cache=None):
+        """Add a judged organism's evaluation to the event log.
+
+        :param cache: "fitness" or "result" when a cache answered instead of the API.
+        """
+        if self._events is None:
+            return
+        self._events.emit(
+            {
+                "ts": round(time.time(), 3),
+                "type": "evaluation",
+                "entity": self.entity,
+                "method": self.method,
+                "mode": self.mode,
+                "generation": generation,
+                "genotype": organism.genome.arg_dict(),
+                "status": metrics.outcome(result),
+                "points": organism.points,
+                "latency": None if latency is None else round(latency, 6),
+                "cache": cache,
+            }
+        )
+
+    def _run_task(self, task, mock=False, recursion=True):
+        """Execute a task, dropping leased dependency IDs the server no longer finds.
+
+        :param recursion: Let genetic_unknown inputs start new genetic searches.
+        """
+        with dependency_pool.tracking_leases() as leases, dependency_pool.recursion(recursion):
+            result = task.execute(mock)
+        pool = dependency_pool.get_dependency_pool(self.config)
+        if pool is not None:
+            for entity, value in dependency_pool.stale_ids(result, leases):
+                logger.debug(f"{entity} {value} no longer exists; dropping it from the pool.")
+                pool.invalidate(entity, value)
+        return result
+
+    def _harvest(self, task, result):
+        """Offer the ID of a freshly created entity to the dependency pool."""
+        if task.method != "create" or not isinstance(result, dict) or "pass" not in result:
+            return
+        pool = dependency_pool.get_dependency_pool(self.config)
+        if pool is not None:
+            pool.harvest(task.entity, result["pass"])
+
+    def _learn(self, task, result):
+        """Learn param constraints from a freshly executed (never a cached) result."""
+        store = constraints.get_constraint_store(self.config)
+        if store is not None and task.entity == self.entity and task.method == self.method:
+            store.learn(task.entity, task.method, task.arg_dict, result, self._available_params)
+
+    def _save_constraints(self):
+        """Persist anything learned about param constraints during the run."""
+        store = constraints.get_constraint_store(self.config)
+        if store is not None:
+            store.save()
+
+    def _load_checkpoint(self, population):
+        """Restore the run's last checkpoint into a population, when resuming.
+
+        :returns: The generation to continue from, or None to start from scratch.
+        """
+        self._fitness_cache = {}
+        if not self.resume:
+            return None
+        state = self._checkpoint.load()
+        if state is None or state.get("test_name") != self.test_name:
+            logger.info(f"No checkpoint to resume {self.test_name} from; starting over.")
+            return None
+        generation, scores = checkpoint.restore(state, population)
+        # The checkpoint only has points; the raw results come from the result cache
+        cache = result_cache.get_result_cache(self.config)
+        if cache is not None:
+            for genome, points in scores.items():
+                result = cache.get(self._genes_to_task(genome))
+                if result is not None:
+                    self._fitness_cache[genome] = (result, points)
+        logger.info(
+            f"Resuming {self.test_name} at generation {generation} with "
+            f"{len(self._fitness_cache)} evaluations already done."
+        )
+        return generation
+
+    def _save_checkpoint(self, population, generation, force=False):
+        """Checkpoint the run every genetics.checkpoint_every generations.
+
+        :param force: Checkpoint now, whatever the generation (e.g. when interrupted).
+        """
+        every = getattr(self.config.rizza.genetics, "checkpoint_every", 10)
+        if not every or (not force and generation % every):
+            return
+        self._checkpoint.save(
+            checkpoint.capture(self.test_name, generation, population, self._fitness_cache)
+        )
+
+    def _report_success(self, organism, generation, progress, note=None):
+        """Save a passing organism and announce it."""
+        self._save_organism(organism)
+        success_msg = "Success! Generation {} passed with:\n{}".format(
+            generation,
+            yaml.dump(
+                attr.asdict(
+                    self._genes_to_task(organism.genes),
+                    filter=lambda a, value: a.name != "config",
+                ),
+                default_flow_style=False,
+            ),
+        )
+        logger.info(success_msg)
+        progress.console.print(
+            f"[bold green]✓[/bold green] "
+            f"[bold]{self.entity}.{self.method}[/bold] "
+            f"passed at generation {generation}!" + (f" ({note})" if note else "")
+        )
+
+    def _report_surrogate(self):
+        """Log how many evaluations the surrogate model saved, if it's in use."""
+        if self._surrogate is not None and self._surrogate.executed + self._surrogate.skipped:
+            logger.info(self._surrogate.report())
+
     def _create_gene_base(self):
         """Create a valid genetic base to evolve on.
 
@@ -263,17 +590,120 @@ class GeneticEntityTester:
         if not self._available_params:
             return [[], []]
 
+        available = self._available_params
+        if self._constraints:
+            available = [
+                param for param in available if param not in self._constraints.forbidden_params
+            ] or available
+
         max_initial = getattr(self.config.rizza.genetics, "initial_max_gene_params", 3)
-        count = random.randint(1, min(max_initial, len(self._available_params)))
-        params = random.sample(self._available_params, count)
+        count = random.randint(1, min(max_initial, len(available)))
+        params = random.sample(available, count)
 
         param_inputs = []
         for param in params:
             pool = self._type_pools.get(param, all_inputs)
             param_inputs.append(random.choice(pool) if pool else random.choice(all_inputs))
 
+        if self._constraints:
+            return self._constraints.repair([params, param_inputs], self._type_pools, all_inputs)
         return [params, param_inputs]
 
+    def _new_population(self, population_count=None, **overrides):
+        """Create a Population for this tester's entity and method."""
+        genetics_cfg = self.config.rizza.genetics
+        options = {
+            "gene_base": [self._create_gene_base()],
+            "population_count": population_count or self.population_count,
+            "generator_function": self._create_gene_base,
+            "gene_length": 1,
+            "mutate": True,
+            "rev_pop_sort": not self.seek_bad,
+            "crossover_method": getattr(genetics_cfg, "crossover_method", "single_point"),
+            "engine": getattr(genetics_cfg, "population_engine", "list"),
+            "constraints": self._constraints,
+        }
+        return genetics.Population(**{**options, **overrides})
+
+    def _breed(self, population):
+        """Breed a population's next generation with the configured settings."""
+        genetics_cfg = self.config.rizza.genetics
+        population.breed_population(
+            type_pools=self._type_pools,
+            tournament_size=getattr(genetics_cfg, "tournament_size", 3),
+            elite_percentage=getattr(genetics_cfg, "elite_percentage", 5),
+            immigration_rate=getattr(genetics_cfg, "immigration_rate", 5),
+            available_genes=self._available_params,
+        )
+
+    def _evaluate_population(self, population, progress, org_task, mock=False, *, generation=None):
+        """Execute and judge every organism in a population that needs it.
+
+        Organisms in the run's fitness cache reuse their result, and organisms the
+        surrogate model skips keep their predicted points. Organisms that recurse too
+        deeply, or whose result shows an overloaded server, are dropped from the
+        population without being scored or cached.
+
+        :returns: The first organism found to pass, or None.
+        """
+        _fitness_cache = self._fitness_cache
+        population.population.sort(key=lambda o: len(o.genes[0]))
+        to_run = None
+        if self._surrogate is not None:
+            candidates = [
+                org for org in population.population if mock or org.genome not in _fitness_cache
+            ]
+            to_run = {id(org) for org in self._surrogate.select(candidates)}
+        to_remove = set()
+        try:
+            for organism in population.population:
+                gene_key = organism.genome
+                if not mock and gene_key in _fitness_cache:
+                    result, organism.points = _fitness_cache[gene_key]
+                    self._record_event(organism, result, generation, cache="fitness")
+                elif to_run is not None and id(organism) not in to_run:
+                    # The surrogate already gave it predicted points
+                    progress.advance(org_task)
+                    continue
+                else:
+                    if logger.isEnabledFor(logging.DEBUG):
+                        # Formatting an organism is costly, so skip it unless it's logged
+                        logger.debug(f"Testing {organism}")
+                    task = self._genes_to_task(gene_key)
+                    info = {}
+                    started = time.perf_counter()
+                    try:
+                        result = self._execute_task(task, mock, info)
+                    except RecursionError:
+                        logger.warning(
+                            f"RecursionError testing {organism}; removing from population."
+                        )
+                        to_remove.add(id(organism))
+                        progress.advance(org_task)
+                        continue
+                    latency = time.perf_counter() - started
+                    if concurrency.is_overload(result):
+                        # The server failed, not the organism, so there's nothing to score
+                        logger.warning(f"Satellite overloaded testing {organism}; dropping it.")
+                        to_remove.add(id(organism))
+                        progress.advance(org_task)
+                        continue
+                    organism.points = self._judge(result, mock)
+                    self._record_event(
+                        organism, result, generation, latency=latency, cache=info.get("cache")
+                    )
+                    if self._surrogate is not None:
+                        self._surrogate.learn(organism)
+                    if not mock:
+                        _fitness_cache[gene_key] = (result, organism.points)
+                progress.advance(org_task)
+
+                if "pass" in result and not mock and not self.seek_bad:
+                    return organism
+        finally:
+            population.population = [o for o in population.population if id(o) not in to_remove]
+        return None
+
     def run(self, mock=False, save_only_passed=False):
         """Run a population attempting to maximize desired results."""
         if not self._method and not mock:
@@ -282,28 +712,24 @@ class GeneticEntityTester:
                 " Cannot run genetic test."
             )
             return None
+        if self.islands > 1:
+            return self._run_islands(mock, save_only_passed)
 
-        genetics_cfg = self.config.rizza.genetics
         try:
-            population = genetics.Population(
-                gene_base=[self._create_gene_base()],
-                population_count=self.population_count,
-                generator_function=self._create_gene_base,
-                gene_length=1,
-                mutate=True,
-                rev_pop_sort=not self.seek_bad,
-                crossover_method=getattr(genetics_cfg, "crossover_method", "single_point"),
-            )
+            population = self._new_population()
         except Exception as err:
             logger.error(f"Unable to create a population due to: {err}")
             return False
 
-        if not self.fresh:
-            best = self._load_test()
-            if best:
-                population.population[0].genes = best
+        start = self._load_checkpoint(population)
+        if start is None:
+            start = 0
+            if not self.fresh:
+                best = self._load_test()
+                if best:
+                    population.population[0].genes = best
 
-        depth = max(0, getattr(genetics_cfg, "recursion_depth", 0))
+        depth = dependency_pool.current_depth()
         indent = "  " * depth
 
         _owns_progress = getattr(self.config, "_progress", None) is None
@@ -313,152 +739,450 @@ class GeneticEntityTester:
 
         progress = self.config._progress
         gen_label = f"{indent}[bold]{self.entity}[/bold].[dim]{self.method}[/dim]"
-        gen_task = progress.add_task(gen_label, total=self.max_generations)
+        gen_task = progress.add_task(gen_label, total=self.max_generations, completed=start)
         org_task = progress.add_task(
             f"{indent}  [dim]generation[/dim]",
             total=self.population_count,
             visible=False,
         )
 
-        _fitness_cache = {}
+        generation = start
         try:
-            for generation in range(self.max_generations):
-                progress.update(org_task, completed=0, total=self.population_count, visible=True)
-
-                population.population.sort(key=lambda o: len(o.genes[0]))
-                to_remove = set()
-                for organism in population.population:
-                    gene_key = str(organism.genes)
-                    if not mock and gene_key in _fitness_cache:
-                        result, organism.points = _fitness_cache[gene_key]
-                    else:
-                        logger.debug(f"Testing {organism}")
-                        task = self._genes_to_task(organism.genes)
-                        try:
-                            result = task.execute(mock)
-                        except RecursionError:
-                            logger.warning(
-                                f"RecursionError testing {organism}; removing from population."
-                            )
-                            to_remove.add(id(organism))
-                            progress.advance(org_task)
-                            continue
-                        organism.points = self._judge(result, mock)
-                        if not mock:
-                            _fitness_cache[gene_key] = (result, organism.points)
-                    progress.advance(org_task)
+            for generation in range(start, self.max_generations):
+                with profiling.section(self.config, f"{self.test_name} gen {generation}"):
+                    if generation != start:
+                        self._save_checkpoint(population, generation)
+                    progress.update(
+                        org_task, completed=0, total=self.population_count, visible=True
+                    )
 
-                    if "pass" in result and not mock and not self.seek_bad:
-                        self._save_organism(organism)
-                        success_msg = "Success! Generation {} passed with:\n{}".format(
-                            generation,
-                            yaml.dump(
-                                attr.asdict(
-                                    self._genes_to_task(organism.genes),
-                                    filter=lambda a, value: a.name != "config",
-                                ),
-                                default_flow_style=False,
-                            ),
-                        )
-                        logger.info(success_msg)
-                        progress.console.print(
-                            f"[bold green]✓[/bold green] "
-                            f"[bold]{self.entity}.{self.method}[/bold] "
-                            f"passed at generation {generation}!"
-                        )
+                    passed = self._evaluate_population(
+                        population, progress, org_task, mock, generation=generation
+                    )
+                    if passed is not None:
+                        self._report_success(passed, generation, progress)
+                        self._checkpoint.clear()
                         return True
 
-                population.population = [
-                    o for o in population.population if id(o) not in to_remove
-                ]
-                if not population.population:
-                    progress.update(gen_task, advance=1)
-                    progress.update(org_task, visible=False)
-                    continue
+                    if not population.population:
+                        progress.update(gen_task, advance=1)
+                        progress.update(org_task, visible=False)
+                        continue
 
-                population.sort_population()
-                best = population.population[0]
-                progress.update(
-                    gen_task,
-                    advance=1,
-                    description=f"{gen_label} [green]best={best.points}[/green]",
-                )
-                progress.update(org_task, visible=False)
-                population.breed_population(
-                    type_pools=self._type_pools,
-                    tournament_size=getattr(genetics_cfg, "tournament_size", 3),
-                    elite_percentage=getattr(genetics_cfg, "elite_percentage", 5),
-                    immigration_rate=getattr(genetics_cfg, "immigration_rate", 5),
-                    available_genes=self._available_params,
-                )
+                    population.sort_population()
+                    best = population.population[0]
+                    progress.update(
+                        gen_task,
+                        advance=1,
+                        description=f"{gen_label} [green]best={best.points}[/green]",
+                    )
+                    progress.update(org_task, visible=False)
+                    self._breed(population)
 
+            self._checkpoint.clear()
             if not mock and not save_only_passed and population.population:
                 self._save_organism(population.population[0])
+        except BaseException:
+            # Interrupted or crashed: keep everything evaluated so far for --resume
+            self._save_checkpoint(population, generation, force=True)
+            raise
         finally:
+            self._report_surrogate()
+            self._save_constraints()
             progress.remove_task(org_task)
             progress.remove_task(gen_task)
             if _owns_progress:
                 self.config._progress.stop()
                 self.config._progress = None
+                metrics.write_report(self.config)
+                events.flush(self.config)
 
-    def run_best(self):
-        """Pull the best saved test, if any, run it, and return the id."""
-        saved_allow_recursion = self.config.rizza.genetics.allow_recursion
-        saved_max_generations = self.config.rizza.genetics.max_generations
-        self.config.rizza.genetics.allow_recursion = False
-        self.config.rizza.genetics.max_generations = 1
+    def _run_islands(self, mock=False, save_only_passed=False):
+        """Evolve several populations side by side, trading their best organisms.
+
+        The population_count organisms are split between the islands. Islands differ in
+        crossover method and mutation rate, evaluate in parallel threads, and every
+        genetics.migration_interval generations each sends copies of its
+        genetics.migration_size best organisms to the next island in a ring.
+        """
+        genetics_cfg = self.config.rizza.genetics
+        interval = max(1, getattr(genetics_cfg, "migration_interval", 5))
+        migrants = max(1, getattr(genetics_cfg, "migration_size", 2))
+        island_size = max(2, self.population_count // self.islands)
         try:
-            test = self._load_test()
-            if test:
-                task = self._genes_to_task(test)
-                logger.info(f"Creating {self.entity}...")
-                try:
-                    result = task.execute()
-                except RecursionError:
-                    logger.warning(f"RecursionError in run_best for {self.entity}; returning -1.")
-                    return -1
-                if "pass" in result:
-                    return result["pass"].get("id", -1)
-            return -1
+            islands = [
+                self._new_population(
+                    population_count=island_size,
+                    crossover_method=ISLAND_CROSSOVERS[index % len(ISLAND_CROSSOVERS)],
+                    mutation_scale=ISLAND_MUTATION_SCALES[index % len(ISLAND_MUTATION_SCALES)],
+                )
+                for index in range(self.islands)
+            ]
+        except Exception as err:
+            logger.error(f"Unable to create island populations due to: {err}")
+            return False
+
+        if not self.fresh:
+            best = self._load_test()
+            if best:
+                for island in islands:
+                    island.population[0].genes = [list(genes) for genes in best]
+
+        _owns_progress = getattr(self.config, "_progress", None) is None
+        if _owns_progress:
+            self.config._progress = _make_progress()
+            self.config._progress.start()
+
+        progress = self.config._progress
+        gen_label = (
+            f"[bold]{self.entity}[/bold].[dim]{self.method}[/dim] "
+            f"[italic]{self.islands} islands[/italic]"
+        )
+        gen_task = progress.add_task(gen_label, total=self.max_generations)
+        org_task = progress.add_task("  [dim]generation[/dim]", visible=False)
+
+        try:
+            with executors.ContextThreadPoolExecutor(max_workers=self.islands) as pool:
+                for generation in range(self.max_generations):
+                    with profiling.section(self.config, f"{self.test_name} gen {generation}"):
+                        progress.update(
+                            org_task, completed=0, total=island_size * self.islands, visible=True
+                        )
+                        passed = [
+                            organism
+                            for organism in pool.map(
+                                lambda island, generation=generation: self._evaluate_population(
+                                    island, progress, org_task, mock, generation=generation
+                                ),
+                                islands,
+                            )
+                            if organism is not None
+                        ]
+                        if passed:
+                            self._report_success(passed[0], generation, progress, "islands")
+                            return True
+
+                        populated = [island for island in islands if island.population]
+                        for island in populated:
+                            island.sort_population()
+                        if populated:
+                            best = max(
+                                (island.population[0] for island in populated),
+                                key=lambda org: org.points if not self.seek_bad else -org.points,
+                            )
+                            progress.update(
+                                gen_task,
+                                description=f"{gen_label} [green]best={best.points}[/green]",
+                            )
+                        progress.update(gen_task, advance=1)
+                        progress.update(org_task, visible=False)
+                        list(pool.map(self._breed, populated))
+                        if len(populated) > 1 and (generation + 1) % interval == 0:
+                            genetics.migrate(populated, migrants)
+
+            if not mock and not save_only_passed:
+                finalists = [island.population[0] for island in islands if island.population]
+                if finalists:
+                    self._save_organism(
+                        max(finalists, key=lambda o: o.points if not self.seek_bad else -o.points)
+                    )
         finally:
-            self.config.rizza.genetics.allow_recursion = saved_allow_recursion
-            self.config.rizza.genetics.max_generations = saved_max_generations
+            self._report_surrogate()
+            self._save_constraints()
+            progress.remove_task(org_task)
+            progress.remove_task(gen_task)
+            if _owns_progress:
+                self.config._progress.stop()
+                self.config._progress = None
+                metrics.write_report(self.config)
+                events.flush(self.config)
+
+    def run_best(self):
+        """Pull the best saved test, if any, run it, and return the id.
+
+        The replay never starts new genetic searches for unknown dependencies.
+        """
+        test = self._load_test()
+        if test:
+            task = self._genes_to_task(test)
+            logger.info(f"Creating {self.entity}...")
+            try:
+                result = self._run_task(task, recursion=False)
+            except RecursionError:
+                logger.warning(f"RecursionError in run_best for {self.entity}; returning -1.")
+                return -1
+            if "pass" in result:
+                return result["pass"].get("id", -1)
+        return -1
 
 
 @attr.s()
 class AsyncGeneticEntityTester(GeneticEntityTester):
-    """An asynchronous version of the GeneticEntityTester."""
+    """An asynchronous version of the GeneticEntityTester.
+
+    :param max_running: Integer limit on evaluations in flight at once. With
+        genetics.adaptive_concurrency, the limit adapts to Satellite's latency and
+        overload rate, up to this ceiling.
+    :param executor: "thread" to evaluate in the loop's thread executor, or "process"
+        to evaluate in a pool of worker processes.
+    :param steady_state: Boolean noting whether to replace organisms one at a time as their
+        evaluations finish, instead of waiting for whole generations.
+    """
 
     max_running = attr.ib(default=25)
+    executor = attr.ib(default="thread", validator=attr.validators.in_(executors.EXECUTOR_TYPES))
+    steady_state = attr.ib(default=None)
 
     def __attrs_post_init__(self):
         """Setup our remaining helpers."""
         super().__attrs_post_init__()
-        self.max_running = asyncio.Semaphore(self.max_running)
+        if self.steady_state is None:
+            self.steady_state = getattr(self.config.rizza.genetics, "steady_state", False)
+        self._concurrency = self.max_running
+        self._control = concurrency.get_concurrency(self.config, self.max_running)
+        # {id(organism): (latency, cache)} until the organism's event is recorded
+        self._evaluations = {}
         self._results = asyncio.Queue()
+        self._process_pool = None
+
+    async def _dispatch(self, task, mock=False):
+        """Execute a task in the configured executor."""
+        recorder = metrics.get_metrics(self.config)
+        with recorder.tracking(), recorder.timer("evaluation", task.entity, task.method) as timing:
+            if self._process_pool is not None:
+                result = await self.loop.run_in_executor(
+                    self._process_pool,
+                    executors.evaluate_task,
+                    task.entity,
+                    task.method,
+                    task.arg_dict,
+                    mock,
+                )
+            else:
+                result = await self.loop.run_in_executor(None, self._run_task, task, mock)
+            timing.status = metrics.outcome(result)
+        return result
+
+    async def _execute_task_async(self, task, mock=False, info=None):
+        """Execute a task under the concurrency controller, using the result cache when possible.
+
+        Results that still show an overloaded server after the controller's retries are
+        returned but not cached or learned from.
+        """
+        result = self._cached_result(task, mock, info)
+        if result is not None:
+            return result
+        cache = None if mock else result_cache.get_result_cache(self.config)
+        result = await self._control.call(lambda: self._dispatch(task, mock))
+        if concurrency.is_overload(result):
+            return result
+        if cache is not None:
+            cache.put(task, result)
+        self._harvest(task, result)
+        if not mock:
+            self._learn(task, result)
+        return result
+
+    async def _evaluate(self, organism, mock=False, judge=True):
+        """Execute and judge one organism.
+
+        :param judge: Score the organism now; generational runs judge a whole generation
+            together afterwards instead.
+        :returns: (result, organism), with a None result if the organism must be dropped,
+            as it is when the server was still overloaded after the last retry.
+        """
+        task = self._genes_to_task(organism.genome)
+        info = {}
+        started = time.perf_counter()
+        try:
+            result = await self._execute_task_async(task, mock, info)
+        except RecursionError:
+            logger.warning(f"RecursionError testing {organism}; removing from population.")
+            return None, organism
+        except Exception as err:
+            logger.error(err)
+            result = "Unhandled Exception"
+        self._evaluations[id(organism)] = (time.perf_counter() - started, info.get("cache"))
+        if concurrency.is_overload(result):
+            # The server failed, not the organism, so there's nothing to score
+            logger.warning(f"Satellite stayed overloaded testing {organism}; dropping it.")
+            return None, organism
+        if judge:
+            organism.points = self._judge(result, mock)
+            logger.debug(f"Tested {organism}")
+        return result, organism
 
     async def _run_org(self, organism, mock=False):
-        async with self.max_running:
-            task = self._genes_to_task(organism.genes)
-            try:
-                result = await self.loop.run_in_executor(None, task.execute, mock)
-            except RecursionError:
-                logger.warning(f"RecursionError testing {organism}; removing from population.")
-                await self._results.put((None, organism))
-                return
-            except Exception as err:
-                logger.error(err)
-                result = "Unhandled Exception"
-        organism.points = self._judge(result, mock)
-        logger.debug(f"Tested {organism}")
-        await self._results.put((result, organism))
+        await self._results.put(await self._evaluate(organism, mock, judge=False))
 
     async def test_population(self, mock=False):
-        """Run the tests passed in and return the log file."""
-        tasks = [
-            asyncio.ensure_future(self._run_org(org, mock)) for org in self._population.population
-        ]
-        await asyncio.wait(tasks)
+        """Run the tests passed in and return the log file.
+
+        Organisms already in the run's fitness cache reuse their cached result.
+        """
+        organisms = []
+        for org in self._population.population:
+            cached = None if mock else self._fitness_cache.get(org.genome)
+            if cached is None:
+                organisms.append(org)
+            else:
+                self._evaluations[id(org)] = (None, "fitness")
+                self._results.put_nowait((cached[0], org))
+        if self._surrogate is not None:
+            organisms = self._surrogate.select(organisms)
+        tasks = [asyncio.ensure_future(self._run_org(org, mock)) for org in organisms]
+        if tasks:
+            await asyncio.wait(tasks)
+
+    async def _evolve_steady_state(self, progress, gen_task, org_task, gen_label, *, mock=False):
+        """Evolve without generation barriers.
+
+        Every time an evaluation finishes, its organism replaces the worst member of the
+        population and a new offspring is bred and dispatched, so all max_running slots
+        stay busy. A "generation" is population_count completed evaluations.
+
+        :returns: (passing organism or None, generation reached)
+        """
+        genetics_cfg = self.config.rizza.genetics
+        population = self._population
+        seeds = population.population
+        population.population = []
+        budget = self.max_generations * self.population_count
+        dispatched = completed = 0
+        in_flight = set()
+        progress.update(org_task, completed=0, total=self.population_count, visible=True)
+        try:
+            while True:
+                while len(in_flight) < self._concurrency and dispatched < budget:
+                    if seeds:
+                        organism = seeds.pop()
+                    else:
+                        organism = population.breed_offspring(
+                            type_pools=self._type_pools,
+                            tournament_size=getattr(genetics_cfg, "tournament_size", 3),
+                            immigration_rate=getattr(genetics_cfg, "immigration_rate", 5),
+                            available_genes=self._available_params,
+                        )
+                    in_flight.add(asyncio.ensure_future(self._evaluate(organism, mock)))
+                    dispatched += 1
+                if not in_flight:
+                    if population.population:
+                        population.sort_population()
+                    return None, completed // self.population_count
+
+                done, in_flight = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    result, organism = future.result()
+                    completed += 1
+                    generation = completed // self.population_count
+                    progress.advance(org_task)
+                    if completed % self.population_count == 0:
+                        progress.update(gen_task, advance=1)
+                        progress.update(org_task, completed=0)
+                        if population.population:
+                            population.sort_population()
+                            best = population.population[0]
+                            progress.update(
+                                gen_task,
+                                description=f"{gen_label} [green]best={best.points}[/green]",
+                            )
+                    latency, cache = self._evaluations.pop(id(organism), (None, None))
+                    if result is None:
+                        continue
+                    self._record_event(organism, result, generation, latency=latency, cache=cache)
+                    if "pass" in result and not mock and not self.seek_bad:
+                        return organism, generation
+                    population.replace_worst(organism)
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def _evolve_generations(self, progress, gen_task, org_task, gen_label, *, mock=False, start=0):
+        """Evolve one full generation at a time, waiting for every organism in between.
+
+        :param start: Generation to start from (when resuming from a checkpoint).
+        :returns: (passing organism or None, generation reached)
+        """
+        genetics_cfg = self.config.rizza.genetics
+        _fitness_cache = self._fitness_cache
+        generation = start
+        try:
+            for generation in range(start, self.max_generations):
+                with profiling.section(self.config, f"{self.test_name} gen {generation}"):
+                    if generation != start:
+                        self._save_checkpoint(self._population, generation)
+                    progress.update(
+                        org_task, completed=0, total=self.population_count, visible=True
+                    )
+
+                    self._runtime.run(self.test_population(mock))
+
+                    evaluated = []
+                    while self._results.qsize() > 0:
+                        evaluated.append(self._results.get_nowait())
+                    judged = [
+                        (result, organism) for result, organism in evaluated if result is not None
+                    ]
+                    scores = self._judge_many([result for result, _ in judged], mock)
+                    for (_, organism), points in zip(judged, scores, strict=True):
+                        organism.points = points
+                        if self._surrogate is not None:
+                            self._surrogate.learn(organism)
+                        logger.debug(f"Tested {organism}")
+
+                    to_remove = set()
+                    passed_organism = None
+                    for result, organism in evaluated:
+                        latency, cache = self._evaluations.pop(id(organism), (None, None))
+                        if result is None:
+                            to_remove.add(id(organism))
+                            progress.advance(org_task)
+                            continue
+                        self._record_event(
+                            organism, result, generation, latency=latency, cache=cache
+                        )
+                        if not mock:
+                            gene_key = organism.genome
+                            _fitness_cache[gene_key] = (result, organism.points)
+                        if "pass" in result and not mock and not self.seek_bad:
+                            passed_organism = organism
+                        progress.advance(org_task)
+
+                    self._population.population = [
+                        o for o in self._population.population if id(o) not in to_remove
+                    ]
+
+                    if passed_organism is not None:
+                        return passed_organism, generation
+
+                    if not self._population.population:
+                        progress.update(gen_task, advance=1)
+                        progress.update(org_task, visible=False)
+                        continue
+
+                    self._population.sort_population()
+                    best = self._population.population[0]
+                    progress.update(
+                        gen_task,
+                        advance=1,
+                        description=f"{gen_label} [green]best={best.points}[/green]",
+                    )
+                    progress.update(org_task, visible=False)
+                    self._population.breed_population(
+                        type_pools=self._type_pools,
+                        tournament_size=getattr(genetics_cfg, "tournament_size", 3),
+                        elite_percentage=getattr(genetics_cfg, "elite_percentage", 5),
+                        immigration_rate=getattr(genetics_cfg, "immigration_rate", 5),
+                        available_genes=self._available_params,
+                    )
+
+            return None, self.max_generations
+        except BaseException:
+            # Interrupted or crashed: keep everything evaluated so far for --resume
+            self._save_checkpoint(self._population, generation, force=True)
+            raise
 
     def run(self, mock=False, save_only_passed=False):
         """Run a population attempting to maximize desired results."""
@@ -466,27 +1190,22 @@ class AsyncGeneticEntityTester(GeneticEntityTester):
             logger.warning(f"{self.entity} does not have the method {self.method}")
             return None
 
-        genetics_cfg = self.config.rizza.genetics
         try:
-            self._population = genetics.Population(
-                gene_base=[self._create_gene_base()],
-                population_count=self.population_count,
-                generator_function=self._create_gene_base,
-                gene_length=1,
-                mutate=True,
-                rev_pop_sort=not self.seek_bad,
-                crossover_method=getattr(genetics_cfg, "crossover_method", "single_point"),
-            )
+            self._population = self._new_population()
         except Exception as err:
             logger.error(f"Unable to create a population due to: {err}")
             return False
 
-        if not self.fresh:
-            best = self._load_test()
-            if best:
-                self._population.population[0].genes = best
+        # Steady-state runs have no generation boundaries to checkpoint at
+        start = None if self.steady_state else self._load_checkpoint(self._population)
+        if start is None:
+            start = 0
+            if not self.fresh:
+                best = self._load_test()
+                if best:
+                    self._population.population[0].genes = best
 
-        depth = max(0, getattr(genetics_cfg, "recursion_depth", 0))
+        depth = dependency_pool.current_depth()
         indent = "  " * depth
 
         _owns_progress = getattr(self.config, "_progress", None) is None
@@ -498,88 +1217,47 @@ class AsyncGeneticEntityTester(GeneticEntityTester):
         gen_label = (
             f"{indent}[bold]{self.entity}[/bold].[dim]{self.method}[/dim] [italic]async[/italic]"
         )
-        gen_task = progress.add_task(gen_label, total=self.max_generations)
+        gen_task = progress.add_task(gen_label, total=self.max_generations, completed=start)
         org_task = progress.add_task(
             f"{indent}  [dim]generation[/dim]",
             total=self.population_count,
             visible=False,
         )
 
-        _fitness_cache = {}
-        try:
-            for generation in range(self.max_generations):
-                progress.update(org_task, completed=0, total=self.population_count, visible=True)
-
-                self.loop = asyncio.new_event_loop()
-                self._results.empty()
-                self.loop.run_until_complete(self.test_population(mock))
-                self.loop.close()
-
-                to_remove = set()
-                passed_organism = None
-                while self._results.qsize() > 0:
-                    result, organism = self._results.get_nowait()
-                    if result is None:
-                        to_remove.add(id(organism))
-                        progress.advance(org_task)
-                        continue
-                    if not mock:
-                        gene_key = str(organism.genes)
-                        _fitness_cache[gene_key] = (result, organism.points)
-                    if "pass" in result and not mock and not self.seek_bad:
-                        passed_organism = organism
-                    progress.advance(org_task)
-
-                self._population.population = [
-                    o for o in self._population.population if id(o) not in to_remove
-                ]
-
-                if passed_organism is not None:
-                    self._save_organism(passed_organism)
-                    success_msg = "Success! Generation {} passed with:\n{}".format(
-                        generation,
-                        yaml.dump(
-                            attr.asdict(
-                                self._genes_to_task(passed_organism.genes),
-                                filter=lambda a, value: a.name != "config",
-                            ),
-                            default_flow_style=False,
-                        ),
-                    )
-                    logger.info(success_msg)
-                    progress.console.print(
-                        f"[bold green]✓[/bold green] "
-                        f"[bold]{self.entity}.{self.method}[/bold] "
-                        f"passed at generation {generation}! (async)"
+        with executors.async_runtime(self.config, self._concurrency) as runtime:
+            self._runtime = runtime
+            self.loop = runtime.loop
+            try:
+                if self.executor == "process":
+                    self._process_pool = runtime.process_pool()
+                if self.steady_state:
+                    with profiling.section(self.config, f"{self.test_name} steady state"):
+                        passed, generation = runtime.run(
+                            self._evolve_steady_state(
+                                progress, gen_task, org_task, gen_label, mock=mock
+                            )
+                        )
+                else:
+                    passed, generation = self._evolve_generations(
+                        progress, gen_task, org_task, gen_label, mock=mock, start=start
                     )
+                    self._checkpoint.clear()
+                if passed is not None:
+                    self._report_success(passed, generation, progress, "async")
                     return True
 
-                if not self._population.population:
-                    progress.update(gen_task, advance=1)
-                    progress.update(org_task, visible=False)
-                    continue
-
-                self._population.sort_population()
-                best = self._population.population[0]
-                progress.update(
-                    gen_task,
-                    advance=1,
-                    description=f"{gen_label} [green]best={best.points}[/green]",
-                )
-                progress.update(org_task, visible=False)
-                self._population.breed_population(
-                    type_pools=self._type_pools,
-                    tournament_size=getattr(genetics_cfg, "tournament_size", 3),
-                    elite_percentage=getattr(genetics_cfg, "elite_percentage", 5),
-                    immigration_rate=getattr(genetics_cfg, "immigration_rate", 5),
-                    available_genes=self._available_params,
-                )
-
-            if not mock and not save_only_passed and self._population.population:
-                self._save_organism(self._population.population[0])
-        finally:
-            progress.remove_task(org_task)
-            progress.remove_task(gen_task)
-            if _owns_progress:
-                self.config._progress.stop()
-                self.config._progress = None
+                if not mock and not save_only_passed and self._population.population:
+                    self._save_organism(self._population.population[0])
+            finally:
+                self._process_pool = None
+                if self._control.adaptive:
+                    logger.info(self._control.report())
+                self._report_surrogate()
+                self._save_constraints()
+                progress.remove_task(org_task)
+                progress.remove_task(gen_task)
+                if _owns_progress:
+                    self.config._progress.stop()
+                    self.config._progress = None
+                    metrics.write_report(self.config)
+                    events.flush(self.config)
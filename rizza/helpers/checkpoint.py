@@ -0,0 +1,108 @@
+"""Save and restore the state of a long genetic run between generations.
+
+A checkpoint holds everything a run needs to carry on from the generation it stopped
+at: every organism's genes and points, the population's stagnation tracking, the
+state of the random module and the points of the run's most recent evaluations. Raw
+results aren't kept; the resumed run gets them back from the result cache. It is
+written as zlib-compressed JSON, replacing the previous checkpoint atomically.
+"""
+
+import json
+import logging
+from pathlib import Path
+import random
+import zlib
+
+import attr
+
+from rizza.helpers.genome import Genome
+from rizza.helpers.misc import lenient_json_serial
+
+logger = logging.getLogger(__name__)
+
+VERSION = 2
+# Most fitness cache entries (the most recent ones) kept in a checkpoint
+FITNESS_WINDOW = 10000
+
+
+def checkpoint_path(config, test_name):
+    """Return the checkpoint file for a test name ("Organization create positive")."""
+    return config.base_dir.joinpath(f"data/checkpoints/{test_name}.ckpt")
+
+
+def capture(test_name, generation, population, fitness_cache):
+    """Return a run's state as JSON-serializable data.
+
+    :param generation: The generation the run should continue from.
+    :param fitness_cache: {Genome: (result, points)}, oldest evaluation first. Only the
+        points of the last FITNESS_WINDOW entries are kept.
+    """
+    version, internal, gauss_next = random.getstate()
+    return {
+        "version": VERSION,
+        "test_name": test_name,
+        "generation": generation,
+        "population": [[org.genes, org.points] for org in population.population],
+        "best_score": population._best_score,
+        "stagnation": population._stagnation_counter,
+        "random": [version, list(internal), gauss_next],
+        "fitness": [
+            [genome.arg_dict(), points]
+            for genome, (_, points) in list(fitness_cache.items())[-FITNESS_WINDOW:]
+        ],
+    }
+
+
+def restore(state, population):
+    """Load a captured state back into a population and the random module.
+
+    :returns: (generation to continue from, {Genome: points})
+    """
+    from rizza.helpers.genetics import Organism
+
+    population.population = [
+        Organism(genes=genes, points=points) for genes, points in state["population"]
+    ]
+    population._best_score = state["best_score"]
+    population._stagnation_counter = state["stagnation"]
+    version, internal, gauss_next = state["random"]
+    random.setstate((version, tuple(internal), gauss_next))
+    scores = {Genome.from_arg_dict(arg_dict): points for arg_dict, points in state["fitness"]}
+    return state["generation"], scores
+
+
+@attr.s()
+class Checkpoint:
+    """One run's checkpoint file.
+
+    :param path: File the checkpoint is written to.
+    """
+
+    path = attr.ib(converter=lambda path: Path(path).expanduser())
+
+    def save(self, state):
+        """Write a captured state, replacing any earlier checkpoint."""
+        data = zlib.compress(json.dumps(state, default=lenient_json_serial).encode(), 6)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(self.path)
+        logger.debug(f"Checkpointed generation {state['generation']} to {self.path}.")
+
+    def load(self):
+        """Return the saved state, or None if there's no usable checkpoint."""
+        if not self.path.exists():
+            return None
+        try:
+            state = json.loads(zlib.decompress(self.path.read_bytes()))
+        except (zlib.error, ValueError) as err:
+            logger.warning(f"Ignoring unreadable checkpoint {self.path}: {err}")
+            return None
+        if state.get("version") != VERSION:
+            logger.warning(f"Ignoring checkpoint {self.path} from another rizza version.")
+            return None
+        return state
+
+    def clear(self):
+        """Remove the checkpoint, once its run has finished."""
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,328 @@
+"""Keep Satellite busy without overloading it.
+
+A fixed async limit is either too low (Satellite sits idle) or too high (it answers
+with 500s and timeouts, which are then scored as if the organism caused them). The
+AdaptiveConcurrency controller replaces the fixed semaphore:
+
+- an AIMDLimiter raises the number of calls in flight by one each round while p95
+  latency stays near its baseline, and halves it when latency or the overload rate
+  climbs,
+- a CircuitBreaker stops dispatching for a cooldown after several overloads in a row,
+  then lets one probe call through before reopening, and
+- results that look like overload (5xx server errors, timeouts, dropped connections)
+  are retried instead of being scored.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager, suppress
+import logging
+import re
+import time
+
+import attr
+
+from rizza.helpers.criteria import flatten
+
+logger = logging.getLogger(__name__)
+
+OVERLOAD_PATTERNS = (
+    re.compile(r"\b5\d\d (?:Server Error|Service Unavailable)\b"),
+    re.compile(r"Internal Server Error|Service Unavailable|Bad Gateway|Gateway Time-?out"),
+    re.compile(
+        r"\b(?:ReadTimeout|ConnectTimeout|Timeout|TimeoutError|ConnectionError|"
+        r"ChunkedEncodingError|ProtocolError|RemoteDisconnected|MaxRetryError)\b"
+    ),
+)
+
+
+def is_overload(result):
+    """Whether a result failed because of the server or network, not the request."""
+    if not isinstance(result, dict) or "fail" not in result:
+        return False
+    text = flatten(result["fail"])
+    return any(pattern.search(text) for pattern in OVERLOAD_PATTERNS)
+
+
+def percentile(values, fraction):
+    """Return the value at a fraction (0-1) of the way through the sorted values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+@attr.s()
+class AIMDLimiter:
+    """An additive-increase, multiplicative-decrease limit on calls in flight.
+
+    Completed calls are grouped into rounds of about one limit's worth. After each
+    round, the limit is cut if the round's overload rate reached error_threshold or its
+    p95 latency exceeded latency_tolerance times the baseline, and raised otherwise.
+    The baseline is the lowest round p95 seen, allowed to drift up a little each round
+    so a lasting change in Satellite's speed doesn't pin the limit down.
+
+    :param limit: Starting limit.
+    :param minimum: Lowest the limit may go.
+    :param maximum: Highest the limit may go.
+    :param increase: Added to the limit after a healthy round.
+    :param decrease: Factor the limit is multiplied by after an unhealthy round.
+    :param latency_tolerance: p95/baseline ratio that counts as latency climbing.
+    :param error_threshold: Share of overloaded results that counts as overload.
+    :param min_round: Fewest samples in a round.
+    """
+
+    limit = attr.ib(default=10)
+    minimum = attr.ib(default=1)
+    maximum = attr.ib(default=100)
+    increase = attr.ib(default=1)
+    decrease = attr.ib(default=0.5)
+    latency_tolerance = attr.ib(default=1.5)
+    error_threshold = attr.ib(default=0.1)
+    min_round = attr.ib(default=5)
+
+    # How much the latency baseline may rise each round
+    BASELINE_DRIFT = 0.05
+
+    def __attrs_post_init__(self):
+        """Clamp the starting limit and start the first round."""
+        self.limit = max(self.minimum, min(self.maximum, self.limit))
+        self.baseline = None
+        self._latencies = []
+        self._overloads = 0
+
+    def record(self, latency, overloaded=False):
+        """Add one completed call; the limit changes at the end of each round.
+
+        :returns: The new limit when it changed, otherwise None.
+        """
+        self._latencies.append(latency)
+        self._overloads += bool(overloaded)
+        if len(self._latencies) < max(self.min_round, self.limit):
+            return None
+        p95 = percentile(self._latencies, 0.95)
+        error_rate = self._overloads / len(self._latencies)
+        self._latencies = []
+        self._overloads = 0
+        slow = self.baseline is not None and p95 > self.baseline * self.latency_tolerance
+        if self.baseline is None:
+            self.baseline = p95
+        else:
+            self.baseline = min(p95, self.baseline * (1 + self.BASELINE_DRIFT))
+
+        old = self.limit
+        if error_rate >= self.error_threshold or slow:
+            self.limit = max(self.minimum, int(self.limit * self.decrease))
+        else:
+            self.limit = min(self.maximum, self.limit + self.increase)
+        if self.limit == old:
+            return None
+        logger.debug(
+            f"Concurrency limit {old} -> {self.limit} (p95 {p95:.2f}s, "
+            f"baseline {self.baseline:.2f}s, overload rate {error_rate:.0%})"
+        )
+        return self.limit
+
+
+@attr.s()
+class CircuitBreaker:
+    """Stop dispatching while the server is overloaded.
+
+    :param threshold: Overloaded results in a row that open the breaker (0 disables it).
+    :param cooldown: Seconds the breaker stays open before letting a probe through.
+    :param clock: Callable returning the current time in seconds.
+    """
+
+    threshold = attr.ib(default=5)
+    cooldown = attr.ib(default=30.0)
+    clock = attr.ib(default=time.monotonic, repr=False)
+
+    def __attrs_post_init__(self):
+        """Start closed."""
+        self.state = "closed"
+        self.trips = 0
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def remaining(self):
+        """Seconds until an open breaker lets a probe through (0 if it would now)."""
+        if self.state != "open":
+            return 0.0
+        return max(0.0, self._opened_at + self.cooldown - self.clock())
+
+    def allow(self):
+        """Whether a call may be dispatched now.
+
+        An open breaker whose cooldown has passed becomes half open and allows exactly
+        one probe call until that call's result is recorded.
+        """
+        if self.state == "open" and not self.remaining():
+            self.state = "half_open"
+            self._probing = False
+        if self.state == "half_open":
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+        return self.state == "closed"
+
+    def abandon(self):
+        """Forget a call that ended without a result, so it can't hold the probe."""
+        self._probing = False
+
+    def record(self, overloaded):
+        """Update the breaker with one call's outcome."""
+        if not self.threshold:
+            return
+        if not overloaded:
+            if self.state != "closed":
+                logger.info("Satellite is answering again; resuming dispatch.")
+            self.state = "closed"
+            self._failures = 0
+            self._probing = False
+            return
+        self._failures += 1
+        if self.state == "half_open" or self._failures >= self.threshold:
+            if self.state == "closed":
+                self.trips += 1
+                logger.warning(
+                    f"{self._failures} overloaded results in a row; pausing dispatch for "
+                    f"{self.cooldown}s."
+                )
+            self.state = "open"
+            self._opened_at = self.clock()
+            self._probing = False
+
+
+@attr.s()
+class AdaptiveConcurrency:
+    """Gate async calls with an AIMDLimiter and a CircuitBreaker.
+
+    Use it from one event loop only.
+
+    :param limiter: The AIMDLimiter deciding how many calls may be in flight.
+    :param breaker: The CircuitBreaker pausing dispatch during overload.
+    :param retries: Times an overloaded result is retried before it's kept.
+    :param adaptive: False when the limit is fixed, so there's nothing to report.
+    """
+
+    limiter = attr.ib(factory=AIMDLimiter)
+    breaker = attr.ib(factory=CircuitBreaker)
+    retries = attr.ib(default=2)
+    adaptive = attr.ib(default=True)
+
+    def __attrs_post_init__(self):
+        """Start with nothing in flight."""
+        self.in_flight = 0
+        self.requeued = 0
+        self._changed = None
+
+    @property
+    def limit(self):
+        """The current limit on calls in flight."""
+        return self.limiter.limit
+
+    def _wake(self):
+        if self._changed is not None:
+            self._changed.set()
+
+    async def acquire(self):
+        """Wait for a free slot and a closed (or probing) circuit breaker."""
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        while True:
+            if self.in_flight < self.limiter.limit and self.breaker.allow():
+                self.in_flight += 1
+                return
+            self._changed.clear()
+            timeout = self.breaker.remaining() or None
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._changed.wait(), timeout)
+
+    def release(self, latency=None, overloaded=False):
+        """Free a slot, recording how the call went unless latency is None.
+
+        An unrecorded call gives up the circuit breaker's probe if it held it.
+        """
+        self.in_flight -= 1
+        if latency is None:
+            self.breaker.abandon()
+        else:
+            self.limiter.record(latency, overloaded)
+            self.breaker.record(overloaded)
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold a slot for one call; the call's result is set with slot.result = ...
+
+        Calls that raise free their slot without being recorded; a half-open breaker's
+        probe that raises lets the next call probe instead.
+        """
+        await self.acquire()
+        call = _Call()
+        started = time.monotonic()
+        try:
+            yield call
+        except BaseException:
+            self.release()
+            raise
+        call.overloaded = is_overload(call.result)
+        self.release(time.monotonic() - started, call.overloaded)
+
+    async def call(self, func):
+        """Await func() in a slot, retrying overloaded results up to retries times.
+
+        :param func: Callable returning an awaitable that resolves to a result.
+        :returns: The first result that wasn't overloaded, or the last one.
+        """
+        for attempt in range(self.retries + 1):
+            async with self.slot() as call:
+                call.result = await func()
+            if not call.overloaded or attempt == self.retries:
+                return call.result
+            self.requeued += 1
+            logger.debug(f"Requeueing an evaluation that hit an overloaded server: {call.result}")
+        return None
+
+    def report(self):
+        """Return a one-line summary of what the controller did."""
+        return (
+            f"Concurrency limit ended at {self.limit}; {self.requeued} overloaded evaluations "
+            f"requeued, circuit breaker tripped {self.breaker.trips} times."
+        )
+
+
+@attr.s(slots=True)
+class _Call:
+    """The outcome of one call made in an AdaptiveConcurrency slot."""
+
+    result = attr.ib(default=None)
+    overloaded = attr.ib(default=False)
+
+
+def get_concurrency(config, max_running):
+    """Return an AdaptiveConcurrency for one run, capped at max_running calls in flight.
+
+    With genetics.adaptive_concurrency disabled, the limit is fixed at
+    max_running and there's no circuit breaker or retrying, like a plain semaphore.
+    """
+    genetics_cfg = getattr(getattr(config, "rizza", None), "genetics", None)
+    if not getattr(genetics_cfg, "adaptive_concurrency", True):
+        return AdaptiveConcurrency(
+            limiter=AIMDLimiter(limit=max_running, minimum=max_running, maximum=max_running),
+            breaker=CircuitBreaker(threshold=0),
+            retries=0,
+            adaptive=False,
+        )
+    return AdaptiveConcurrency(
+        limiter=AIMDLimiter(
+            limit=min(max_running, getattr(genetics_cfg, "concurrency_initial", 10)),
+            maximum=max_running,
+            latency_tolerance=getattr(genetics_cfg, "concurrency_latency_tolerance", 1.5),
+            error_threshold=getattr(genetics_cfg, "concurrency_error_threshold", 0.1),
+        ),
+        breaker=CircuitBreaker(
+            threshold=getattr(genetics_cfg, "breaker_threshold", 5),
+            cooldown=getattr(genetics_cfg, "breaker_cooldown", 30),
+        ),
+        retries=getattr(genetics_cfg, "overload_retries", 2),
+    )
@@ -5,7 +5,6 @@ import shutil
 
 import attr
 from picoconf import PicoConf
-import yaml
 
 from rizza.helpers.logging import setup_logging
 
@@ -25,6 +24,41 @@ DEFAULT_CONFIG = {
         "elite_percentage": 5,
         "immigration_rate": 5,
         "crossover_method": "single_point",
+        "population_engine": "list",
+        "process_workers": None,
+        "steady_state": False,
+        "entity_workers": 4,
+        "result_cache": True,
+        "result_cache_max_entries": 100000,
+        "result_cache_ttl": 604800,
+        "dependency_pool": True,
+        "dependency_pool_size": 10,
+        "dependency_pool_batch": 3,
+        "dependency_pool_ttl": 600,
+        "surrogate": False,
+        "surrogate_fraction": 0.5,
+        "surrogate_exploration": 0.1,
+        "surrogate_warmup": 50,
+        "learn_constraints": True,
+        "constraint_strikes": 3,
+        "checkpoint_every": 10,
+        "islands": 1,
+        "migration_interval": 5,
+        "migration_size": 2,
+        "adaptive_concurrency": True,
+        "concurrency_initial": 10,
+        "concurrency_latency_tolerance": 1.5,
+        "concurrency_error_threshold": 0.1,
+        "breaker_threshold": 5,
+        "breaker_cooldown": 30,
+        "overload_retries": 2,
+        "profile_top": 20,
+        "profile_keep": 10,
+        "events": True,
+        "events_batch": 500,
+        "events_queue": 10000,
+        "events_rotate_mb": 100,
+        "events_compress": True,
         "criteria": {
             "pass": 500,
             "fail": -200,
@@ -46,6 +80,7 @@ DEFAULT_CONFIG = {
     "apix_lib_path": "~/rizza/apix_generated.py",
     "log_path": "logs/rizza.log",
     "log_level": "info",
+    "test_store": "sqlite",
 }
 
 
@@ -88,6 +123,8 @@ class Config:
 
     def save_config(self, cfg_file=None):
         """Save the LAST command arguments to last.pconf in the config directory."""
+        import yaml
+
         last_data = getattr(self.rizza, "last", None)
         if last_data is None:
             return
@@ -156,6 +193,8 @@ class Config:
 
     def set_chunk(self, chunk, value):
         """Set a config value by dotted chunk path and persist to the appropriate file."""
+        import yaml
+
         coerced = yaml.safe_load(str(value))
         keys = chunk.split(".")
         obj = self.rizza
@@ -178,6 +217,8 @@ class Config:
 
     def _write_chunk_to_file(self, chunk):
         """Persist the in-memory section owning chunk back to its .pconf file."""
+        import yaml
+
         top = chunk.split(".")[0]
         target = self._resolve_file_for_chunk(chunk)
         target.parent.mkdir(parents=True, exist_ok=True)
@@ -214,6 +255,8 @@ class Config:
     @staticmethod
     def yaml_print(in_dict=None):
         """Convert a dictionary to yaml string, and print it out"""
+        import yaml
+
         if in_dict is not None:
             out = in_dict.to_dict() if hasattr(in_dict, "to_dict") else in_dict
             print(yaml.dump(out, default_flow_style=False))
@@ -0,0 +1,320 @@
+"""Learn which params and inputs an entity's method needs or rejects.
+
+Satellite's validation errors usually name the field at fault: "Name can't be blank",
+"organization_id is required", "Content type is not included in the list". The
+ConstraintStore reads those messages out of failed results and builds per-(entity,
+method) Constraints:
+
+- required params, which every organism must include,
+- forbidden params, which the method doesn't accept at all, and
+- forbidden inputs for a param, once an input has been rejected for it repeatedly.
+
+Constraints repair genes as they are generated, mutated and bred, so organisms known
+to be doomed are never evaluated. The store is saved as JSON, so later runs start out
+constrained.
+"""
+
+from collections import Counter
+import json
+import logging
+from pathlib import Path
+import random
+import re
+import threading
+
+import attr
+
+from rizza.helpers.text import pmatch
+
+logger = logging.getLogger(__name__)
+
+_store_lock = threading.Lock()
+
+REQUIRED_PATTERNS = (
+    re.compile(r"can't be blank|cannot be blank|can not be blank", re.IGNORECASE),
+    re.compile(r"\bis required\b|\bmust be (?:present|provided|specified)\b", re.IGNORECASE),
+    re.compile(r"missing \d+ required (?:positional|keyword-only) argument", re.IGNORECASE),
+)
+INVALID_PATTERNS = (
+    re.compile(r"\bis invalid\b|\bis not valid\b|\bis not included in the list\b", re.I),
+    re.compile(r"\bis too (?:long|short)\b|\bis not a number\b|\bmust be\b", re.IGNORECASE),
+)
+# A referenced record is missing: invalid input, unless the input is a dependency
+# (genetic_known/genetic_unknown) whose record went away
+MISSING_PATTERN = re.compile(r"\bnot found\b|\bdoes not exist\b|\bcouldn't find\b", re.I)
+UNKNOWN_PATTERNS = (
+    re.compile(r"unexpected keyword argument '(\w+)'", re.IGNORECASE),
+    re.compile(r"unknown attribute '(\w+)'", re.IGNORECASE),
+    re.compile(r"unpermitted parameters?:? '?(\w+)", re.IGNORECASE),
+)
+QUOTED_ARGUMENT = re.compile(r"'(\w+)'")
+
+
+def classify(message):
+    """Return "unknown", "required", "invalid", "missing" or None for a validation message."""
+    if any(pattern.search(message) for pattern in UNKNOWN_PATTERNS):
+        return "unknown"
+    if any(pattern.search(message) for pattern in REQUIRED_PATTERNS):
+        return "required"
+    if any(pattern.search(message) for pattern in INVALID_PATTERNS):
+        return "invalid"
+    if MISSING_PATTERN.search(message):
+        return "missing"
+    return None
+
+
+def messages(result):
+    """Yield (field or None, message) for every validation message in a failed result.
+
+    Foreman puts field errors under "errors" as {field: [messages]}; everything else
+    (exception args, plain bodies, full_messages without "errors") is yielded as
+    unattributed text.
+    """
+    stack = [result.get("fail") if isinstance(result, dict) else None]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            yield None, item
+        elif isinstance(item, dict):
+            errors = item.get("errors")
+            skip = ()
+            if isinstance(errors, dict):
+                for field, field_messages in errors.items():
+                    if isinstance(field_messages, str):
+                        messages = [field_messages]
+                    else:
+                        messages = field_messages or ()
+                    for message in messages:
+                        yield field, str(message)
+                # full_messages repeats the field errors
+                skip = ("errors", "full_messages")
+            stack.extend(value for key, value in item.items() if key not in skip)
+        elif isinstance(item, list | tuple):
+            stack.extend(item)
+
+
+def match_field(field, message, params):
+    """Return the param a validation message is about, or None.
+
+    :param field: Field name the message was filed under, if any.
+    :param message: The message text.
+    :param params: The method's param names.
+    """
+    if field:
+        for candidate in (field, f"{field}_id", f"{field}_ids"):
+            if candidate in params:
+                return candidate
+    for pattern in UNKNOWN_PATTERNS:
+        found = pattern.search(message)
+        if found:
+            return found.group(1)
+    if "argument" in message:
+        quoted = QUOTED_ARGUMENT.search(message)
+        if quoted and quoted.group(1) in params:
+            return quoted.group(1)
+    # Foreman's full messages start with the humanized field name ("Organization id ...")
+    text = (field or message).lower()
+    best = None
+    for param in params:
+        for needle in (param.lower(), param.replace("_", " ").lower()):
+            matched, position = pmatch(needle, text)
+            if matched and position == 0 and (best is None or len(param) > len(best)):
+                best = param
+    return best
+
+
+@attr.s()
+class Constraints:
+    """What's known about one entity method's params.
+
+    :param strike_limit: Rejections of a param's input before the input is forbidden.
+    """
+
+    required = attr.ib(factory=set, converter=set)
+    forbidden_params = attr.ib(factory=set, converter=set)
+    forbidden_inputs = attr.ib(
+        factory=dict, converter=lambda found: {key: set(val) for key, val in found.items()}
+    )
+    strikes = attr.ib(factory=Counter, converter=Counter)
+    strike_limit = attr.ib(default=3, cmp=False)
+
+    def __bool__(self):
+        return bool(self.required or self.forbidden_params or self.forbidden_inputs)
+
+    def allowed(self, param, inpt):
+        """Whether an input may be used for a param."""
+        return param not in self.forbidden_params and inpt not in self.forbidden_inputs.get(
+            param, ()
+        )
+
+    def learn(self, arg_dict, result, params):
+        """Update the constraints from one freshly executed result.
+
+        A passing result clears the strikes (and any ban) of every param=input it used.
+
+        :param arg_dict: The {param: input} the result came from.
+        :param result: The raw result.
+        :param params: The method's param names.
+        :returns: True if anything changed, including strike counts.
+        """
+        changed = False
+        if "pass" in result:
+            for param, inpt in arg_dict.items():
+                if self.strikes.pop(f"{param}={inpt}", None) is not None:
+                    changed = True
+                if inpt in self.forbidden_inputs.get(param, ()):
+                    self.forbidden_inputs[param].discard(inpt)
+                    changed = True
+            return changed
+        for field, message in messages(result):
+            kind = classify(message)
+            if kind is None:
+                continue
+            param = match_field(field, message, params)
+            if param is None:
+                continue
+            if kind == "unknown":
+                if param not in self.required and param not in self.forbidden_params:
+                    self.forbidden_params.add(param)
+                    changed = True
+            elif param not in arg_dict:
+                if kind == "required" and param not in self.required:
+                    self.required.add(param)
+                    self.forbidden_params.discard(param)
+                    changed = True
+            elif kind == "missing" and "genetic" in str(arg_dict[param]):
+                # The dependency's record is gone, not an input the param rejects
+                continue
+            else:
+                inpt = arg_dict[param]
+                self.strikes[f"{param}={inpt}"] += 1
+                changed = True
+                if self.strikes[f"{param}={inpt}"] >= self.strike_limit and self.allowed(
+                    param, inpt
+                ):
+                    self.forbidden_inputs.setdefault(param, set()).add(inpt)
+        return changed
+
+    def repair(self, genes, type_pools=None, inputs=None):
+        """Return genes with every known constraint applied.
+
+        Forbidden params are dropped, forbidden inputs are swapped for allowed ones
+        (or dropped when there are none) and missing required params are added.
+
+        :param genes: [param_names, param_inputs]
+        :param type_pools: Optional {param_name: [compatible_inputs]}.
+        :param inputs: Fallback inputs for params without a type pool.
+        """
+        if not self or len(genes) < 2:
+            return genes
+        type_pools = type_pools or {}
+
+        def choose(param):
+            pool = [
+                inpt for inpt in type_pools.get(param) or inputs or () if self.allowed(param, inpt)
+            ]
+            return random.choice(pool) if pool else None
+
+        params, param_inputs = [], []
+        for param, given in zip(genes[0], genes[1], strict=False):
+            if param in self.forbidden_params or param in params:
+                continue
+            inpt = given
+            if not self.allowed(param, given):
+                inpt = choose(param)
+                if inpt is None:
+                    continue
+            params.append(param)
+            param_inputs.append(inpt)
+        for param in sorted(self.required - set(params)):
+            inpt = choose(param)
+            if inpt is not None:
+                params.append(param)
+                param_inputs.append(inpt)
+        return [params, param_inputs]
+
+    def to_dict(self):
+        """Return the constraints as JSON-serializable data."""
+        return {
+            "required": sorted(self.required),
+            "forbidden_params": sorted(self.forbidden_params),
+            "forbidden_inputs": {
+                param: sorted(found) for param, found in sorted(self.forbidden_inputs.items())
+            },
+            "strikes": dict(self.strikes),
+        }
+
+
+@attr.s()
+class ConstraintStore:
+    """Constraints for every entity method, saved to a JSON file.
+
+    :param path: JSON file the constraints are loaded from and saved to.
+    :param strike_limit: Rejections of a param's input before the input is forbidden.
+    """
+
+    path = attr.ib(converter=lambda path: Path(path).expanduser())
+    strike_limit = attr.ib(default=3)
+
+    def __attrs_post_init__(self):
+        """Load any saved constraints."""
+        self._lock = threading.Lock()
+        self._constraints = {}
+        self._dirty = False
+        if self.path.exists():
+            try:
+                saved = json.loads(self.path.read_text())
+            except ValueError as err:
+                logger.warning(f"Ignoring unreadable constraints file {self.path}: {err}")
+                saved = {}
+            for key, data in saved.items():
+                self._constraints[key] = Constraints(**data, strike_limit=self.strike_limit)
+
+    def get(self, entity, method):
+        """Return the (live) Constraints for an entity method."""
+        with self._lock:
+            return self._constraints.setdefault(
+                f"{entity} {method}", Constraints(strike_limit=self.strike_limit)
+            )
+
+    def learn(self, entity, method, arg_dict, result, params):
+        """Update an entity method's constraints from one freshly executed result."""
+        if not isinstance(result, dict) or not ("fail" in result or "pass" in result):
+            return False
+        constraints = self.get(entity, method)
+        with self._lock:
+            changed = constraints.learn(arg_dict, result, params)
+            if changed:
+                self._dirty = True
+                logger.debug(f"Learned {entity}.{method} constraints: {constraints.to_dict()}")
+            return changed
+
+    def save(self):
+        """Write the constraints out, if anything changed since the last save."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {key: found.to_dict() for key, found in sorted(self._constraints.items())}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(data, indent=2))
+            tmp_path.replace(self.path)
+            self._dirty = False
+
+
+def get_constraint_store(config):
+    """Return the shared ConstraintStore for a config, or None when learning is disabled."""
+    genetics_cfg = config.rizza.genetics
+    if not getattr(genetics_cfg, "learn_constraints", True):
+        return None
+    store = getattr(config, "_constraint_store", None)
+    if store is None:
+        with _store_lock:
+            store = getattr(config, "_constraint_store", None)
+            if store is None:
+                store = ConstraintStore(
+                    path=config.base_dir.joinpath("data/constraints.json"),
+                    strike_limit=getattr(genetics_cfg, "constraint_strikes", 3),
+                )
+                config._constraint_store = store
+    return store
@@ -0,0 +1,100 @@
+"""Score raw results against genetics.criteria in a single pass.
+
+misc.dict_search walks and stringifies a result once for every criterion. The
+CriteriaMatcher flattens a result once instead, into the str() of each key and of
+each non-dict value (the same pieces dict_search compares against), joined by a
+separator no criterion contains. Each criterion then only needs a substring check
+against that one string, and a match can never span two pieces.
+"""
+
+import logging
+
+import attr
+
+from rizza.helpers.misc import dict_search
+
+logger = logging.getLogger(__name__)
+
+SEPARATOR = "\x00"
+
+
+def flatten(result):
+    """Serialize a result into one string of its keys and leaf values.
+
+    Dicts are walked; anything else is str()'d whole, as dict_search does.
+    """
+    if not isinstance(result, dict):
+        return str(result)
+    pieces = []
+    stack = [result]
+    while stack:
+        for key, value in stack.pop().items():
+            pieces.append(str(key))
+            if isinstance(value, dict):
+                stack.append(value)
+            else:
+                pieces.append(str(value))
+    return SEPARATOR.join(pieces)
+
+
+@attr.s()
+class CriteriaMatcher:
+    """Criteria compiled for repeated scoring.
+
+    :param criteria: Mapping of criterion to the points it's worth.
+    """
+
+    criteria = attr.ib(converter=lambda criteria: dict(criteria.items()))
+
+    def __attrs_post_init__(self):
+        """Split the criteria into ones the flattened form can score and the rest."""
+        self._needles = []
+        self._fallback = []
+        for criterion, points in self.criteria.items():
+            needle = str(criterion)
+            if SEPARATOR in needle:
+                self._fallback.append((criterion, points))
+            else:
+                self._needles.append((needle, points))
+
+    @classmethod
+    def from_config(cls, config):
+        """Compile the criteria in a config's genetics section."""
+        return cls(config.rizza.genetics.criteria)
+
+    def matches(self, result):
+        """Return the criteria a result matches."""
+        flat = flatten(result)
+        matched = [needle for needle, _ in self._needles if needle in flat]
+        matched.extend(
+            criterion for criterion, _ in self._fallback if dict_search(criterion, result)
+        )
+        return matched
+
+    def _score_flat(self, flat, result):
+        total = sum(points for needle, points in self._needles if needle in flat)
+        for criterion, points in self._fallback:
+            if dict_search(criterion, result):
+                total += points
+        return total
+
+    def score(self, result):
+        """Return the total points a result is worth."""
+        return self._score_flat(flatten(result), result)
+
+    def score_many(self, results):
+        """Return the points for each of a batch of results, in order.
+
+        Results often repeat within a generation (the same validation error, say), so
+        each distinct serialized result is only scored once.
+        """
+        if self._fallback:
+            return [self.score(result) for result in results]
+        scores = []
+        seen = {}
+        for result in results:
+            flat = flatten(result)
+            if flat not in seen:
+                seen[flat] = self._score_flat(flat, result)
+            scores.append(seen[flat])
+        return scores
@@ -0,0 +1,75 @@
+"""Small helpers for rizza's SQLite-backed stores."""
+
+from contextlib import contextmanager
+from pathlib import Path
+import sqlite3
+import threading
+
+import attr
+
+
+@attr.s()
+class SQLiteDB:
+    """A SQLite database file with one connection per thread.
+
+    Connections run in autocommit mode with WAL journaling, so readers never block
+    writers and write transactions are opened explicitly via transaction().
+
+    :param path: Path to the database file.
+    :param schema: SQL script run on each new connection (use IF NOT EXISTS).
+    :param timeout: Seconds a writer waits on a locked database before failing.
+    """
+
+    path = attr.ib(converter=Path)
+    schema = attr.ib(default="", repr=False)
+    timeout = attr.ib(default=30.0, repr=False)
+
+    def __attrs_post_init__(self):
+        """Prepare the per-thread connection storage."""
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def connection(self):
+        """Return this thread's connection, opening it if needed."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self.path),
+                timeout=self.timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if self.schema:
+                conn.executescript(self.schema)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def execute(self, sql, params=()):
+        """Run a single statement on this thread's connection."""
+        return self.connection().execute(sql, params)
+
+    @contextmanager
+    def transaction(self):
+        """Run the enclosed statements as one write transaction."""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self):
+        """Close every connection opened by this instance."""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
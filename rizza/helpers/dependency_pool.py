@@ -0,0 +1,292 @@
+"""An in-process pool of dependency entity IDs shared by genetic_known/genetic_unknown.
+
+Each organism that needs an organization_id (or any other entity reference) used to
+create a brand-new entity. The pool creates IDs a batch at a time, hands the same
+IDs out to many evaluations until they expire, and picks up IDs for free from any
+passing create result seen during evolution. An ID a request fails on with "not found"
+is dropped before anyone else leases it.
+"""
+
+from collections import deque
+from contextlib import contextmanager
+import contextvars
+import logging
+import re
+import threading
+import time
+
+import attr
+
+from rizza.helpers.criteria import flatten
+
+logger = logging.getLogger(__name__)
+
+_pool_lock = threading.Lock()
+
+FAILED_IDS = (None, -1, "~")
+NOT_FOUND = re.compile(r"\b404\b|not found", re.IGNORECASE)
+
+# The (entity, ID) pairs leased in the current tracking_leases() block
+_leases = contextvars.ContextVar("rizza_dependency_leases", default=None)
+# How many genetic_known/genetic_unknown creations the current context is nested in
+_depths = {
+    "known": contextvars.ContextVar("rizza_known_depth", default=0),
+    "unknown": contextvars.ContextVar("rizza_unknown_depth", default=0),
+}
+# False while replaying a saved test, when genetic_unknown mustn't start a new search
+_recursion = contextvars.ContextVar("rizza_dependency_recursion", default=True)
+
+
+@attr.s(slots=True)
+class PooledID:
+    """A dependency ID and when it entered the pool."""
+
+    value = attr.ib()
+    added = attr.ib(factory=time.time)
+    leases = attr.ib(default=0)
+
+
+@attr.s()
+class DependencyPool:
+    """Per-entity pools of IDs that evaluations can lease.
+
+    IDs are shared: a lease moves the ID to the back of its pool, so the next lease
+    gets the next one. Exclusive leases (for methods that destroy the entity) take the
+    ID out of the pool for good.
+
+    :param size: Most IDs kept per entity.
+    :param batch: IDs created per refill when an entity's pool runs dry.
+    :param ttl: Seconds an ID is trusted to still exist after it entered the pool.
+    """
+
+    size = attr.ib(default=10)
+    batch = attr.ib(default=3)
+    ttl = attr.ib(default=600)
+
+    def __attrs_post_init__(self):
+        """Prepare the per-entity storage and counters."""
+        self._pools = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._refilling = {}
+        self.created = 0
+        self.harvested = 0
+        self.leased = 0
+
+    def _entity_lock(self, entity):
+        with self._lock:
+            return self._locks.setdefault(entity, threading.Condition())
+
+    def _valid(self, entity):
+        """Drop expired IDs and return the entity's pool."""
+        pool = self._pools.setdefault(entity, deque())
+        now = time.time()
+        for pooled in list(pool):
+            if now - pooled.added >= self.ttl:
+                pool.remove(pooled)
+        return pool
+
+    def _add(self, pool, value):
+        if value in FAILED_IDS or len(pool) >= self.size:
+            return False
+        if any(pooled.value == value for pooled in pool):
+            return False
+        pool.append(PooledID(value))
+        return True
+
+    def _reserve(self, entity):
+        """Wait out any refill in progress and claim the entity's refill slot.
+
+        Call with the entity's lock held.
+        :returns: The number of IDs to create, or None if the pool has IDs to lease or
+            this thread is already refilling the entity (a factory that needs its own
+            entity type).
+        """
+        cond = self._entity_lock(entity)
+        me = threading.get_ident()
+        while not self._valid(entity) and entity in self._refilling:
+            if self._refilling[entity] == me:
+                return None
+            cond.wait()
+        pool = self._valid(entity)
+        if pool:
+            return None
+        self._refilling[entity] = me
+        return max(min(self.batch, self.size - len(pool)), 1)
+
+    def _fill(self, entity, factory, wanted):
+        """Create IDs outside the entity's lock, then pool them and wake any waiters."""
+        values = []
+        try:
+            for _ in range(wanted):
+                value = factory()
+                if value in FAILED_IDS:
+                    # Creation isn't working right now; don't keep retrying this batch
+                    break
+                values.append(value)
+        finally:
+            cond = self._entity_lock(entity)
+            with cond:
+                self._refilling.pop(entity, None)
+                self.created += len(values)
+                pool = self._valid(entity)
+                added = sum(self._add(pool, value) for value in values)
+                cond.notify_all()
+        if added:
+            logger.debug(f"Created {added} {entity} IDs for the dependency pool.")
+        return added
+
+    def refill(self, entity, factory):
+        """Create up to a batch of IDs with factory() and add them to the pool.
+
+        The factory runs without holding the entity's lock, so leases from the pool
+        aren't blocked while a (possibly slow) creation runs. Concurrent refills of the
+        same entity wait for the one in progress instead of creating a second batch.
+
+        :param factory: Callable returning a new entity's ID, or -1/None on failure.
+        :returns: The number of IDs added.
+        """
+        with self._entity_lock(entity):
+            wanted = self._reserve(entity)
+        return self._fill(entity, factory, wanted) if wanted else 0
+
+    def acquire(self, entity, factory, exclusive=False):
+        """Lease an ID for an entity, creating a batch of them if the pool is empty.
+
+        :param factory: Callable returning a new entity's ID, or -1/None on failure.
+        :param exclusive: Remove the ID from the pool instead of sharing it.
+        :returns: An ID, or -1 if none could be created.
+        """
+        cond = self._entity_lock(entity)
+        with cond:
+            wanted = self._reserve(entity)
+        if wanted and not self._fill(entity, factory, wanted):
+            return -1
+        with cond:
+            # Lease from what's there, even an ID whose TTL ran out during the refill
+            pool = self._pools.get(entity)
+            if not pool:
+                return -1
+            pooled = pool.popleft()
+            if not exclusive:
+                pooled.leases += 1
+                pool.append(pooled)
+            self.leased += 1
+        leases = _leases.get()
+        if leases is not None:
+            leases.append((entity, pooled.value))
+        return pooled.value
+
+    def harvest(self, entity, created):
+        """Add the ID of an entity created elsewhere, if there's room for it.
+
+        :param created: The "pass" payload of a create result.
+        :returns: True if the ID was added.
+        """
+        value = created.get("id") if isinstance(created, dict) else None
+        with self._entity_lock(entity):
+            if self._add(self._valid(entity), value):
+                self.harvested += 1
+                return True
+        return False
+
+    def invalidate(self, entity, value):
+        """Remove an ID that is known to no longer exist."""
+        with self._entity_lock(entity):
+            pool = self._pools.get(entity, ())
+            for pooled in list(pool):
+                if pooled.value == value:
+                    pool.remove(pooled)
+
+    def ids(self, entity):
+        """Return the entity's currently valid IDs."""
+        with self._entity_lock(entity):
+            return [pooled.value for pooled in self._valid(entity)]
+
+
+@contextmanager
+def tracking_leases():
+    """Collect the (entity, ID) pairs leased in this block into the list it yields."""
+    leases = []
+    token = _leases.set(leases)
+    try:
+        yield leases
+    finally:
+        _leases.reset(token)
+
+
+def current_depth(kind="unknown"):
+    """Return how many "known" or "unknown" dependency creations this context is inside."""
+    return _depths[kind].get()
+
+
+@contextmanager
+def nested(kind="unknown"):
+    """Count this block as one more level of "known" or "unknown" dependency creation.
+
+    The depth is kept per thread and asyncio task, so concurrent testers sharing a config
+    don't see each other's depth, and it's unwound even if the block raises.
+
+    :yields: The new depth.
+    """
+    var = _depths[kind]
+    token = var.set(var.get() + 1)
+    try:
+        yield var.get()
+    finally:
+        var.reset(token)
+
+
+def recursion_allowed():
+    """Return False inside a recursion(False) block."""
+    return _recursion.get()
+
+
+@contextmanager
+def recursion(enabled=True):
+    """Forbid genetic_unknown from starting new searches in this block when not enabled.
+
+    An outer recursion(False) block can't be re-enabled by an inner one.
+    """
+    token = _recursion.set(_recursion.get() and enabled)
+    try:
+        yield
+    finally:
+        _recursion.reset(token)
+
+
+def stale_ids(result, leases):
+    """Return the leased (entity, ID) pairs a failed result says don't exist.
+
+    :param result: An EntityTestTask.execute result.
+    :param leases: (entity, ID) pairs from tracking_leases().
+    """
+    if not leases or not isinstance(result, dict) or "fail" not in result:
+        return []
+    text = flatten(result["fail"])
+    if not NOT_FOUND.search(text):
+        return []
+    return [
+        (entity, value)
+        for entity, value in leases
+        if re.search(rf"(?<![\w-]){re.escape(str(value))}(?![\w-])", text)
+    ]
+
+
+def get_dependency_pool(config):
+    """Return the shared DependencyPool for a config, or None when pooling is disabled."""
+    genetics_cfg = config.rizza.genetics
+    if not getattr(genetics_cfg, "dependency_pool", True):
+        return None
+    pool = getattr(config, "_dependency_pool", None)
+    if pool is None:
+        with _pool_lock:
+            pool = getattr(config, "_dependency_pool", None)
+            if pool is None:
+                pool = DependencyPool(
+                    size=getattr(genetics_cfg, "dependency_pool_size", 10),
+                    batch=getattr(genetics_cfg, "dependency_pool_batch", 3),
+                    ttl=getattr(genetics_cfg, "dependency_pool_ttl", 600),
+                )
+                config._dependency_pool = pool
+    return pool
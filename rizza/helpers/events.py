@@ -0,0 +1,183 @@
+"""A structured, machine-readable stream of evaluation events.
+
+Every evaluation a genetic run judges becomes one compact JSON line in
+logs/events.jsonl:
+
+    {"ts":1700000000.12,"type":"evaluation","entity":"Organization","method":"create",
+     "mode":"positive","generation":3,"genotype":{"name":"alpha"},"status":"422",
+     "points":-400,"latency":0.182,"cache":null}
+
+"cache" is "fitness" when the run had already evaluated the genotype, "result" when
+the persistent result cache answered and null for a real call. Events are handed to an
+EventLog, whose writer thread serializes and writes them in batches, so the evaluation
+loop only pays for a queue put. When the file grows past the rotation size it's moved
+aside (gzip-compressed by default) and a new one started.
+"""
+
+import atexit
+import gzip
+import json
+import logging
+from pathlib import Path
+import queue
+import shutil
+import threading
+import time
+
+import attr
+
+from rizza.helpers.misc import lenient_json_serial
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+_event_log_lock = threading.Lock()
+
+
+@attr.s()
+class EventLog:
+    """Write events to a JSON-lines file from a background thread.
+
+    :param path: File events are appended to.
+    :param batch_size: Most events written at once.
+    :param flush_interval: Seconds a partial batch waits before it's written.
+    :param max_queue: Events that may wait to be written; any more are dropped.
+    :param rotate_bytes: Size at which the file is rotated, or None to never rotate.
+    :param compress: Whether rotated files are gzip-compressed.
+    """
+
+    path = attr.ib(converter=lambda path: Path(path).expanduser())
+    batch_size = attr.ib(default=500)
+    flush_interval = attr.ib(default=1.0)
+    max_queue = attr.ib(default=10000)
+    rotate_bytes = attr.ib(default=None)
+    compress = attr.ib(default=True)
+
+    def __attrs_post_init__(self):
+        """Start the writer thread."""
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self.dropped = 0
+        self.written = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="rizza-events", daemon=True)
+        self._thread.start()
+
+    def emit(self, event):
+        """Queue an event without blocking; it's dropped if the queue is full."""
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout=None):
+        """Block until every event queued so far has been written."""
+        if not self._thread.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self):
+        """Write what's queued, then stop the writer thread and close the file."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        if not self._file.closed:
+            self._file.close()
+        if self.dropped:
+            logger.warning(
+                f"The event log dropped {self.dropped} events it couldn't keep up with."
+            )
+
+    def _run(self):
+        batch = []
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval if batch else None)
+            except queue.Empty:
+                item = None
+            if isinstance(item, dict):
+                batch.append(item)
+                if len(batch) < self.batch_size:
+                    continue
+            self._write(batch)
+            batch = []
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _STOP:
+                return
+
+    def _write(self, batch):
+        if not batch:
+            return
+        try:
+            self._file.write(
+                "".join(
+                    json.dumps(event, separators=(",", ":"), default=lenient_json_serial) + "\n"
+                    for event in batch
+                )
+            )
+            self._file.flush()
+            self.written += len(batch)
+            if self.rotate_bytes and self._file.tell() >= self.rotate_bytes:
+                self._rotate()
+        except (OSError, TypeError, ValueError) as err:
+            logger.warning(f"Couldn't write {len(batch)} events to {self.path}: {err}")
+
+    def _rotate(self):
+        """Move the current file aside, compressing it if asked, and start a new one."""
+        self._file.close()
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        suffix = ".jsonl.gz" if self.compress else ".jsonl"
+        target = self.path.with_name(f"{self.path.stem}.{stamp}{suffix}")
+        count = 1
+        while target.exists():
+            target = self.path.with_name(f"{self.path.stem}.{stamp}-{count}{suffix}")
+            count += 1
+        try:
+            if self.compress:
+                with self.path.open("rb") as source, gzip.open(target, "wb") as compressed:
+                    shutil.copyfileobj(source, compressed)
+                self.path.unlink()
+            else:
+                self.path.replace(target)
+        except OSError as err:
+            logger.warning(f"Couldn't rotate the event log {self.path}: {err}")
+            if self.path.exists():
+                # The events are all still in the current file
+                target.unlink(missing_ok=True)
+        else:
+            logger.debug(f"Rotated the event log to {target}")
+        finally:
+            self._file = self.path.open("a", encoding="utf-8")
+
+
+def get_event_log(config):
+    """Return the EventLog shared through a config, or None when events are disabled."""
+    genetics_cfg = config.rizza.genetics
+    if not getattr(genetics_cfg, "events", True):
+        return None
+    event_log = getattr(config, "_event_log", None)
+    if event_log is None:
+        with _event_log_lock:
+            event_log = getattr(config, "_event_log", None)
+            if event_log is None:
+                rotate_mb = getattr(genetics_cfg, "events_rotate_mb", 100)
+                event_log = EventLog(
+                    path=config.base_dir.joinpath("logs/events.jsonl"),
+                    batch_size=getattr(genetics_cfg, "events_batch", 500),
+                    max_queue=getattr(genetics_cfg, "events_queue", 10000),
+                    rotate_bytes=rotate_mb * 1024 * 1024 if rotate_mb else None,
+                    compress=getattr(genetics_cfg, "events_compress", True),
+                )
+                atexit.register(event_log.close)
+                config._event_log = event_log
+    return event_log
+
+
+def flush(config):
+    """Write out any events a config's EventLog is still holding."""
+    event_log = getattr(config, "_event_log", None)
+    if event_log is not None:
+        event_log.flush()
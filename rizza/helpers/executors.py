@@ -0,0 +1,165 @@
+"""Executors used to evaluate genetic test tasks off the event loop."""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+import contextvars
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+
+import attr
+
+from rizza.helpers.logging import setup_worker_logging, worker_queue
+from rizza.helpers.misc import lenient_json_serial
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_TYPES = ("thread", "process")
+
+# Set in each worker process by _init_worker
+_worker_config = None
+
+
+def _init_worker(cfg_dir, genetics_overrides, log_queue, log_level):
+    """Load the config, apix module and API connection once per worker process.
+
+    Logging is set up first, so the worker's records go back to the parent's listener.
+    """
+    global _worker_config
+    from rizza.helpers.config import Config
+
+    setup_worker_logging(log_queue, log_level)
+
+    config = Config(cfg_dir=cfg_dir)
+    for key, value in genetics_overrides.items():
+        setattr(config.rizza.genetics, key, value)
+    try:
+        config.init_connection()
+    except Exception as err:
+        logger.warning(f"Worker {os.getpid()} could not initialize the API connection: {err}")
+    _worker_config = config
+
+
+def evaluate_task(entity, method, arg_dict, mock=False):
+    """Execute a task in a worker process.
+
+    The result is round-tripped through JSON so only plain data crosses the
+    process boundary. RecursionError propagates to the parent unchanged.
+    """
+    from rizza.entity_tester import EntityTestTask
+
+    task = EntityTestTask(entity=entity, method=method, arg_dict=arg_dict, config=_worker_config)
+    result = task.execute(mock)
+    return json.loads(json.dumps(result, default=lenient_json_serial))
+
+
+def make_process_pool(config, max_workers=None):
+    """Return a process pool whose workers share the parent's genetics settings.
+
+    :param config: The parent's Config instance.
+    :param max_workers: Number of worker processes (default: genetics.process_workers,
+        then the CPU count).
+    """
+    genetics_cfg = config.rizza.genetics
+    max_workers = max_workers or getattr(genetics_cfg, "process_workers", None) or os.cpu_count()
+    overrides = genetics_cfg.to_dict() if hasattr(genetics_cfg, "to_dict") else {}
+    logger.debug(f"Starting a pool of {max_workers} worker processes.")
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(
+            str(Path(config.cfg_dir).absolute()),
+            overrides,
+            worker_queue(),
+            logging.getLogger().level,
+        ),
+    )
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """A ThreadPoolExecutor whose calls run in a copy of the submitting thread's context.
+
+    Context variables, like the file rizza.helpers.logging.log_to() routes records to,
+    then carry over into the pool's threads.
+    """
+
+    def submit(self, fn, /, *args, **kwargs):
+        """Submit fn to run in the current context."""
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+@attr.s()
+class AsyncRuntime:
+    """One event loop, running in a background thread, plus the executors it dispatches to.
+
+    The loop's default executor is a thread pool sized to max_workers, so the configured
+    async limit is the real number of calls in flight. Coroutines can be submitted with
+    run() from any thread except the loop's own.
+
+    :param max_workers: Size of the thread pool.
+    :param config: Config instance used to start the process pool, if one is requested.
+    """
+
+    max_workers = attr.ib(default=100)
+    config = attr.ib(default=None, repr=False)
+
+    def __attrs_post_init__(self):
+        """Start the loop thread and its thread pool."""
+        self.thread_pool = ContextThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="rizza-worker"
+        )
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(self.thread_pool)
+        self._process_pool = None
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="rizza-event-loop", daemon=True
+        )
+        self._thread.start()
+
+    def run(self, coro):
+        """Run a coroutine on the shared loop and block until it finishes."""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("AsyncRuntime.run() can't be called from the event loop thread.")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def process_pool(self):
+        """Return the runtime's process pool, starting it on first use."""
+        if self._process_pool is None:
+            self._process_pool = make_process_pool(self.config)
+        return self._process_pool
+
+    def close(self):
+        """Stop the loop and shut down every executor."""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+        self.thread_pool.shutdown(wait=True, cancel_futures=True)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(cancel_futures=True)
+            self._process_pool = None
+
+
+@contextmanager
+def async_runtime(config=None, max_workers=100):
+    """Yield the AsyncRuntime shared through config, creating it if there isn't one yet.
+
+    The outermost caller owns the runtime and closes it on exit; nested callers reuse it.
+    Without a config, the caller always gets (and owns) a fresh runtime.
+    """
+    runtime = getattr(config, "_runtime", None) if config is not None else None
+    if runtime is not None:
+        yield runtime
+        return
+
+    runtime = AsyncRuntime(max_workers=max_workers, config=config)
+    if config is not None:
+        config._runtime = runtime
+    try:
+        yield runtime
+    finally:
+        if config is not None:
+            config._runtime = None
+        runtime.close()
@@ -4,10 +4,19 @@ import random
 
 import attr
 
+from rizza.helpers import profiling
+from rizza.helpers.genome import Genome
+
 
 @attr.s()
 class Population:
-    """This class is the controller for the population of Organisms."""
+    """This class is the controller for the population of Organisms.
+
+    :param engine: "list" breeds organism by organism; "vector" hands breeding, sorting
+        and diversity measurement to a NumPy VectorEngine, for very large populations.
+    :param constraints: Optional constraints.Constraints applied to every bred organism.
+    :param mutation_scale: Multiplier on the adaptive mutation rate, so islands can differ.
+    """
 
     gene_base = attr.ib(validator=attr.validators.instance_of(list), cmp=False, repr=False)
     population_count = attr.ib(default=20)
@@ -17,9 +26,21 @@ class Population:
     gene_length = attr.ib(default=False, cmp=False, repr=False)
     mutate = attr.ib(default=True, cmp=False, repr=False)
     crossover_method = attr.ib(default="single_point", cmp=False, repr=False)
+    engine = attr.ib(
+        default="list", cmp=False, repr=False, validator=attr.validators.in_(("list", "vector"))
+    )
+    constraints = attr.ib(default=None, cmp=False, repr=False)
+    mutation_scale = attr.ib(default=1.0, cmp=False, repr=False)
 
     def __attrs_post_init__(self):
         """Generate a population of organisms."""
+        self._engine = None
+        if self.engine == "vector":
+            from rizza.helpers.vector_genetics import VectorEngine
+
+            self._engine = VectorEngine(
+                rev_pop_sort=self.rev_pop_sort, crossover_method=self.crossover_method
+            )
         self._best_score = None
         self._stagnation_counter = 0
         self.population = []
@@ -92,13 +113,19 @@ class Population:
 
         Low diversity → higher mutation to escape local maxima.
         """
-        diversity = len({org.points for org in self.population}) / len(self.population)
+        if self._engine is not None:
+            diversity = self._engine.diversity(self.population)
+        else:
+            diversity = len({org.points for org in self.population}) / len(self.population)
         if diversity < 0.1:
-            return 0.8
-        if diversity < 0.3:
-            return 0.5
-        return 0.2
+            rate = 0.8
+        elif diversity < 0.3:
+            rate = 0.5
+        else:
+            rate = 0.2
+        return min(1.0, rate * self.mutation_scale)
 
+    @profiling.counted("breed_population")
     def breed_population(
         self,
         pool_percentage=50,
@@ -149,17 +176,24 @@ class Population:
             return
 
         mutation_chance = self._compute_mutation_chance() if self.mutate else 0.0
-
-        # Elites: deep-copied so later mutation doesn't corrupt them
         elite_count = max(2, int(self.population_count * elite_percentage / 100))
-        elites = [
-            Organism(genes=copy.deepcopy(org.genes), points=org.points)
-            for org in self.population[:elite_count]
-        ]
-
         immigration_count = max(1, int(self.population_count * immigration_rate / 100))
 
-        next_generation = elites[:]
+        if self._engine is not None:
+            next_generation = self._engine.breed(
+                self.population,
+                count=self.population_count - immigration_count,
+                elite_count=elite_count,
+                tournament_size=tournament_size,
+                mutation_chance=mutation_chance,
+                type_pools=type_pools,
+                available_genes=available_genes,
+            )
+            for org in next_generation[elite_count:]:
+                org.apply_constraints(self.constraints, type_pools)
+        else:
+            # Elites: copied so later mutation doesn't corrupt them
+            next_generation = [org.copy() for org in self.population[:elite_count]]
 
         # Fill via tournament selection + offspring mutation
         while len(next_generation) < self.population_count - immigration_count:
@@ -167,7 +201,13 @@ class Population:
             parent2 = self._tournament_select(tournament_size)
             new_org = Organism(genes=self._breed_pair(parent1.genes, parent2.genes))
             if self.mutate and random.random() <= mutation_chance:
-                new_org.mutate(type_pools=type_pools, available_genes=available_genes)
+                new_org.mutate(
+                    type_pools=type_pools,
+                    available_genes=available_genes,
+                    constraints=self.constraints,
+                )
+            else:
+                new_org.apply_constraints(self.constraints, type_pools)
             next_generation.append(new_org)
 
         # Immigrants: fully random organisms injected each generation
@@ -178,18 +218,123 @@ class Population:
 
         self.population = next_generation
 
+    def breed_offspring(
+        self, type_pools=None, tournament_size=3, immigration_rate=0, available_genes=None
+    ):
+        """Breed a single offspring from the current population (steady-state mode).
+
+        Both parents are picked by tournament; the child is mutated at the same adaptive
+        rate breed_population uses. If the population is too small to breed, or with
+        immigration_rate percent chance, a fresh random organism is returned instead.
+
+        :param type_pools: Optional {param_name: [compatible_inputs]} for type-aware mutation.
+        :param tournament_size: Number of contestants per tournament selection round.
+        :param immigration_rate: Percent chance of returning a fresh random organism.
+        :param available_genes: Optional list of all valid values for genes[0] (param names).
+        """
+        if len(self.population) < 2 or random.random() * 100 < immigration_rate:
+            org = Organism(genes=self.gene_base[:])
+            org.generate_genes(gen_func=self.generator_function, count=self.gene_length)
+            return org
+        parent1 = self._tournament_select(tournament_size)
+        parent2 = self._tournament_select(tournament_size)
+        child = Organism(genes=self._breed_pair(parent1.genes, parent2.genes))
+        mutation_chance = self._compute_mutation_chance() if self.mutate else 0.0
+        if self.mutate and random.random() <= mutation_chance:
+            child.mutate(
+                type_pools=type_pools,
+                available_genes=available_genes,
+                constraints=self.constraints,
+            )
+        else:
+            child.apply_constraints(self.constraints, type_pools)
+        return child
+
+    def replace_worst(self, organism):
+        """Add a scored organism to the population (steady-state mode).
+
+        Until the population is full the organism is simply added. After that it replaces
+        the worst member, unless it scored worse than that member.
+
+        :returns: True if the organism joined the population.
+        """
+        if len(self.population) < self.population_count:
+            self.population.append(organism)
+            return True
+        if self.rev_pop_sort:
+            worst_idx = min(range(len(self.population)), key=lambda i: self.population[i].points)
+            better = organism.points >= self.population[worst_idx].points
+        else:
+            worst_idx = max(range(len(self.population)), key=lambda i: self.population[i].points)
+            better = organism.points <= self.population[worst_idx].points
+        if better:
+            self.population[worst_idx] = organism
+        return better
+
+    def receive(self, migrants):
+        """Replace the worst members of a sorted population with migrant organisms."""
+        keep = max(0, len(self.population) - len(migrants))
+        self.population = self.population[:keep] + [org.copy() for org in migrants]
+
     def sort_population(self, reverse=None):
         """Sort the population by the number of points they have."""
         reverse = reverse or self.rev_pop_sort
+        if self._engine is not None:
+            population = self.population
+            self.population = [population[i] for i in self._engine.order(population, reverse)]
+            return
         self.population = sorted(self.population, key=lambda org: org.points, reverse=reverse)
 
 
+def migrate(islands, count=2):
+    """Send copies of each island's best organisms to the next island, in a ring.
+
+    :param islands: Populations exchanging organisms.
+    :param count: Organisms each island sends.
+    """
+    for island in islands:
+        island.sort_population()
+    emigrants = [island.population[:count] for island in islands]
+    for index, island in enumerate(islands):
+        island.receive(emigrants[index - 1])
+        island.sort_population()
+
+
+def _reset_genome(organism, attribute, value):
+    """Forget an organism's cached genome when its genes are replaced."""
+    organism._genome = None
+    return value
+
+
 @attr.s(slots=True)
 class Organism:
     """The actor class that is the target of evolution."""
 
-    genes = attr.ib(validator=attr.validators.instance_of(list), cmp=False)
+    genes = attr.ib(
+        validator=attr.validators.instance_of(list), cmp=False, on_setattr=_reset_genome
+    )
     points = attr.ib(default=0)
+    _genome = attr.ib(default=None, init=False, cmp=False, repr=False)
+
+    @property
+    def genome(self):
+        """The organism's [param_names, param_inputs] genes as an immutable Genome.
+
+        Built on first use and cached until the genes are replaced or mutated.
+        """
+        if self._genome is None:
+            self._genome = Genome.from_genes(self.genes)
+        return self._genome
+
+    def copy(self):
+        """Return a copy whose genes can be mutated without touching this organism's."""
+        if self.genes and isinstance(self.genes[0], list):
+            genes = [sub[:] for sub in self.genes]
+        else:
+            genes = copy.deepcopy(self.genes)
+        clone = Organism(genes=genes, points=self.points)
+        clone._genome = self._genome  # Genomes are immutable, so the copy shares it
+        return clone
 
     def generate_genes(self, gen_func=None, count=None):
         """Randomly sort the genes to provide different combinations."""
@@ -207,7 +352,19 @@ class Organism:
             self.genes = self.genes[:]
             random.shuffle(self.genes)
 
-    def mutate(self, gene_base=None, mutation_chance=0.1, type_pools=None, available_genes=None):
+    def apply_constraints(self, constraints, type_pools=None):
+        """Repair 2-list genes with constraints.Constraints; a no-op without them."""
+        if constraints and len(self.genes) >= 2 and isinstance(self.genes[0], list):
+            self.genes = constraints.repair(self.genes, type_pools)
+
+    def mutate(
+        self,
+        gene_base=None,
+        mutation_chance=0.1,
+        type_pools=None,
+        available_genes=None,
+        constraints=None,
+    ):
         """Randomly mutate genes.
 
         :param gene_base: Optional fallback pool for replacement mutation values.
@@ -216,7 +373,9 @@ class Organism:
             of the inputs sublist in 2-list gene structures.
         :param available_genes: Optional list of all valid param names; enables variable-length
             add/remove operators for 2-list gene structures.
+        :param constraints: Optional constraints.Constraints the mutated genes must satisfy.
         """
+        self._genome = None
         if isinstance(self.genes[0], list):
             param_names = self.genes[0] if len(self.genes) >= 2 else []
 
@@ -224,7 +383,8 @@ class Organism:
             if available_genes and len(self.genes) >= 2:
                 if random.random() < 0.1:
                     # Add: pick a param not already present, with a type-compatible input
-                    candidates = [g for g in available_genes if g not in self.genes[0]]
+                    present = set(self.genes[0])
+                    candidates = [g for g in available_genes if g not in present]
                     if candidates:
                         new_param = random.choice(candidates)
                         pool = (type_pools.get(new_param) or []) if type_pools else []
@@ -260,6 +420,7 @@ class Organism:
                         self.genes[i][idx] = random.choice(pool) if pool else self.genes[i][idx]
                     else:
                         self.genes[i][idx] = random.choice(self.genes[i])
+            self.apply_constraints(constraints, type_pools)
         elif random.random() < mutation_chance:
             gene1 = random.choice(range(len(self.genes)))
             gene2 = random.choice(range(len(self.genes)))
@@ -0,0 +1,123 @@
+"""A compact, immutable genome for [param_names, param_inputs] gene pairs.
+
+Param and input names are interned to small ints shared by the whole process. A
+Genome stores its (param, input) pairs deduplicated by param (the first occurrence
+wins, as in GeneticEntityTester._genes_to_task) and sorted, so genes that only differ
+in pair order have equal genomes with the same cached hash. Genomes never change:
+the with_pair/without operators return new ones, so copies can share them freely.
+"""
+
+import threading
+
+import attr
+
+
+@attr.s()
+class Interner:
+    """A thread-safe, append-only mapping between values and small ints."""
+
+    def __attrs_post_init__(self):
+        """Prepare the two-way mapping."""
+        self._codes = {}
+        self._values = []
+        self._lock = threading.Lock()
+
+    def intern(self, value):
+        """Return the code for a value, assigning the next free one if it's new."""
+        code = self._codes.get(value)
+        if code is None:
+            with self._lock:
+                code = self._codes.get(value)
+                if code is None:
+                    code = len(self._values)
+                    self._values.append(value)
+                    self._codes[value] = code
+        return code
+
+    def code(self, value):
+        """Return the code for a value, or None if it was never interned."""
+        return self._codes.get(value)
+
+    def value(self, code):
+        """Return the value a code was assigned to."""
+        return self._values[code]
+
+    def __len__(self):
+        return len(self._values)
+
+
+NAMES = Interner()
+
+
+def _canonical(pairs):
+    """Dedupe coded pairs by param, keeping the first occurrence, then sort them."""
+    seen = {}
+    for param, inpt in pairs:
+        seen.setdefault(param, inpt)
+    return tuple(sorted(seen.items()))
+
+
+@attr.s(frozen=True, slots=True, hash=True, cache_hash=True, repr=False)
+class Genome:
+    """An immutable, hashable set of (param, input) pairs.
+
+    :param pairs: Canonical tuple of (param_code, input_code) pairs; build genomes with
+        from_genes or from_arg_dict rather than directly.
+    """
+
+    pairs = attr.ib(converter=_canonical)
+
+    @classmethod
+    def from_genes(cls, genes):
+        """Build a genome from [param_names, param_inputs] lists."""
+        intern = NAMES.intern
+        return cls(
+            (intern(param), intern(inpt)) for param, inpt in zip(genes[0], genes[1], strict=False)
+        )
+
+    @classmethod
+    def from_arg_dict(cls, arg_dict):
+        """Build a genome from a {param_name: input_name} dict."""
+        intern = NAMES.intern
+        return cls((intern(param), intern(inpt)) for param, inpt in arg_dict.items())
+
+    def __iter__(self):
+        """Yield (param_name, input_name) pairs."""
+        value = NAMES.value
+        return ((value(param), value(inpt)) for param, inpt in self.pairs)
+
+    def __len__(self):
+        return len(self.pairs)
+
+    def __contains__(self, param):
+        code = NAMES.code(param)
+        return code is not None and any(pair[0] == code for pair in self.pairs)
+
+    def __repr__(self):
+        return f"Genome({self.arg_dict()!r})"
+
+    @property
+    def params(self):
+        """Tuple of the genome's param names."""
+        return tuple(NAMES.value(param) for param, _ in self.pairs)
+
+    def arg_dict(self):
+        """Return the genome as a {param_name: input_name} dict."""
+        return dict(self)
+
+    def to_genes(self):
+        """Return fresh [param_names, param_inputs] lists for the genome."""
+        pairs = list(self)
+        return [[param for param, _ in pairs], [inpt for _, inpt in pairs]]
+
+    def with_pair(self, param, inpt):
+        """Return a copy with param set to inpt, replacing any input it had."""
+        code = NAMES.intern(param)
+        return Genome(
+            ((code, NAMES.intern(inpt)), *(pair for pair in self.pairs if pair[0] != code))
+        )
+
+    def without(self, param):
+        """Return a copy without param."""
+        code = NAMES.code(param)
+        return Genome(pair for pair in self.pairs if pair[0] != code)
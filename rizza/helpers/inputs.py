@@ -47,28 +47,34 @@ def puppet_url(choice=1):
     return choices.get(choice, choices[1])
 
 
-def genetic_known(config, entity="Organization"):
+def genetic_known(config, entity="Organization", exclusive=False):
     """Return the id of a previously created entity, or None if no saved test exists.
 
     Does not trigger a new genetic search — callers must run `rizza genetic -e Entity -m create`
-    first to save a passing organism.
+    first to save a passing organism. IDs are leased from the dependency pool, which only
+    replays the saved test when it needs a new batch.
+
+    :param exclusive: The caller will destroy the entity, so don't lease its id to anyone else.
     """
     from rizza.genetic_tester import GeneticEntityTester
+    from rizza.helpers.dependency_pool import get_dependency_pool, nested
+    from rizza.helpers.metrics import get_metrics
 
     if not config.rizza.genetics.allow_dependencies:
         return None
 
-    depth = getattr(config.rizza.genetics, "known_depth", 0) + 1
-    config.rizza.genetics.known_depth = depth
-    if depth >= config.rizza.genetics.max_recursive_depth:
-        config.rizza.genetics.known_depth -= 1
-        return None
+    def create():
+        with nested("known") as depth:
+            if depth >= config.rizza.genetics.max_recursive_depth:
+                return None
+            gtester = GeneticEntityTester(config, entity, "create")
+            return gtester.run_best()
 
-    try:
-        gtester = GeneticEntityTester(config, entity, "create")
-        return gtester.run_best()
-    finally:
-        config.rizza.genetics.known_depth -= 1
+    pool = get_dependency_pool(config)
+    with get_metrics(config).timer("dependency", entity, "create") as timing:
+        entity_id = create() if pool is None else pool.acquire(entity, create, exclusive=exclusive)
+        timing.status = "none" if entity_id in (None, -1, "~") else "ok"
+    return entity_id
 
 
 def genetic_unknown(config, entity="Organization", max_generations=None):
@@ -76,27 +82,39 @@ def genetic_unknown(config, entity="Organization", max_generations=None):
     import logging
 
     from rizza.genetic_tester import GeneticEntityTester
+    from rizza.helpers.dependency_pool import (
+        current_depth,
+        get_dependency_pool,
+        nested,
+        recursion_allowed,
+    )
 
     __logger = logging.getLogger(__name__)
 
     if not config.rizza.genetics.allow_recursion or not config.rizza.genetics.allow_dependencies:
         return None
+    if not recursion_allowed():
+        return None
 
     if not max_generations:
         max_generations = config.rizza.genetics.max_recursive_generations
 
-    config.rizza.genetics.recursion_depth = (
-        getattr(config.rizza.genetics, "recursion_depth", 0) + 1
-    )
-    if config.rizza.genetics.recursion_depth >= config.rizza.genetics.max_recursive_depth:
+    if current_depth("unknown") + 1 >= config.rizza.genetics.max_recursive_depth:
         __logger.warning("Reached max recursion depth.")
-        config.rizza.genetics.recursion_depth -= 1
         return 1
 
-    __logger.info(f"Attempting to create {entity}...")
-    gtester = GeneticEntityTester(config, entity, "create", max_generations=max_generations)
-    if not gtester._load_test():
-        gtester.run(save_only_passed=True)
-    __logger.info("Resuming parent task.")
-    config.rizza.genetics.recursion_depth -= 1
-    return gtester.run_best()
+    def create():
+        with nested("unknown"):
+            __logger.info(f"Attempting to create {entity}...")
+            gtester = GeneticEntityTester(
+                config, entity, "create", max_generations=max_generations
+            )
+            if not gtester._load_test():
+                gtester.run(save_only_passed=True)
+        __logger.info("Resuming parent task.")
+        return gtester.run_best()
+
+    pool = get_dependency_pool(config)
+    if pool is None:
+        return create()
+    return pool.acquire(entity, create)
@@ -1,13 +1,37 @@
-"""Logging configuration for rizza."""
+"""Logging configuration for rizza.
+
+Log calls only put the record on a queue; a listener thread formats it and writes it
+to the console and the log files. A record goes to the file named by the log_to()
+block it was logged in, so concurrent testers each keep their own log without
+reconfiguring the handlers, and to the default log file otherwise.
+"""
+import atexit
+from collections import OrderedDict
+from contextlib import contextmanager
+import contextvars
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+import multiprocessing
 from pathlib import Path
+import queue
+import threading
 
 from rich.console import Console
 from rich.logging import RichHandler
 
 console = Console(stderr=True)
 
+# The file records logged in the current context are routed to, if not the default
+log_target = contextvars.ContextVar("rizza_log_target", default=None)
+
+_log_queue = queue.SimpleQueue()
+_listener = None
+_file_handler = None
+_setup_lock = threading.Lock()
+# Records from process-pool workers, moved onto _log_queue by the _forwarder thread
+_worker_queue = None
+_forwarder = None
+
 
 def resolve_log_level(level):
     """Resolve log level string to logging int constant."""
@@ -24,16 +48,108 @@ def resolve_log_level(level):
     return mapping.get(str(level).lower(), logging.INFO)
 
 
+class _ContextQueueHandler(QueueHandler):
+    """Put records on the queue, tagged with the current context's log target.
+
+    Only the message is rendered here, so the record keeps its exc_info for the
+    console's rich tracebacks.
+    """
+
+    def prepare(self, record):
+        record.log_target = log_target.get()
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class _WorkerQueueHandler(QueueHandler):
+    """Put a worker process's records on the parent's queue, tagged with the log target.
+
+    The message and any traceback are rendered to text here, so the record pickles.
+    """
+
+    def prepare(self, record):
+        record = super().prepare(record)
+        record.log_target = log_target.get()
+        return record
+
+
+class _Listener(QueueListener):
+    """A QueueListener that also answers flush_logs() requests."""
+
+    def handle(self, record):
+        if isinstance(record, threading.Event):
+            record.set()
+            return
+        super().handle(record)
+
+
+class RoutingFileHandler(logging.Handler):
+    """Write each record to the file its log_target names, or to the default file.
+
+    The default file is opened straight away, others on first use; files are kept open,
+    up to max_open at a time.
+
+    :param path: The default log file.
+    :param max_bytes: Size at which each file is rotated.
+    :param backup_count: Rotated files kept for each log file.
+    :param max_open: Most files held open at once; the least recently used is closed.
+    """
+
+    def __init__(self, path, max_bytes=int(1e9), backup_count=3, max_open=32):
+        super().__init__()
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.max_open = max_open
+        self._handlers = OrderedDict()
+        self._handler(str(self.path))
+
+    def setFormatter(self, fmt):
+        """Set the formatter of this handler and every file it has open."""
+        super().setFormatter(fmt)
+        for handler in self._handlers.values():
+            handler.setFormatter(fmt)
+
+    def _handler(self, path):
+        handler = self._handlers.get(path)
+        if handler is not None:
+            self._handlers.move_to_end(path)
+            return handler
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            path, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding="utf-8"
+        )
+        handler.setFormatter(self.formatter)
+        self._handlers[path] = handler
+        while len(self._handlers) > self.max_open:
+            _, oldest = self._handlers.popitem(last=False)
+            oldest.close()
+        return handler
+
+    def emit(self, record):
+        target = getattr(record, "log_target", None) or self.path
+        try:
+            self._handler(str(target)).emit(record)
+        except OSError:
+            self.handleError(record)
+
+    def close(self):
+        """Close every open log file."""
+        for handler in self._handlers.values():
+            handler.close()
+        self._handlers.clear()
+        super().close()
+
+
 def setup_logging(console_level=logging.INFO, file_level=None, log_path=None):
     """Configure logging with RichHandler for console and rotating file handler.
 
-    Call this once at CLI startup; call again to reconfigure with a log file.
+    Call this once at CLI startup; call again to reconfigure with a log file. To send
+    part of a run to its own file, use log_to() rather than calling this again.
     """
+    global _listener, _file_handler
     console_int = resolve_log_level(console_level)
-    root = logging.getLogger()
-    root.handlers.clear()
-    root.setLevel(logging.DEBUG)
-
     console_handler = RichHandler(
         console=console,
         rich_tracebacks=True,
@@ -43,13 +159,13 @@ def setup_logging(console_level=logging.INFO, file_level=None, log_path=None):
     )
     console_handler.setLevel(console_int)
     console_handler.setFormatter(logging.Formatter("%(message)s", datefmt="%d%b %H:%M:%S"))
-    root.addHandler(console_handler)
+    handlers = [console_handler]
+    lowest = console_int
 
+    file_handler = None
     if log_path and file_level is not None:
         file_int = resolve_log_level(file_level)
-        path = Path(log_path)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        file_handler = RotatingFileHandler(path, maxBytes=int(1e9), backupCount=3)
+        file_handler = RoutingFileHandler(log_path)
         file_handler.setLevel(file_int)
         file_handler.setFormatter(
             logging.Formatter(
@@ -57,8 +173,100 @@ def setup_logging(console_level=logging.INFO, file_level=None, log_path=None):
                 datefmt="%d%b %H:%M:%S",
             )
         )
-        root.addHandler(file_handler)
+        handlers.append(file_handler)
+        lowest = min(lowest, file_int)
+
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+        if _file_handler is not None:
+            _file_handler.close()
+        _listener = _Listener(_log_queue, *handlers, respect_handler_level=True)
+        _file_handler = file_handler
+        root = logging.getLogger()
+        root.handlers.clear()
+        # Records no handler wants are dropped before they're queued
+        root.setLevel(lowest)
+        root.addHandler(_ContextQueueHandler(_log_queue))
+        _listener.start()
+
+
+def flush_logs(timeout=10):
+    """Block until every record logged so far has been handled."""
+    if _listener is None or _listener._thread is None:
+        return
+    done = threading.Event()
+    _log_queue.put(done)
+    done.wait(timeout)
+
+
+def log_file():
+    """Return the default log file's path, or None when there isn't one."""
+    return None if _file_handler is None else _file_handler.path
+
+
+@contextmanager
+def log_to(path):
+    """Send records logged in this block (and tasks or threads it starts) to path.
+
+    Threads started through a plain ThreadPoolExecutor don't inherit the block; use
+    executors.ContextThreadPoolExecutor for those.
+    """
+    token = log_target.set(str(path))
+    try:
+        yield
+    finally:
+        log_target.reset(token)
+
+
+def _forward(source):
+    while (record := source.get()) is not None:
+        _log_queue.put(record)
+
+
+def worker_queue():
+    """Return the queue process-pool workers send their records to.
+
+    A thread moves the records onto this process's log queue, so they reach the same
+    console and files as records logged here.
+    """
+    global _worker_queue, _forwarder
+    with _setup_lock:
+        if _worker_queue is None:
+            _worker_queue = multiprocessing.Queue()
+            _forwarder = threading.Thread(
+                target=_forward, args=(_worker_queue,), name="rizza-log-forwarder", daemon=True
+            )
+            _forwarder.start()
+    return _worker_queue
+
+
+def setup_worker_logging(target, level=logging.INFO):
+    """Send this process's records to target, a queue from worker_queue() in the parent.
+
+    Call it first thing in a worker process. A forked worker otherwise inherits the
+    parent's queue handler with no listener thread draining it.
+    """
+    global _listener, _file_handler, _worker_queue, _forwarder
+    # The parent's listener and files belong to the parent; don't stop or close them here
+    _listener = _file_handler = _worker_queue = _forwarder = None
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.setLevel(level)
+    root.addHandler(_WorkerQueueHandler(target))
+
+
+def _shutdown():
+    with _setup_lock:
+        if _forwarder is not None:
+            _worker_queue.put(None)
+            _forwarder.join()
+        if _listener is not None:
+            _listener.stop()
+        if _file_handler is not None:
+            _file_handler.close()
 
 
 # Basic console-only setup so logs work before CLI configures a file handler
 setup_logging()
+atexit.register(_shutdown)
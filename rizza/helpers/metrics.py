@@ -0,0 +1,338 @@
+"""Where a run's time goes: latency histograms and throughput counters.
+
+Every evaluation, and within it the entity construction, the method call and any
+genetic_known dependency lookups, is timed into an HDR-style Histogram keyed by
+(stage, entity, method, status). Alongside those, Metrics counts evaluations, result
+cache hits and misses, and calls in flight. Reports are written as JSON
+(data/metrics.json) and as OpenMetrics text (data/metrics.prom) at the end of a run,
+or whenever the process receives SIGUSR1.
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+import json
+import logging
+import re
+import signal
+import threading
+import time
+
+import attr
+
+from rizza.helpers.criteria import flatten
+
+logger = logging.getLogger(__name__)
+
+# Values within a power of two share 2**SUB_BUCKET_BITS buckets (under 1% error)
+SUB_BUCKET_BITS = 7
+PERCENTILES = (0.5, 0.9, 0.95, 0.99)
+# Upper bounds, in seconds, of the buckets exported to OpenMetrics
+EXPORT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+HTTP_STATUS = re.compile(r"\b([1-5]\d\d) (?:Client|Server) Error\b")
+
+_metrics_lock = threading.Lock()
+
+
+def outcome(result):
+    """Return a short status for a result: pass, skipped, an HTTP code or an error name."""
+    if not isinstance(result, dict):
+        return "error"
+    if "pass" in result:
+        return "pass"
+    if "skipped" in result:
+        return "skipped"
+    failure = result.get("fail")
+    found = HTTP_STATUS.search(flatten(failure))
+    if found:
+        return found.group(1)
+    if isinstance(failure, dict) and failure:
+        return str(next(iter(failure)))
+    return "fail"
+
+
+def _bucket(micros):
+    """Return the lowest value sharing a bucket with micros."""
+    shift = max(0, micros.bit_length() - SUB_BUCKET_BITS)
+    return micros >> shift << shift
+
+
+def _bucket_top(bucket):
+    """Return the highest value in the bucket starting at bucket."""
+    shift = max(0, bucket.bit_length() - SUB_BUCKET_BITS)
+    return bucket + (1 << shift) - 1
+
+
+@attr.s()
+class Histogram:
+    """A log-linear histogram of durations, in the style of HdrHistogram.
+
+    Durations are stored as microseconds in buckets whose width grows with the value,
+    so percentiles are accurate to under 1% whatever the range.
+    """
+
+    def __attrs_post_init__(self):
+        """Start empty."""
+        self.counts = Counter()
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, seconds):
+        """Add one duration."""
+        seconds = max(0.0, seconds)
+        self.counts[_bucket(round(seconds * 1_000_000))] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def merge(self, other):
+        """Add every duration recorded in another Histogram."""
+        self.counts.update(other.counts)
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, fraction):
+        """Return the duration (in seconds) below which a fraction (0-1) of them fall."""
+        if not self.count:
+            return 0.0
+        wanted = max(1, round(self.count * fraction))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= wanted:
+                return min(self.max, _bucket_top(bucket) / 1_000_000)
+        return self.max
+
+    def cumulative(self, bounds):
+        """Yield (bound, durations at or under bound) for ascending bounds in seconds."""
+        buckets = sorted(self.counts)
+        seen = index = 0
+        for bound in bounds:
+            limit = bound * 1_000_000
+            while index < len(buckets) and buckets[index] <= limit:
+                seen += self.counts[buckets[index]]
+                index += 1
+            yield bound, seen
+
+    def summary(self):
+        """Return the count, sum, mean, min, max and percentiles as a dict."""
+        found = {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "mean": round(self.total / self.count, 6) if self.count else 0.0,
+            "min": round(self.min or 0.0, 6),
+            "max": round(self.max or 0.0, 6),
+        }
+        for fraction in PERCENTILES:
+            found[f"p{round(fraction * 100)}"] = round(self.percentile(fraction), 6)
+        return found
+
+
+@attr.s(slots=True)
+class Timing:
+    """One timed block; set status before it ends to file it under that status."""
+
+    status = attr.ib(default="ok")
+
+
+def _label(value):
+    return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+@attr.s()
+class Metrics:
+    """Latency histograms and throughput counters for one process.
+
+    Safe to use from every thread.
+
+    :param clock: Callable returning the current time in seconds.
+    """
+
+    clock = attr.ib(default=time.monotonic, repr=False)
+
+    def __attrs_post_init__(self):
+        """Start counting from now."""
+        self._lock = threading.Lock()
+        self.started = self.clock()
+        self.histograms = {}
+        self.counters = Counter()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def observe(self, stage, entity, method, status, seconds):
+        """Record one duration for a (stage, entity, method, status)."""
+        key = (stage, entity, method, status)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.record(seconds)
+
+    @contextmanager
+    def timer(self, stage, entity, method):
+        """Time a block, filed under the Timing's status.
+
+        A block that raises is filed under its HTTP status code, or else the exception name.
+        """
+        timing = Timing()
+        started = self.clock()
+        try:
+            yield timing
+        except BaseException as err:
+            status = getattr(getattr(err, "response", None), "status_code", None)
+            timing.status = str(status) if status else err.__class__.__name__
+            raise
+        finally:
+            self.observe(stage, entity, method, timing.status, self.clock() - started)
+
+    @contextmanager
+    def tracking(self):
+        """Count a block as a call in flight."""
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def count(self, name, amount=1):
+        """Add to a counter (evaluations, cache_hits, cache_misses)."""
+        with self._lock:
+            self.counters[name] += amount
+
+    def report(self):
+        """Return everything recorded so far as JSON-serializable data."""
+        with self._lock:
+            elapsed = max(self.clock() - self.started, 1e-9)
+            counters = dict(self.counters)
+            latency = [
+                {
+                    "stage": stage,
+                    "entity": entity,
+                    "method": method,
+                    "status": status,
+                    **histogram.summary(),
+                }
+                for (stage, entity, method, status), histogram in sorted(self.histograms.items())
+            ]
+            in_flight = {"current": self.in_flight, "peak": self.peak_in_flight}
+        hits, misses = counters.get("cache_hits", 0), counters.get("cache_misses", 0)
+        return {
+            "elapsed": round(elapsed, 3),
+            "evaluations": counters.get("evaluations", 0),
+            "evaluations_per_second": round(counters.get("evaluations", 0) / elapsed, 3),
+            "cache": {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            },
+            "in_flight": in_flight,
+            "counters": counters,
+            "latency": latency,
+        }
+
+    def to_openmetrics(self):
+        """Return everything recorded so far in the OpenMetrics text format."""
+        report = self.report()
+        lines = [
+            "# TYPE rizza_latency_seconds histogram",
+            "# UNIT rizza_latency_seconds seconds",
+            "# HELP rizza_latency_seconds Time spent in each stage of an evaluation.",
+        ]
+        with self._lock:
+            histograms = sorted(self.histograms.items())
+        for (stage, entity, method, status), histogram in histograms:
+            labels = (
+                f'stage="{_label(stage)}",entity="{_label(entity)}",'
+                f'method="{_label(method)}",status="{_label(status)}"'
+            )
+            for bound, seen in histogram.cumulative(EXPORT_BUCKETS):
+                lines.append(f'rizza_latency_seconds_bucket{{{labels},le="{bound}"}} {seen}')
+            lines.append(f'rizza_latency_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"rizza_latency_seconds_count{{{labels}}} {histogram.count}")
+            lines.append(f"rizza_latency_seconds_sum{{{labels}}} {histogram.total:.6f}")
+        lines.extend(
+            (
+                "# TYPE rizza_evaluations counter",
+                f"rizza_evaluations_total {report['evaluations']}",
+                "# TYPE rizza_evaluations_per_second gauge",
+                f"rizza_evaluations_per_second {report['evaluations_per_second']}",
+                "# TYPE rizza_cache_hits counter",
+                f"rizza_cache_hits_total {report['cache']['hits']}",
+                "# TYPE rizza_cache_misses counter",
+                f"rizza_cache_misses_total {report['cache']['misses']}",
+                "# TYPE rizza_in_flight gauge",
+                f"rizza_in_flight {report['in_flight']['current']}",
+                "# TYPE rizza_in_flight_peak gauge",
+                f"rizza_in_flight_peak {report['in_flight']['peak']}",
+                "# EOF",
+            )
+        )
+        return "\n".join(lines) + "\n"
+
+
+def get_metrics(config):
+    """Return the Metrics shared through a config, creating them on first use.
+
+    Without a config, a throwaway Metrics is returned.
+    """
+    if config is None:
+        return Metrics()
+    metrics = getattr(config, "_metrics", None)
+    if metrics is None:
+        with _metrics_lock:
+            metrics = getattr(config, "_metrics", None)
+            if metrics is None:
+                metrics = config._metrics = Metrics()
+    return metrics
+
+
+def write_report(config):
+    """Write the config's metrics to data/metrics.json and data/metrics.prom.
+
+    :returns: The JSON report's path, or None when nothing has been recorded.
+    """
+    metrics = getattr(config, "_metrics", None)
+    if metrics is None:
+        return None
+    data_dir = config.base_dir.joinpath("data")
+    data_dir.mkdir(parents=True, exist_ok=True)
+    json_path = data_dir.joinpath("metrics.json")
+    for path, text in (
+        (json_path, json.dumps(metrics.report(), indent=2)),
+        (data_dir.joinpath("metrics.prom"), metrics.to_openmetrics()),
+    ):
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_text(text)
+        tmp_path.replace(path)
+    logger.debug(f"Wrote metrics to {json_path}")
+    return json_path
+
+
+def report_on_signal(config):
+    """Write the metrics report whenever the process receives SIGUSR1.
+
+    Does nothing where SIGUSR1 doesn't exist, or off the main thread. The report is
+    written from a new thread: the signal can arrive while the main thread holds the
+    Metrics lock, which the handler would otherwise wait on forever.
+    """
+    if not hasattr(signal, "SIGUSR1") or threading.current_thread() is not threading.main_thread():
+        return
+
+    def write():
+        path = write_report(config)
+        if path is not None:
+            logger.info(f"Wrote metrics to {path}")
+
+    def handler(signum, frame):
+        threading.Thread(target=write, name="rizza-metrics-report", daemon=True).start()
+
+    signal.signal(signal.SIGUSR1, handler)
@@ -56,6 +56,14 @@ def json_serial(obj=None):
     raise TypeError(f"Type {type(obj)} not serializable")
 
 
+def lenient_json_serial(obj=None):
+    """Like json_serial, but fall back to str() for anything it can't handle."""
+    try:
+        return json_serial(obj)
+    except Exception:
+        return str(obj)
+
+
 def dict_search(needle, haystack):
     if not isinstance(haystack, dict):
         return str(needle) in str(haystack)
@@ -80,7 +88,7 @@ def field_to_entity(field, field_info=None):
 
     from rizza.entity_tester import EntityTester
 
-    entity_list = EntityTester.pull_entities().keys()
+    entity_list = EntityTester.pull_entity_names()
     field = "".join([x.capitalize() for x in field.split("_")])
     if field in entity_list:
         return field
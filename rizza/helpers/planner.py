@@ -0,0 +1,153 @@
+"""Plan the order entities are tested in from the dependencies between them.
+
+An entity depends on another when one of its __init__ or create parameters refers to
+it, either through an "entity" annotation or a name like organization_id. Testing
+entities level by level, leaves first, means each entity starts with the create
+tests of everything it depends on already learned and saved.
+
+An entity's own methods are planned the same way: create first, destructive methods
+last and everything else concurrently in between.
+"""
+
+import logging
+
+from rizza.entity_tester import DESTRUCTIVE_METHODS
+
+logger = logging.getLogger(__name__)
+
+CREATE_METHODS = ("create",)
+
+
+def entity_from_param_name(param_name, known_entity_names_lower):
+    """If param ends in _id/_ids and its base matches a known entity, return that entity's name."""
+    name = param_name.lower()
+    if name.endswith("_ids"):
+        base = name[:-4]
+    elif name.endswith("_id"):
+        base = name[:-3]
+    else:
+        return None
+    return known_entity_names_lower.get(base)
+
+
+def entity_references(index, entity, methods=("create",)):
+    """Return the names of the entities an entity's parameters refer to.
+
+    :param index: An ApixIndex.
+    :param entity: Name of the entity.
+    :param methods: Methods whose parameters are checked, along with __init__.
+    """
+    known_entity_names = set(index.entity_names())
+    known_entity_names_lower = {name.lower(): name for name in known_entity_names}
+    references = set()
+    for method in ("__init__", *methods):
+        for param, field_info in (index.annotations(entity, method) or {}).items():
+            referenced = field_info.get("entity") or entity_from_param_name(
+                param, known_entity_names_lower
+            )
+            if referenced in known_entity_names and referenced != entity:
+                references.add(referenced)
+    return references
+
+
+def dependency_graph(index, entities, methods=("create",)):
+    """Return {entity: {dependencies}} for the given entities.
+
+    Dependencies outside the given entities are dropped, since they won't be tested.
+    """
+    entities = set(entities)
+    return {entity: entity_references(index, entity, methods) & entities for entity in entities}
+
+
+def strongly_connected(graph):
+    """Return the strongly connected components of a dependency graph, as sets.
+
+    Components come out dependencies first (Tarjan's algorithm, without recursion).
+    Dependencies that aren't keys of the graph are ignored.
+    """
+    index, lowlink, on_stack = {}, {}, set()
+    stack, components = [], []
+    for root in sorted(graph):
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(sorted(graph[root])))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in graph:
+                    continue
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(sorted(graph[child]))))
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = set()
+                    while node not in component:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.add(member)
+                    components.append(component)
+    return components
+
+
+def plan_levels(graph):
+    """Split a dependency graph into levels that can each be tested concurrently.
+
+    Every entity comes after all of its dependencies. Entities caught in a dependency
+    cycle can't be ordered among themselves, so each cycle is planned as one unit: its
+    entities share a level, after everything the cycle depends on and before everything
+    that depends on it.
+
+    :returns: A list of sorted lists of entity names.
+    """
+    components = strongly_connected(graph)
+    component_of = {entity: number for number, comp in enumerate(components) for entity in comp}
+    remaining = {}
+    for number, component in enumerate(components):
+        if len(component) > 1:
+            logger.warning(
+                f"Dependency cycle between {', '.join(sorted(component))}; testing them together."
+            )
+        deps = {component_of[dep] for entity in component for dep in graph[entity] if dep in graph}
+        remaining[number] = deps - {number}
+    levels = []
+    while remaining:
+        ready = [number for number, deps in remaining.items() if not deps]
+        levels.append(sorted(entity for number in ready for entity in components[number]))
+        for number in ready:
+            del remaining[number]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return levels
+
+
+def dependencies_of(graph):
+    """Return every entity that some other entity in the graph depends on."""
+    return set().union(*graph.values()) if graph else set()
+
+
+def method_levels(methods):
+    """Split an entity's methods into levels for a lifecycle campaign.
+
+    Creating comes first, so the entities it creates can be reused by everything after
+    it. Destructive methods come last, so they don't take entities away from the
+    methods that only read or change them.
+
+    :returns: A list of sorted lists of method names, without empty levels.
+    """
+    creators = sorted(method for method in methods if method in CREATE_METHODS)
+    destroyers = sorted(method for method in methods if method in DESTRUCTIVE_METHODS)
+    others = sorted(set(methods) - set(creators) - set(destroyers))
+    return [level for level in (creators, others, destroyers) if level]
@@ -0,0 +1,298 @@
+"""Profile genetic runs without wrapping rizza in cProfile by hand.
+
+With --profile, every generation (and every entity a prune checks) is profiled on its
+own. A run leaves a directory under logs/profile/ holding:
+
+- combined.pstats, every section's profile added together (for pstats or snakeviz),
+- combined.collapsed, the same as collapsed stacks, ready for flamegraph.pl or
+  speedscope,
+- sections.tsv, the wall time and hottest function of every section, and
+- a .pstats file for each of the slowest sections.
+
+The call counters below are always on, profiling or not. They count the calls to a
+few hot spots, and their cumulative time.
+"""
+
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+import cProfile
+import functools
+import heapq
+import logging
+import marshal
+from pathlib import Path
+import pstats
+import threading
+import time
+
+import attr
+
+logger = logging.getLogger(__name__)
+
+# Collapsed stacks deeper than this are cut off, and lighter paths dropped
+MAX_STACK_DEPTH = 64
+MIN_STACK_MICROS = 1
+
+# Python 3.12+ allows one active cProfile profiler per process
+_profiling_lock = threading.Lock()
+
+
+@attr.s(slots=True)
+class CallCounter:
+    """The number of calls to a function and the time spent in them."""
+
+    name = attr.ib()
+    calls = attr.ib(default=0)
+    seconds = attr.ib(default=0.0)
+    _lock = attr.ib(factory=threading.Lock, repr=False)
+
+    def add(self, seconds):
+        """Count one call that took seconds."""
+        with self._lock:
+            self.calls += 1
+            self.seconds += seconds
+
+
+COUNTERS = {}
+
+
+def counted(name):
+    """Decorate a function so its calls and cumulative time are counted under name.
+
+    Recursive calls are counted (and timed) at every level.
+    """
+    counter = COUNTERS.setdefault(name, CallCounter(name))
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                counter.add(time.perf_counter() - started)
+
+        return wrapper
+
+    return decorate
+
+
+def call_counts():
+    """Return {name: {"calls": n, "seconds": s}} for every counted function."""
+    return {
+        name: {"calls": counter.calls, "seconds": round(counter.seconds, 6)}
+        for name, counter in sorted(COUNTERS.items())
+    }
+
+
+def label(func):
+    """Return a short "file:line(function)" name for a pstats function key."""
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{Path(filename).name}:{line}({name})"
+
+
+def collapse(stats):
+    """Return {"root;caller;callee": microseconds} from a pstats stats dict.
+
+    cProfile only records caller-callee edges, so each edge's time is split across
+    the paths leading to its caller in proportion to their time. The result is exact
+    for trees and an estimate where functions have several callers.
+    """
+    children = defaultdict(dict)
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            if caller in stats:
+                children[caller][func] = edge[3]
+    roots = [
+        func
+        for func, (*_, callers) in stats.items()
+        if not any(caller in stats for caller in callers)
+    ]
+    stacks = Counter()
+
+    def walk(func, path, names, inclusive):
+        _, _, self_time, cumulative, _ = stats[func]
+        scale = inclusive / cumulative if cumulative else 0.0
+        micros = round(self_time * scale * 1_000_000)
+        if micros >= MIN_STACK_MICROS:
+            stacks[";".join(names)] += micros
+        if len(path) >= MAX_STACK_DEPTH:
+            return
+        for child, edge_time in children[func].items():
+            child_time = edge_time * scale
+            if child in path or child_time * 1_000_000 < MIN_STACK_MICROS:
+                continue
+            walk(child, (*path, child), (*names, label(child).replace(";", ",")), child_time)
+
+    for root in roots:
+        walk(root, (root,), (label(root).replace(";", ","),), stats[root][3])
+    return dict(stacks)
+
+
+@attr.s()
+class Profiler:
+    """Profile a run section by section and write the results out.
+
+    Only one section is profiled at a time, process-wide. A section started while
+    another thread's section is running is skipped, and sections nested within another
+    section on the same thread are folded into the outer one.
+
+    :param directory: Directory the run's files are written to.
+    :param top: Number of functions in the hot-function summary.
+    :param keep: Number of slowest sections whose own .pstats files are kept.
+    """
+
+    directory = attr.ib(converter=lambda path: Path(path).expanduser())
+    top = attr.ib(default=20)
+    keep = attr.ib(default=10)
+
+    def __attrs_post_init__(self):
+        """Start with nothing profiled."""
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._combined = None
+        self._sections = []
+        self._slowest = []
+        self.skipped = 0
+
+    @contextmanager
+    def section(self, name):
+        """Profile a block of work as one section (one generation, for example)."""
+        if getattr(self._local, "active", False):
+            yield
+            return
+        profile = self._enable()
+        if profile is None:
+            yield
+            return
+        self._local.active = True
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._local.active = False
+            _profiling_lock.release()
+            self._record(name, time.perf_counter() - started, profile)
+
+    def _enable(self):
+        """Start a new cProfile profiler, or return None if another one is running."""
+        if _profiling_lock.acquire(blocking=False):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Some other profiling tool (a debugger or coverage, say) is active
+                _profiling_lock.release()
+            else:
+                return profile
+        with self._lock:
+            self.skipped += 1
+        return None
+
+    def _record(self, name, seconds, profile):
+        profile.create_stats()
+        if not profile.stats:
+            return
+        stats = pstats.Stats(profile)
+        hottest = max(stats.stats.items(), key=lambda item: item[1][2], default=None)
+        with self._lock:
+            index = len(self._sections)
+            self._sections.append((index, name, seconds, label(hottest[0]) if hottest else ""))
+            if self._combined is None:
+                self._combined = stats
+            else:
+                self._combined.add(stats)
+            if self.keep <= 0:
+                return
+            path = self.directory.joinpath(f"{index:05d} {name}.pstats")
+            if len(self._slowest) < self.keep:
+                heapq.heappush(self._slowest, (seconds, index, path))
+            elif seconds > self._slowest[0][0]:
+                _, _, evicted = heapq.heapreplace(self._slowest, (seconds, index, path))
+                evicted.unlink(missing_ok=True)
+            else:
+                return
+            self.directory.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(path)
+
+    def hot_functions(self):
+        """Return [(label, calls, self seconds, cumulative seconds)] for the top functions."""
+        if self._combined is None:
+            return []
+        ranked = sorted(self._combined.stats.items(), key=lambda item: item[1][2], reverse=True)
+        return [
+            (label(func), calls, self_time, cumulative)
+            for func, (_, calls, self_time, cumulative, _) in ranked[: self.top]
+        ]
+
+    def write(self):
+        """Write the combined profile, collapsed stacks and section timings.
+
+        :returns: The directory written to.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            sections = list(self._sections)
+            stats = dict(self._combined.stats) if self._combined is not None else {}
+        with self.directory.joinpath("combined.pstats").open("wb") as stats_file:
+            marshal.dump(stats, stats_file)
+        self.directory.joinpath("combined.collapsed").write_text(
+            "".join(f"{stack} {micros}\n" for stack, micros in sorted(collapse(stats).items()))
+        )
+        self.directory.joinpath("sections.tsv").write_text(
+            "section\tname\tseconds\thottest\n"
+            + "".join(
+                f"{index}\t{name}\t{seconds:.6f}\t{hot}\n"
+                for index, name, seconds, hot in sections
+            )
+        )
+        return self.directory
+
+    def summary(self):
+        """Return the hot-function summary and call counters as printable text."""
+        lines = [f"{'self s':>10} {'cum s':>10} {'calls':>10}  function"]
+        if self.skipped:
+            lines.insert(0, f"{self.skipped} sections skipped while another was profiled.\n")
+        for name, calls, self_time, cumulative in self.hot_functions():
+            lines.append(f"{self_time:>10.3f} {cumulative:>10.3f} {calls:>10}  {name}")
+        lines.append("")
+        lines.append(f"{'total s':>10} {'calls':>10}  counter")
+        for name, counts in call_counts().items():
+            lines.append(f"{counts['seconds']:>10.3f} {counts['calls']:>10}  {name}")
+        return "\n".join(lines)
+
+
+def start(config, name):
+    """Attach a new Profiler to a config, writing to logs/profile/<name> <timestamp>/."""
+    genetics_cfg = config.rizza.genetics
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    config._profiler = Profiler(
+        directory=config.base_dir.joinpath(f"logs/profile/{name} {stamp}"),
+        top=getattr(genetics_cfg, "profile_top", 20),
+        keep=getattr(genetics_cfg, "profile_keep", 10),
+    )
+    return config._profiler
+
+
+def section(config, name):
+    """Profile a block as one section if the config has a Profiler, else do nothing."""
+    profiler = getattr(config, "_profiler", None)
+    if profiler is None:
+        return nullcontext()
+    return profiler.section(name)
+
+
+def finish(config):
+    """Write out and detach a config's Profiler.
+
+    :returns: The Profiler, or None if there wasn't one.
+    """
+    profiler = getattr(config, "_profiler", None)
+    if profiler is None:
+        return None
+    config._profiler = None
+    profiler.write()
+    return profiler
@@ -0,0 +1,181 @@
+"""A persistent cache of raw task results shared across genetic runs.
+
+Entries are keyed by entity, method, the task's arg_dict and the apix module hash,
+but not by positive/negative mode. Only the raw EntityTestTask.execute result is
+stored, so callers rescore it with their own criteria on every hit.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+
+import attr
+
+from rizza.helpers.db import SQLiteDB
+from rizza.helpers.misc import lenient_json_serial
+
+logger = logging.getLogger(__name__)
+
+_cache_lock = threading.Lock()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    entity TEXT NOT NULL,
+    method TEXT NOT NULL,
+    apix_hash TEXT NOT NULL,
+    genotype TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+CREATE INDEX IF NOT EXISTS results_created ON results (created);
+"""
+EVICT_EVERY = 500
+
+
+def genotype_key(arg_dict):
+    """Return an order-independent string for a task's arg_dict."""
+    return json.dumps(arg_dict, sort_keys=True, default=str)
+
+
+@attr.s()
+class ResultCache:
+    """Disk-backed store of raw task results.
+
+    :param path: Path to the SQLite database file.
+    :param apix_hash: Hash of the apix module the results were produced with.
+    :param max_entries: Least recently used entries beyond this count are evicted.
+    :param ttl: Seconds an entry stays valid after it was stored.
+    """
+
+    path = attr.ib()
+    apix_hash = attr.ib(default="")
+    max_entries = attr.ib(default=100000)
+    ttl = attr.ib(default=604800)
+
+    def __attrs_post_init__(self):
+        """Open the database and drop anything already stale."""
+        self._db = SQLiteDB(self.path, schema=SCHEMA)
+        self._stores = 0
+        self.hits = 0
+        self.misses = 0
+        self.evict()
+
+    def _key(self, task):
+        genotype = genotype_key(task.arg_dict)
+        raw = "\0".join((task.entity, task.method, self.apix_hash, genotype))
+        return hashlib.sha1(raw.encode()).hexdigest(), genotype
+
+    def get(self, task):
+        """Return the cached raw result for a task, or None."""
+        key, _ = self._key(task)
+        row = self._db.execute(
+            "SELECT result, created FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is None or now - row[1] > self.ttl:
+            self.misses += 1
+            return None
+        self._db.execute("UPDATE results SET last_used = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, task, result):
+        """Store a task's raw result. Non-dict results are not cached."""
+        if not isinstance(result, dict):
+            return
+        key, genotype = self._key(task)
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                task.entity,
+                task.method,
+                self.apix_hash,
+                genotype,
+                json.dumps(result, default=lenient_json_serial),
+                now,
+                now,
+            ),
+        )
+        self._stores += 1
+        if self._stores % EVICT_EVERY == 0:
+            self.evict()
+
+    def entries(self, since=0.0):
+        """Return every entry stored at or after a time, as JSON-serializable dicts.
+
+        Entries keep their key, so put_entry can copy them into another cache.
+        """
+        rows = self._db.execute(
+            "SELECT key, entity, method, apix_hash, genotype, result, created "
+            "FROM results WHERE created >= ?",
+            (since,),
+        ).fetchall()
+        columns = ("key", "entity", "method", "apix_hash", "genotype", "result", "created")
+        return [dict(zip(columns, row, strict=True)) for row in rows]
+
+    def put_entry(self, entry):
+        """Store an entry exported by another cache's entries()."""
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                entry["key"],
+                entry["entity"],
+                entry["method"],
+                entry["apix_hash"],
+                entry["genotype"],
+                entry["result"],
+                entry["created"],
+                now,
+            ),
+        )
+
+    def evict(self):
+        """Remove expired entries, then trim the cache down to max_entries."""
+        with self._db.transaction() as conn:
+            conn.execute("DELETE FROM results WHERE created < ?", (time.time() - self.ttl,))
+            (count,) = conn.execute("SELECT COUNT(*) FROM results").fetchone()
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM results WHERE key IN "
+                    "(SELECT key FROM results ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+                logger.debug(f"Evicted {count - self.max_entries} cached results.")
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        """Close the underlying database connections."""
+        self._db.close()
+
+
+def get_result_cache(config):
+    """Return the shared ResultCache for a config, or None when caching is disabled."""
+    genetics_cfg = config.rizza.genetics
+    if not getattr(genetics_cfg, "result_cache", True):
+        return None
+    cache = getattr(config, "_result_cache", None)
+    if cache is None:
+        from rizza import apix_index
+
+        with _cache_lock:
+            cache = getattr(config, "_result_cache", None)
+            if cache is None:
+                index = apix_index.current_index()
+                cache = ResultCache(
+                    path=config.base_dir.joinpath("data/result_cache.db"),
+                    apix_hash=(index.apix_hash if index else None) or "",
+                    max_entries=getattr(genetics_cfg, "result_cache_max_entries", 100000),
+                    ttl=getattr(genetics_cfg, "result_cache_ttl", 604800),
+                )
+                config._result_cache = cache
+    return cache
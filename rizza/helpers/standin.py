@@ -0,0 +1,372 @@
+"""A local stand-in for the Satellite REST API, for offline throughput testing.
+
+The stand-in keeps every record in memory and follows the Foreman/Katello route
+conventions: /api/<resources> for index and create, /api/<resources>/<id> for show,
+update and destroy, /api/<parents>/<id>/<resources> for nested collections and
+/api/<resources>/<id>/<action> for actions. Point connection.hostname at it to run
+genetic, async, prune and task-manager workloads without a live Satellite.
+"""
+
+import base64
+from collections import Counter
+import copy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+from pathlib import Path
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import attr
+import yaml
+
+logger = logging.getLogger(__name__)
+
+# Path segments that only namespace the API
+ROUTE_PREFIXES = ("api", "katello", "v2")
+
+# Each entity is keyed by its route name. Fields listed under "required" must be present
+# and non-empty, "unique" values can't repeat, and "choices" restricts a field's values.
+DEFAULT_ENTITIES = {
+    "organizations": {"required": ["name"], "unique": ["name"]},
+    "locations": {"required": ["name"], "unique": ["name"]},
+    "domains": {"required": ["name"], "unique": ["name"]},
+    "architectures": {"required": ["name"], "unique": ["name"]},
+    "users": {"required": ["login", "mail"], "unique": ["login"]},
+    "usergroups": {"required": ["name"], "unique": ["name"]},
+    "subnets": {"required": ["name", "network", "mask"], "unique": ["name"]},
+    "hostgroups": {"required": ["name"], "unique": ["name"]},
+    "hosts": {"required": ["name", "organization_id", "location_id"], "unique": ["name"]},
+    "products": {"required": ["name", "organization_id"]},
+    "repositories": {
+        "required": ["name", "product_id", "content_type"],
+        "choices": {"content_type": ["yum", "puppet", "docker", "file"]},
+    },
+    "content_views": {"required": ["name", "organization_id"]},
+    "activation_keys": {"required": ["name", "organization_id"]},
+    "host_collections": {"required": ["name", "organization_id"]},
+    "lifecycle_environments": {"required": ["name", "organization_id"]},
+}
+
+
+def pluralize(name):
+    """Return the route name for a singular entity name (organization -> organizations)."""
+    if name.endswith("y") and not name.endswith(("ay", "ey", "oy", "uy")):
+        return f"{name[:-1]}ies"
+    if name.endswith(("s", "x", "ch", "sh")):
+        return f"{name}es"
+    return f"{name}s"
+
+
+def singularize(name):
+    """Return the singular entity name for a route name (organizations -> organization)."""
+    if name.endswith("ies"):
+        return f"{name[:-3]}y"
+    if name.endswith(("sses", "xes", "ches", "shes")):
+        return name[:-2]
+    if name.endswith("s"):
+        return name[:-1]
+    return name
+
+
+def load_entities(path):
+    """Load an entity spec from a YAML file shaped like DEFAULT_ENTITIES."""
+    with Path(path).expanduser().open() as spec_file:
+        return yaml.safe_load(spec_file) or {}
+
+
+def _error(message, errors=None):
+    """Return a Foreman-style error payload."""
+    payload = {"error": {"message": message}}
+    if errors:
+        payload["error"]["errors"] = errors
+        payload["error"]["full_messages"] = [
+            f"{field.replace('_', ' ').capitalize()} {msg}"
+            for field, messages in errors.items()
+            for msg in messages
+        ]
+    return payload
+
+
+@attr.s()
+class StandInAPI:
+    """The stand-in's in-memory records and request handling, independent of HTTP.
+
+    :param entities: Entity spec; see DEFAULT_ENTITIES.
+    :param strict: Answer 404 for routes that aren't in the entity spec, instead of
+        accepting any fields for them.
+    :param latency: Seconds every request is delayed by.
+    :param jitter: Up to this many extra seconds are added to each delay at random.
+    :param error_rate: Fraction of requests answered with an injected 500.
+    :param seed: Seed for the jitter and error injection.
+    """
+
+    entities = attr.ib(factory=lambda: copy.deepcopy(DEFAULT_ENTITIES))
+    strict = attr.ib(default=False)
+    latency = attr.ib(default=0.0)
+    jitter = attr.ib(default=0.0)
+    error_rate = attr.ib(default=0.0)
+    seed = attr.ib(default=None)
+
+    def __attrs_post_init__(self):
+        """Prepare the record store and counters."""
+        self._records = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._random = random.Random(self.seed)
+        self.statuses = Counter()
+
+    def reset(self):
+        """Forget every record and counter."""
+        with self._lock:
+            self._records.clear()
+            self._next_id = 1
+            self.statuses.clear()
+
+    def records(self, resource):
+        """Return a copy of the records stored for a route name."""
+        with self._lock:
+            return [dict(record) for record in self._records.get(resource, {}).values()]
+
+    def _known(self, resource):
+        return resource in self.entities or resource in self._records
+
+    def _parse_path(self, path):
+        """Split a path into [(resource, id or None), ...] and a trailing action, if any."""
+        segments = [seg for seg in urlsplit(path).path.split("/") if seg]
+        while segments and segments[0] in ROUTE_PREFIXES:
+            segments.pop(0)
+        parts, action = [], None
+        for segment in segments:
+            if segment.isdigit() and parts and parts[-1][1] is None:
+                parts[-1] = (parts[-1][0], int(segment))
+            elif parts and parts[-1][1] is not None and not self._known(segment):
+                action = segment
+            else:
+                parts.append((segment, None))
+        return parts, action
+
+    def _validate(self, resource, payload, record_id=None):
+        """Return {field: [messages]} for everything wrong with a payload."""
+        spec = self.entities.get(resource, {})
+        errors = {}
+        if record_id is None:
+            for field in spec.get("required", []):
+                if payload.get(field) in (None, "", [], {}):
+                    errors.setdefault(field, []).append("can't be blank")
+        for field, choices in spec.get("choices", {}).items():
+            if field in payload and payload[field] not in choices:
+                errors.setdefault(field, []).append("is not included in the list")
+        existing = self._records.get(resource, {})
+        for field in spec.get("unique", []):
+            value = payload.get(field)
+            if value is None:
+                continue
+            for other_id, record in existing.items():
+                if other_id != record_id and record.get(field) == value:
+                    errors.setdefault(field, []).append("has already been taken")
+                    break
+        for field, value in payload.items():
+            if field.endswith("_ids"):
+                target, values = pluralize(field[:-4]), value
+            elif field.endswith("_id"):
+                target, values = pluralize(field[:-3]), [value]
+            else:
+                continue
+            if not self._known(target) or not isinstance(values, list):
+                continue
+            for ref in values:
+                try:
+                    found = int(ref) in self._records.get(target, {})
+                except (TypeError, ValueError):
+                    found = False
+                if not found:
+                    errors.setdefault(field, []).append(f"{ref} not found")
+        return errors
+
+    def _inject(self):
+        """Apply the configured latency, and decide whether this request fails."""
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            fail = bool(self.error_rate) and self._random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        return fail
+
+    def handle(self, method, path, body=None):
+        """Answer one request.
+
+        :param method: HTTP method name.
+        :param path: Request path, with or without a query string.
+        :param body: Decoded JSON body, if any.
+        :returns: (status code, JSON-serializable payload)
+        """
+        fail = self._inject()
+        with self._lock:
+            if fail:
+                status, payload = 500, _error("Injected internal server error")
+            else:
+                status, payload = self._dispatch(method.upper(), path, body or {})
+            self.statuses[status] += 1
+        return status, payload
+
+    def _dispatch(self, method, path, body):
+        parts, action = self._parse_path(path)
+        if not parts:
+            return 200, {"status": "ok", "version": "stand-in"}
+        resource, record_id = parts[-1]
+        if self.strict and resource not in self.entities:
+            return 404, _error(f"Route {path} not found")
+
+        table = self._records.setdefault(resource, {})
+        parent_fields = {
+            f"{singularize(parent)}_id": parent_id for parent, parent_id in parts[:-1] if parent_id
+        }
+        for parent, parent_id in parts[:-1]:
+            if parent_id is not None and parent_id not in self._records.get(parent, {}):
+                return 404, _error(f"Resource {singularize(parent)} not found by id '{parent_id}'")
+
+        if record_id is None:
+            if method == "GET":
+                results = [
+                    record
+                    for record in table.values()
+                    if all(record.get(key) == value for key, value in parent_fields.items())
+                ]
+                return 200, {
+                    "total": len(table),
+                    "subtotal": len(results),
+                    "page": 1,
+                    "per_page": len(results),
+                    "results": results,
+                }
+            if method == "POST":
+                payload = body.get(singularize(resource), body)
+                if not isinstance(payload, dict):
+                    return 422, _error("Invalid payload")
+                payload = {**payload, **parent_fields}
+                errors = self._validate(resource, payload)
+                if errors:
+                    return 422, _error("Validation failed", errors)
+                record = {**payload, "id": self._next_id, "created_at": time.time()}
+                self._next_id += 1
+                table[record["id"]] = record
+                return 201, record
+            return 405, _error(f"{method} not allowed on {path}")
+
+        record = table.get(record_id)
+        if record is None:
+            return 404, _error(f"Resource {singularize(resource)} not found by id '{record_id}'")
+        if action:
+            return 202, {
+                "id": record_id,
+                "action": action,
+                "state": "stopped",
+                "result": "success",
+            }
+        if method == "GET":
+            return 200, record
+        if method in ("PUT", "PATCH"):
+            payload = body.get(singularize(resource), body)
+            if not isinstance(payload, dict):
+                return 422, _error("Invalid payload")
+            errors = self._validate(resource, payload, record_id=record_id)
+            if errors:
+                return 422, _error("Validation failed", errors)
+            record.update({key: value for key, value in payload.items() if key != "id"})
+            return 200, record
+        if method == "DELETE":
+            return 200, table.pop(record_id)
+        return 405, _error(f"{method} not allowed on {path}")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Translate HTTP requests into StandInAPI.handle calls."""
+
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self):
+        api = self.server.api
+        auth = self.server.auth
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if auth and self.headers.get("Authorization") != (
+            f"Basic {base64.b64encode(auth.encode()).decode()}"
+        ):
+            status, payload = 401, _error("Unable to authenticate user")
+        else:
+            try:
+                body = json.loads(raw) if raw else {}
+            except ValueError:
+                status, payload = 400, _error("Request body is not valid JSON")
+            else:
+                status, payload = api.handle(self.command, self.path, body)
+        data = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _respond
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+@attr.s()
+class StandInServer:
+    """Serve a StandInAPI over HTTP from a background thread.
+
+    :param api: The StandInAPI to serve.
+    :param host: Interface to listen on.
+    :param port: Port to listen on (0 picks a free one).
+    :param auth: "user:password" that requests must authenticate with, or None for any.
+    """
+
+    api = attr.ib(factory=StandInAPI)
+    host = attr.ib(default="127.0.0.1")
+    port = attr.ib(default=0)
+    auth = attr.ib(default=None)
+
+    def __attrs_post_init__(self):
+        """Bind the listening socket."""
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.api = self.api
+        self._httpd.auth = self.auth
+        self.port = self._httpd.server_address[1]
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base URL of the running server."""
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="rizza-standin", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve in the calling thread until interrupted."""
+        self._httpd.serve_forever()
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,239 @@
+"""Storage backends for saved genetic tests.
+
+A saved test is the task dict ({entity, method, arg_dict}) of the best organism found
+for an (entity, method, mode) triple, where mode is "positive" or "negative".
+"""
+
+import abc
+import json
+import logging
+from pathlib import Path
+import threading
+import time
+
+import attr
+import yaml
+
+from rizza.helpers.db import SQLiteDB
+
+logger = logging.getLogger(__name__)
+
+_store_lock = threading.Lock()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS genetic_tests (
+    entity TEXT NOT NULL,
+    method TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    task TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (entity, method, mode)
+);
+"""
+
+
+def format_test_name(entity, method, mode):
+    """Return the "Entity method mode" name tests are saved under."""
+    return f"{entity} {method} {mode}"
+
+
+@attr.s()
+class GeneticTestStore(abc.ABC):
+    """Interface shared by every saved-test backend."""
+
+    @abc.abstractmethod
+    def get(self, entity, method, mode):
+        """Return the saved task dict for (entity, method, mode), or None."""
+
+    @abc.abstractmethod
+    def put(self, entity, method, mode, task):
+        """Insert or replace the saved task dict for (entity, method, mode)."""
+
+    @abc.abstractmethod
+    def delete(self, entity, method, mode):
+        """Remove a saved test, if it exists."""
+
+    @abc.abstractmethod
+    def tests(self, entity):
+        """Return {(method, mode): task} for every test saved for an entity."""
+
+    @abc.abstractmethod
+    def entities(self):
+        """Return the names of all entities with saved tests."""
+
+    def import_yaml(self, directory):
+        """Copy every test from a data/genetic_tests style YAML directory into this store.
+
+        :returns: The number of tests imported.
+        """
+        source = YAMLStore(directory)
+        count = 0
+        for entity in source.entities():
+            for (method, mode), task in source.tests(entity).items():
+                self.put(entity, method, mode, task)
+                count += 1
+        return count
+
+    def export_yaml(self, directory):
+        """Write every test in this store out as a data/genetic_tests style YAML directory.
+
+        :returns: The number of tests exported.
+        """
+        target = YAMLStore(directory)
+        count = 0
+        for entity in self.entities():
+            for (method, mode), task in self.tests(entity).items():
+                target.put(entity, method, mode, task)
+                count += 1
+        return count
+
+
+@attr.s()
+class YAMLStore(GeneticTestStore):
+    """The original one-YAML-file-per-entity layout.
+
+    :param directory: Directory holding the <Entity>.yaml files.
+    """
+
+    directory = attr.ib(converter=Path)
+
+    def __attrs_post_init__(self):
+        """Serialize file access between threads."""
+        self._lock = threading.RLock()
+
+    def _file(self, entity):
+        return self.directory.joinpath(f"{entity}.yaml")
+
+    def _read(self, entity):
+        test_file = self._file(entity)
+        if not test_file.exists():
+            return {}
+        with test_file.open("r") as infile:
+            return yaml.load(infile, Loader=yaml.FullLoader) or {}
+
+    def _write(self, entity, tests):
+        test_file = self._file(entity)
+        if not tests:
+            test_file.unlink(missing_ok=True)
+            return
+        test_file.parent.mkdir(parents=True, exist_ok=True)
+        with test_file.open("w+") as outfile:
+            yaml.dump(tests, outfile, default_flow_style=False)
+
+    def get(self, entity, method, mode):
+        """Return the saved task dict for (entity, method, mode), or None."""
+        with self._lock:
+            return self._read(entity).get(format_test_name(entity, method, mode))
+
+    def put(self, entity, method, mode, task):
+        """Insert or replace the saved task dict for (entity, method, mode)."""
+        with self._lock:
+            tests = self._read(entity)
+            tests[format_test_name(entity, method, mode)] = task
+            self._write(entity, tests)
+
+    def delete(self, entity, method, mode):
+        """Remove a saved test, deleting the entity's file once it is empty."""
+        with self._lock:
+            tests = self._read(entity)
+            if tests.pop(format_test_name(entity, method, mode), None) is not None:
+                self._write(entity, tests)
+
+    def tests(self, entity):
+        """Return {(method, mode): task} for every test saved for an entity."""
+        with self._lock:
+            saved = self._read(entity)
+        tests = {}
+        for name, task in saved.items():
+            _, method, mode = name.split(" ")
+            tests[(method, mode)] = task
+        return tests
+
+    def entities(self):
+        """Return the names of all entities with saved tests."""
+        if not self.directory.exists():
+            return []
+        return sorted(path.stem for path in self.directory.glob("*.yaml"))
+
+
+@attr.s()
+class SQLiteStore(GeneticTestStore):
+    """Saved tests in an indexed SQLite table, safe for concurrent writers.
+
+    :param path: Path to the SQLite database file.
+    """
+
+    path = attr.ib(converter=Path)
+
+    def __attrs_post_init__(self):
+        """Open the database."""
+        self._db = SQLiteDB(self.path, schema=SCHEMA)
+
+    def get(self, entity, method, mode):
+        """Return the saved task dict for (entity, method, mode), or None."""
+        row = self._db.execute(
+            "SELECT task FROM genetic_tests WHERE entity = ? AND method = ? AND mode = ?",
+            (entity, method, mode),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, entity, method, mode, task):
+        """Insert or replace the saved task dict for (entity, method, mode)."""
+        with self._db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO genetic_tests VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (entity, method, mode) "
+                "DO UPDATE SET task = excluded.task, updated = excluded.updated",
+                (entity, method, mode, json.dumps(task), time.time()),
+            )
+
+    def delete(self, entity, method, mode):
+        """Remove a saved test, if it exists."""
+        with self._db.transaction() as conn:
+            conn.execute(
+                "DELETE FROM genetic_tests WHERE entity = ? AND method = ? AND mode = ?",
+                (entity, method, mode),
+            )
+
+    def tests(self, entity):
+        """Return {(method, mode): task} for every test saved for an entity."""
+        rows = self._db.execute(
+            "SELECT method, mode, task FROM genetic_tests WHERE entity = ?", (entity,)
+        )
+        return {(method, mode): json.loads(task) for method, mode, task in rows}
+
+    def entities(self):
+        """Return the names of all entities with saved tests."""
+        rows = self._db.execute("SELECT DISTINCT entity FROM genetic_tests ORDER BY entity")
+        return [entity for (entity,) in rows]
+
+    def close(self):
+        """Close the underlying database connections."""
+        self._db.close()
+
+
+def get_test_store(config):
+    """Return the shared saved-test store for a config.
+
+    The backend is picked by the top-level "test_store" setting ("sqlite" or "yaml").
+    A new SQLite store imports any tests already saved in data/genetic_tests.
+    """
+    store = getattr(config, "_test_store", None)
+    if store is not None:
+        return store
+    with _store_lock:
+        store = getattr(config, "_test_store", None)
+        if store is not None:
+            return store
+        yaml_dir = config.base_dir.joinpath("data/genetic_tests")
+        if getattr(config.rizza, "test_store", "sqlite") == "yaml":
+            store = YAMLStore(yaml_dir)
+        else:
+            db_path = config.base_dir.joinpath("data/genetic_tests.db")
+            is_new = not db_path.exists()
+            store = SQLiteStore(db_path)
+            if is_new and yaml_dir.exists():
+                count = store.import_yaml(yaml_dir)
+                logger.info(f"Imported {count} saved tests from {yaml_dir} into {db_path}")
+        config._test_store = store
+    return store
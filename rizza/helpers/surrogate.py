@@ -0,0 +1,146 @@
+"""A cheap, online surrogate for an organism's fitness.
+
+Every organism a genetic run evaluates costs real API calls, even when its genome is
+nearly identical to hundreds that already scored badly. The SurrogateModel is a
+feature-hashed linear model over a genome's param and input tokens, trained on each
+(genome, points) pair the run produces. Once it has seen enough of them, it ranks each
+generation's new organisms so that only the most promising fraction (plus a random
+sample, to keep the model honest) are actually executed.
+"""
+
+import logging
+import random
+import zlib
+
+import attr
+
+logger = logging.getLogger(__name__)
+
+# Points are divided by this before training, to keep the updates well scaled
+POINT_SCALE = 1000.0
+
+
+def tokens(genome):
+    """Return the feature tokens for a genome."""
+    found = [f"len:{len(genome)}"]
+    for param, inpt in genome:
+        found.extend((f"p:{param}", f"i:{inpt}", f"pi:{param}={inpt}"))
+    return found
+
+
+@attr.s()
+class SurrogateModel:
+    """An online linear regression over hashed genome tokens.
+
+    :param dimensions: Size of the hashed feature space.
+    :param learning_rate: Step size of each online update.
+    """
+
+    dimensions = attr.ib(default=4096)
+    learning_rate = attr.ib(default=0.05)
+
+    def __attrs_post_init__(self):
+        """Start with an untrained model."""
+        self._weights = [0.0] * self.dimensions
+        self._bias = 0.0
+        self.observations = 0
+
+    def _features(self, genome):
+        dims = self.dimensions
+        return [zlib.crc32(token.encode()) % dims for token in tokens(genome)]
+
+    def _raw(self, features):
+        weights = self._weights
+        return self._bias + sum(weights[index] for index in features) / len(features)
+
+    def predict(self, genome):
+        """Return the predicted points for a genome."""
+        return self._raw(self._features(genome)) * POINT_SCALE
+
+    def update(self, genome, points):
+        """Train on one observed (genome, points) pair."""
+        features = self._features(genome)
+        error = points / POINT_SCALE - self._raw(features)
+        step = self.learning_rate * error
+        self._bias += step
+        for index in features:
+            self._weights[index] += step
+        self.observations += 1
+
+
+@attr.s()
+class SurrogateFilter:
+    """Decide which organisms are worth executing.
+
+    :param model: The SurrogateModel to rank organisms with.
+    :param fraction: Fraction of candidates executed on the model's say-so.
+    :param exploration: Chance that a candidate the model would skip runs anyway.
+    :param warmup: Observations needed before the model is trusted at all.
+    :param maximize: Whether higher points are better (False when seeking bad results).
+    :param seed: Seed for the exploration draws.
+    """
+
+    model = attr.ib(factory=SurrogateModel)
+    fraction = attr.ib(default=0.5)
+    exploration = attr.ib(default=0.1)
+    warmup = attr.ib(default=50)
+    maximize = attr.ib(default=True)
+    seed = attr.ib(default=None)
+
+    def __attrs_post_init__(self):
+        """Prepare the exploration draws and counters."""
+        self._random = random.Random(self.seed)
+        self.executed = 0
+        self.skipped = 0
+
+    @property
+    def ready(self):
+        """Whether the model has seen enough results to filter with."""
+        return self.model.observations >= self.warmup
+
+    def select(self, organisms):
+        """Split candidates into the ones to execute and the ones to skip.
+
+        Skipped organisms are given their predicted points, so they still take part in
+        selection.
+
+        :param organisms: Organisms that would otherwise all be executed.
+        :returns: The organisms to execute.
+        """
+        if not self.ready or not organisms:
+            self.executed += len(organisms)
+            return list(organisms)
+        predictions = {id(org): self.model.predict(org.genome) for org in organisms}
+        ranked = sorted(organisms, key=lambda org: predictions[id(org)], reverse=self.maximize)
+        keep = max(1, round(len(ranked) * self.fraction))
+        chosen = ranked[:keep]
+        for organism in ranked[keep:]:
+            if self._random.random() < self.exploration:
+                chosen.append(organism)
+            else:
+                organism.points = round(predictions[id(organism)])
+        self.executed += len(chosen)
+        self.skipped += len(organisms) - len(chosen)
+        return chosen
+
+    def learn(self, organism):
+        """Train the model on an organism whose points came from a real execution."""
+        self.model.update(organism.genome, organism.points)
+
+    def report(self):
+        """Return a one-line summary of the API calls the filter saved."""
+        total = self.executed + self.skipped
+        return f"Surrogate model skipped {self.skipped} of {total} evaluations."
+
+
+def get_surrogate(config, maximize=True):
+    """Return a new SurrogateFilter for one run, or None when it's disabled."""
+    genetics_cfg = config.rizza.genetics
+    if not getattr(genetics_cfg, "surrogate", False):
+        return None
+    return SurrogateFilter(
+        fraction=getattr(genetics_cfg, "surrogate_fraction", 0.5),
+        exploration=getattr(genetics_cfg, "surrogate_exploration", 0.1),
+        warmup=getattr(genetics_cfg, "surrogate_warmup", 50),
+        maximize=maximize,
+    )
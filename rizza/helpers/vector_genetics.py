@@ -0,0 +1,361 @@
+"""A NumPy engine that breeds a whole generation with array operations.
+
+genetics.Population stays the front end. With engine="vector" it hands breeding,
+sorting and diversity measurement to a VectorEngine, which encodes every genome as
+rows of integer indices into per-sublist vocabularies. The genome [param_names,
+param_inputs] of N organisms becomes an (N, 2, L) array padded with PAD, plus their
+lengths. Tournament selection, crossover and mutation then run once per generation
+over the arrays, instead of once per organism in Python.
+
+NumPy is optional: install it with `pip install rizza[vector]`.
+"""
+
+import attr
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+PAD = -1
+SWAP_CHANCE = 0.1  # Organism.mutate's default mutation_chance
+RESIZE_CHANCE = 0.1  # Chance of each variable-length add/remove operator
+
+
+@attr.s()
+class Vocabulary:
+    """A growing two-way mapping between gene values and integer codes."""
+
+    values = attr.ib(factory=list)
+
+    def __attrs_post_init__(self):
+        """Index any initial values."""
+        self._codes = {value: code for code, value in enumerate(self.values)}
+        self._array = None
+
+    def encode(self, value):
+        """Return the code for a value, adding it to the vocabulary if it's new."""
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+            self._array = None
+        return code
+
+    def decode(self, codes):
+        """Return the list of values for an array of codes."""
+        if self._array is None or len(self._array) != len(self.values):
+            self._array = np.empty(len(self.values), dtype=object)
+            for code, value in enumerate(self.values):
+                self._array[code] = value
+        return self._array[codes].tolist()
+
+    def __len__(self):
+        return len(self.values)
+
+
+@attr.s()
+class VectorEngine:
+    """Vectorized breeding for a genetics.Population.
+
+    :param rev_pop_sort: True when higher points are better (as in Population).
+    :param crossover_method: "single_point" or "uniform".
+    :param seed: Optional seed for the engine's random generator.
+    """
+
+    rev_pop_sort = attr.ib(default=False)
+    crossover_method = attr.ib(default="single_point")
+    seed = attr.ib(default=None)
+
+    def __attrs_post_init__(self):
+        """Create the random generator and vocabularies."""
+        if np is None:
+            raise ImportError(
+                "The vector population engine requires numpy: pip install rizza[vector]"
+            )
+        self.rng = np.random.default_rng(self.seed)
+        self._vocabs = []
+        self._nested = True
+        self._pools = None
+        self._pools_key = None
+        # The last decoded generation: {id(organism): (organism, genes, row)} and its arrays
+        self._decoded = {}
+        self._block = (np.empty((0, 1, 0), dtype=np.int64), np.empty(0, dtype=np.int64))
+
+    def _vocab(self, k):
+        while len(self._vocabs) <= k:
+            self._vocabs.append(Vocabulary())
+        return self._vocabs[k]
+
+    # --- encoding -------------------------------------------------------------------
+
+    def encode(self, organisms):
+        """Encode organisms as (genes, lengths, points) arrays.
+
+        genes has shape (N, K, L): K sublists per genome, padded with PAD to length L.
+        Organisms this engine decoded, whose genes haven't been replaced since, are
+        copied from the last decoded block instead of being encoded again.
+        """
+        if not organisms:
+            return np.empty((0, 1, 0), dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+        self._nested = isinstance(organisms[0].genes[0], list) if organisms[0].genes else True
+        hits, misses = [], []
+        for row, org in enumerate(organisms):
+            cached = self._decoded.get(id(org))
+            if cached and cached[0] is org and cached[1] is org.genes:
+                hits.append((row, cached[2]))
+            else:
+                misses.append(row)
+
+        sublists = {
+            row: organisms[row].genes if self._nested else [organisms[row].genes] for row in misses
+        }
+        k_count = max((len(subs) for subs in sublists.values()), default=0)
+        block_genes, block_lengths = self._block
+        if hits:
+            k_count = max(k_count, block_genes.shape[1])
+        lengths = np.zeros(len(organisms), dtype=np.int64)
+        for row, subs in sublists.items():
+            lengths[row] = min(len(sub) for sub in subs) if subs else 0
+        if hits:
+            rows, block_rows = (np.array(idx) for idx in zip(*hits, strict=True))
+            lengths[rows] = block_lengths[block_rows]
+        width = int(lengths.max())
+        genes = np.full((len(organisms), k_count, width), PAD, dtype=np.int64)
+        if hits:
+            block_width = min(width, block_genes.shape[2])
+            genes[rows, : block_genes.shape[1], :block_width] = block_genes[
+                block_rows, :, :block_width
+            ]
+        for k in range(k_count):
+            encode = self._vocab(k).encode
+            for row, subs in sublists.items():
+                if k < len(subs) and lengths[row]:
+                    genes[row, k, : lengths[row]] = [encode(v) for v in subs[k][: lengths[row]]]
+        points = np.fromiter((org.points for org in organisms), dtype=float, count=len(organisms))
+        return genes, lengths, points
+
+    def decode(self, genes, lengths):
+        """Turn encoded genomes back into unscored Organisms, remembering their encoding."""
+        from rizza.helpers.genetics import Organism
+
+        safe = np.where(genes >= 0, genes, 0)
+        values = [self._vocab(k).decode(safe[:, k, :]) for k in range(genes.shape[1])]
+        organisms = []
+        self._decoded = {}
+        for row, length in enumerate(lengths.tolist()):
+            subs = [sub[row][:length] for sub in values]
+            organism = Organism(genes=subs if self._nested else subs[0])
+            organisms.append(organism)
+            self._decoded[id(organism)] = (organism, organism.genes, row)
+        self._block = (genes, lengths)
+        return organisms
+
+    # --- population-wide measurements -------------------------------------------------
+
+    def order(self, organisms, reverse=None):
+        """Return the indices that sort organisms by points (stable)."""
+        reverse = self.rev_pop_sort if reverse is None else reverse
+        points = np.fromiter((org.points for org in organisms), dtype=float, count=len(organisms))
+        return np.argsort(-points if reverse else points, kind="stable")
+
+    @staticmethod
+    def diversity(organisms):
+        """Return the fraction of distinct scores in the population."""
+        points = np.fromiter((org.points for org in organisms), dtype=float, count=len(organisms))
+        return len(np.unique(points)) / len(points)
+
+    # --- breeding operators -----------------------------------------------------------------
+
+    def tournament(self, points, count, tournament_size=3):
+        """Return the winners of count tournaments of tournament_size random contestants."""
+        contestants = self.rng.integers(0, len(points), size=(count, max(1, tournament_size)))
+        scores = points[contestants]
+        pick = scores.argmax(axis=1) if self.rev_pop_sort else scores.argmin(axis=1)
+        return contestants[np.arange(count), pick]
+
+    def _compact(self, genes, keep):
+        """Move the kept positions of every row to the front, padding the rest."""
+        order = np.argsort(~keep, axis=1, kind="stable")
+        genes = np.take_along_axis(genes, order[:, None, :], axis=2)
+        lengths = keep.sum(axis=1)
+        padding = np.arange(genes.shape[2])[None, :] >= lengths[:, None]
+        genes[np.broadcast_to(padding[:, None, :], genes.shape)] = PAD
+        return genes, lengths
+
+    def crossover(self, genes1, lengths1, genes2, lengths2):
+        """Breed pairs of parents, keeping each sublist's positions paired.
+
+        Positions both parents have come from either parent (a shared single cut point,
+        or a per-position coin flip for uniform crossover). Extra positions of the longer
+        parent are each kept with 50% chance, like Population._breed_pair.
+        """
+        count, _, width = genes1.shape
+        positions = np.arange(width)[None, :]
+        min_len = np.minimum(lengths1, lengths2)[:, None]
+        max_len = np.maximum(lengths1, lengths2)[:, None]
+        if self.crossover_method == "uniform":
+            take_first = self.rng.random((count, width)) < 0.5
+        else:
+            take_first = positions < self.rng.integers(0, min_len + 1)
+        common = positions < min_len
+        longer = np.where((lengths1 >= lengths2)[:, None, None], genes1, genes2)
+        child = np.where(
+            common[:, None, :], np.where(take_first[:, None, :], genes1, genes2), longer
+        )
+        extra = (positions >= min_len) & (positions < max_len)
+        keep = common | (extra & (self.rng.random((count, width)) < 0.5))
+        return self._compact(child, keep)
+
+    def _pool_matrix(self, type_pools):
+        """Return (pools, sizes): input codes compatible with each param code."""
+        key = (id(type_pools), len(self._vocab(0)))
+        if self._pools_key != key:
+            params, inputs = self._vocab(0), self._vocab(1)
+            for param in type_pools:
+                params.encode(param)
+            width = max((len(pool) for pool in type_pools.values()), default=0)
+            pools = np.full((len(params), max(width, 1)), PAD, dtype=np.int64)
+            sizes = np.zeros(len(params), dtype=np.int64)
+            for param, pool in type_pools.items():
+                code = params.encode(param)
+                sizes[code] = len(pool)
+                pools[code, : len(pool)] = [inputs.encode(value) for value in pool]
+            self._pools, self._pools_key = (pools, sizes), (id(type_pools), len(params))
+        return self._pools
+
+    def _own_values(self, genes, lengths, k, rows):
+        """Pick a random existing value from sublist k of each row."""
+        idx = self.rng.integers(0, np.maximum(lengths[rows], 1))
+        return genes[rows, k, idx]
+
+    def mutate(self, genes, lengths, rows, type_pools=None, available_genes=None):
+        """Mutate the selected rows in place, like Organism.mutate does one at a time.
+
+        Nested genomes with available_genes can gain or lose a (param, input) pair.
+        Then each sublist either swaps two positions or replaces one value: inputs are
+        drawn from the param's type pool when there is one, anything else from the
+        row's own values.
+
+        :returns: The (possibly widened) genes array and the updated lengths.
+        """
+        rows = np.flatnonzero(rows)
+        if not len(rows):
+            return genes, lengths
+        pools = sizes = None
+        if type_pools and self._nested and genes.shape[1] >= 2:
+            pools, sizes = self._pool_matrix(type_pools)
+
+        if available_genes and self._nested and genes.shape[1] >= 2:
+            genes = np.concatenate(
+                [genes, np.full((*genes.shape[:2], 1), PAD, dtype=genes.dtype)], axis=2
+            )
+            # Add a pair with a param the row doesn't have yet
+            adding = rows[self.rng.random(len(rows)) < RESIZE_CHANCE]
+            if len(adding):
+                candidates = np.array([self._vocab(0).encode(g) for g in available_genes])
+                new_params = candidates[self.rng.integers(0, len(candidates), len(adding))]
+                present = (genes[adding, 0, :] == new_params[:, None]).any(axis=1)
+                new_inputs = self._own_values(genes, lengths, 1, adding)
+                usable = lengths[adding] > 0
+                if pools is not None:
+                    has_pool = new_params < len(sizes)
+                    has_pool[has_pool] = sizes[new_params[has_pool]] > 0
+                    pooled = np.flatnonzero(has_pool)
+                    if len(pooled):
+                        pick = self.rng.integers(0, sizes[new_params[pooled]])
+                        new_inputs[pooled] = pools[new_params[pooled], pick]
+                    usable |= has_pool
+                ok = ~present & usable
+                adding, new_params, new_inputs = adding[ok], new_params[ok], new_inputs[ok]
+                genes[adding, 0, lengths[adding]] = new_params
+                genes[adding, 1, lengths[adding]] = new_inputs
+                lengths[adding] += 1
+            # Remove a random pair, never going below one
+            removing = rows[(self.rng.random(len(rows)) < RESIZE_CHANCE) & (lengths[rows] > 1)]
+            if len(removing):
+                keep = np.arange(genes.shape[2])[None, :] < lengths[:, None]
+                keep[removing, self.rng.integers(0, lengths[removing])] = False
+                genes, lengths = self._compact(genes, keep)
+
+        rows = rows[lengths[rows] > 0]
+        for k in range(genes.shape[1]):
+            swap = self.rng.random(len(rows)) < SWAP_CHANCE
+            swapping, replacing = rows[swap], rows[~swap]
+            if len(swapping):
+                first = self.rng.integers(0, lengths[swapping])
+                second = self.rng.integers(0, lengths[swapping])
+                values = genes[swapping, k, first]
+                genes[swapping, k, first] = genes[swapping, k, second]
+                genes[swapping, k, second] = values
+            if len(replacing):
+                idx = self.rng.integers(0, lengths[replacing])
+                values = self._own_values(genes, lengths, k, replacing)
+                if k == 1 and pools is not None:
+                    params = genes[replacing, 0, idx]
+                    has_pool = (params >= 0) & (params < len(sizes))
+                    has_pool[has_pool] = sizes[params[has_pool]] > 0
+                    pooled = np.flatnonzero(has_pool)
+                    if len(pooled):
+                        pick = self.rng.integers(0, sizes[params[pooled]])
+                        values[pooled] = pools[params[pooled], pick]
+                genes[replacing, k, idx] = values
+        return genes, lengths
+
+    def breed(
+        self,
+        organisms,
+        count,
+        elite_count,
+        *,
+        tournament_size=3,
+        mutation_chance=0.0,
+        type_pools=None,
+        available_genes=None,
+    ):
+        """Return elites plus bred offspring for the next generation.
+
+        :param organisms: The current population, sorted best first.
+        :param count: Number of organisms to return.
+        :param elite_count: Number of top organisms carried over unchanged.
+        :param mutation_chance: Probability that each offspring is mutated.
+        """
+        genes, lengths, points = self.encode(organisms)
+        elite_count = min(elite_count, len(points))
+        children = max(0, count - elite_count)
+        if not children or not len(points):
+            return self._with_elite_points(
+                self.decode(genes[:elite_count], lengths[:elite_count]), organisms
+            )
+        first = self.tournament(points, children, tournament_size)
+        second = self.tournament(points, children, tournament_size)
+        child_genes, child_lengths = self.crossover(
+            genes[first], lengths[first], genes[second], lengths[second]
+        )
+        if mutation_chance:
+            child_genes, child_lengths = self.mutate(
+                child_genes,
+                child_lengths,
+                self.rng.random(children) <= mutation_chance,
+                type_pools=type_pools,
+                available_genes=available_genes,
+            )
+        width = max(genes.shape[2], child_genes.shape[2])
+        elite_genes = np.full((elite_count, genes.shape[1], width), PAD, dtype=np.int64)
+        elite_genes[:, :, : genes.shape[2]] = genes[:elite_count]
+        child_block = np.full((children, genes.shape[1], width), PAD, dtype=np.int64)
+        child_block[:, :, : child_genes.shape[2]] = child_genes
+        return self._with_elite_points(
+            self.decode(
+                np.concatenate([elite_genes, child_block]),
+                np.concatenate([lengths[:elite_count], child_lengths]),
+            ),
+            organisms[:elite_count],
+        )
+
+    @staticmethod
+    def _with_elite_points(bred, elites):
+        """Carry the elites' scores over to their copies at the front of bred."""
+        for copy, elite in zip(bred, elites, strict=False):
+            copy.points = elite.points
+        return bred
@@ -1,6 +1,5 @@
 """A task handler to import, export, and run test tasks."""
 import asyncio
-from contextlib import suppress
 import json
 import logging
 from pathlib import Path
@@ -8,6 +7,8 @@ from pathlib import Path
 import attr
 
 from rizza.entity_tester import EntityTestTask
+from rizza.helpers import concurrency, executors, profiling
+from rizza.helpers.logging import flush_logs, log_file
 from rizza.helpers.misc import json_serial
 
 logger = logging.getLogger(__name__)
@@ -59,30 +60,37 @@ class TaskManager:
                     json.dumps(attr.asdict(test), default=json_serial),
                 )
             )
+        flush_logs()
 
 
 @attr.s()
 class AsyncTaskManager(TaskManager):
-    """An asynchronous version of the TaskManager class."""
+    """An asynchronous version of the TaskManager class.
+
+    :param max_running: Ceiling on tests in flight at once. The concurrency controller
+        adapts the real limit to the server's latency and overload rate.
+    """
 
     task_generator = attr.ib()
     max_running = attr.ib(default=25)
 
     def __attrs_post_init__(self):
         """Setup our remaining helpers"""
-        self.loop = asyncio.get_event_loop()
-        self.max_running = asyncio.Semaphore(self.max_running)
+        self.loop = None
+        self._concurrency = self.max_running
+        self._control = None
         if isinstance(self.task_generator, str):
             self.task_generator = super().import_tasks(self.task_generator)
 
     async def _run_test(self, test, mock=False):
         before = attr.assoc(test)
-        async with self.max_running:
-            try:
-                result = await self.loop.run_in_executor(None, test.execute, mock)
-            except Exception as err:
-                logger.error(err)
-                result = "Unhandled Exception"
+        try:
+            result = await self._control.call(
+                lambda: self.loop.run_in_executor(None, test.execute, mock)
+            )
+        except Exception as err:
+            logger.error(err)
+            result = "Unhandled Exception"
         logger.info(
             "{}~{}~{}\n".format(
                 json.dumps(attr.asdict(before), default=json_serial),
@@ -96,8 +104,19 @@ class AsyncTaskManager(TaskManager):
         tasks = [asyncio.ensure_future(self._run_test(task, mock)) for task in self.task_generator]
         await asyncio.wait(tasks)
 
-    def run_tests(self, mock=False):
-        """Run the tests passed in."""
-        self.loop.run_until_complete(self._async_loop(mock))
-        with suppress(IndexError):
-            return logger.handlers[1].baseFilename
+    def run_tests(self, mock=False, config=None):
+        """Run the tests passed in.
+
+        :param config: Optional Config whose shared AsyncRuntime should be reused, whose
+            genetics settings tune the concurrency controller, and whose Profiler (if
+            profiling.start() attached one) profiles the run as one section.
+        """
+        self._control = concurrency.get_concurrency(config, self._concurrency)
+        with (
+            profiling.section(config, "tasks"),
+            executors.async_runtime(config, self._concurrency) as runtime,
+        ):
+            self.loop = runtime.loop
+            runtime.run(self._async_loop(mock))
+        flush_logs()
+        return log_file()
@@ -0,0 +1,60 @@
+"""Tests for rizza.helpers.checkpoint."""
+
+import random
+
+from rizza.helpers import checkpoint, genetics
+from rizza.helpers.genome import Genome
+
+
+def _population():
+    return genetics.Population(
+        gene_base=[[["name"], ["gen_alpha"]]],
+        population_count=4,
+        generator_function=lambda: [["name", "label"], ["gen_alpha", "gen_utf8"]],
+        gene_length=1,
+    )
+
+
+def test_positive_round_trip(tmp_path):
+    """A restored checkpoint reproduces the population, RNG and fitness points"""
+    population = _population()
+    for points, org in enumerate(population.population):
+        org.points = points * 100
+    population._stagnation_counter = 3
+    genome = population.population[0].genome
+    fitness = {genome: ({"fail": {"HTTPError": "422"}}, -200)}
+    ckpt = checkpoint.Checkpoint(tmp_path / "run.ckpt")
+    ckpt.save(checkpoint.capture("Org create positive", 7, population, fitness))
+    expected = [random.random() for _ in range(3)]
+
+    restored = _population()
+    generation, restored_fitness = checkpoint.restore(ckpt.load(), restored)
+    assert generation == 7
+    assert [org.points for org in restored.population] == [0, 100, 200, 300]
+    assert [org.genes for org in restored.population] == [
+        org.genes for org in population.population
+    ]
+    assert restored._stagnation_counter == 3
+    assert restored_fitness == {Genome.from_genes(genome.to_genes()): -200}
+    assert [random.random() for _ in range(3)] == expected
+
+
+def test_positive_fitness_window(monkeypatch):
+    """Only the points of the most recent evaluations are checkpointed, without results"""
+    monkeypatch.setattr(checkpoint, "FITNESS_WINDOW", 2)
+    fitness = {
+        Genome.from_arg_dict({"name": name}): ({"pass": {"name": name}}, points)
+        for points, name in enumerate(["gen_alpha", "gen_utf8", "gen_html"])
+    }
+    state = checkpoint.capture("Org create positive", 1, _population(), fitness)
+    assert state["fitness"] == [[{"name": "gen_utf8"}, 1], [{"name": "gen_html"}, 2]]
+
+
+def test_negative_unreadable(tmp_path):
+    """Corrupt or missing checkpoints are ignored"""
+    ckpt = checkpoint.Checkpoint(tmp_path / "run.ckpt")
+    assert ckpt.load() is None
+    ckpt.path.write_bytes(b"not a checkpoint")
+    assert ckpt.load() is None
+    ckpt.clear()
+    assert not ckpt.path.exists()
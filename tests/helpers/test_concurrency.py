@@ -0,0 +1,125 @@
+"""Tests for rizza.helpers.concurrency."""
+
+import asyncio
+from contextlib import suppress
+from types import SimpleNamespace
+
+from rizza.helpers import concurrency
+
+OVERLOADED = {"fail": {"HTTPError": "503 Server Error: Service Unavailable for url"}}
+REJECTED = {"fail": {"HTTPError": "422 Client Error", "errors": ["Name can't be blank"]}}
+
+
+def test_positive_is_overload():
+    """Server errors and timeouts are overload; validation failures and passes aren't"""
+    assert concurrency.is_overload(OVERLOADED)
+    assert concurrency.is_overload({"fail": {"ReadTimeout": ["Read timed out."]}})
+    assert concurrency.is_overload({"fail": {"ConnectionError": ["RemoteDisconnected"]}})
+    assert not concurrency.is_overload(REJECTED)
+    assert not concurrency.is_overload({"pass": {"message": "Internal Server Error"}})
+    assert not concurrency.is_overload("Unhandled Exception")
+
+
+def test_positive_limiter_increase_and_decrease():
+    """Healthy rounds add one, overloaded or slow rounds halve the limit"""
+    limiter = concurrency.AIMDLimiter(limit=10, maximum=12)
+    for _ in range(10):
+        limiter.record(1.0)
+    assert limiter.limit == 11
+    for _ in range(11):
+        limiter.record(1.0)
+    for _ in range(12):
+        limiter.record(1.0)
+    assert limiter.limit == 12
+    for index in range(12):
+        limiter.record(1.0, overloaded=index < 2)
+    assert limiter.limit == 6
+    for _ in range(6):
+        limiter.record(5.0)
+    assert limiter.limit == 3
+
+
+def test_positive_circuit_breaker():
+    """The breaker opens after repeated overloads and closes after a good probe"""
+    now = [0.0]
+    breaker = concurrency.CircuitBreaker(threshold=3, cooldown=10, clock=lambda: now[0])
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record(True)
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    now[0] = 10.0
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record(True)
+    assert breaker.state == "open"
+    now[0] = 20.0
+    assert breaker.allow()
+    breaker.record(False)
+    assert breaker.state == "closed"
+    assert breaker.trips == 1
+
+
+def test_positive_failed_probe_frees_breaker():
+    """A probe call that raises doesn't leave the half-open breaker blocked"""
+    now = [0.0]
+    control = concurrency.AdaptiveConcurrency(
+        breaker=concurrency.CircuitBreaker(threshold=1, cooldown=10, clock=lambda: now[0]),
+    )
+
+    async def probe():
+        async with control.slot():
+            raise ConnectionResetError
+
+    async def run():
+        async with control.slot() as call:
+            call.result = OVERLOADED
+        assert control.breaker.state == "open"
+        now[0] = 10.0
+        with suppress(ConnectionResetError):
+            await probe()
+        async with control.slot() as call:
+            call.result = {"pass": "probe"}
+
+    asyncio.run(asyncio.wait_for(run(), 5))
+    assert control.breaker.state == "closed"
+    assert control.in_flight == 0
+
+
+def test_positive_call_retries_overload():
+    """Overloaded results are retried without exceeding the limit in flight"""
+    control = concurrency.AdaptiveConcurrency(
+        limiter=concurrency.AIMDLimiter(limit=3, maximum=3),
+        breaker=concurrency.CircuitBreaker(threshold=0),
+        retries=2,
+    )
+    attempts = {}
+    peak = [0]
+
+    async def evaluate(name):
+        peak[0] = max(peak[0], control.in_flight)
+        attempts[name] = attempts.get(name, 0) + 1
+        await asyncio.sleep(0)
+        return OVERLOADED if attempts[name] < 2 else {"pass": name}
+
+    async def run_all():
+        names = [f"org{index}" for index in range(8)]
+        return await asyncio.gather(*(control.call(lambda n=n: evaluate(n)) for n in names))
+
+    results = asyncio.run(run_all())
+    assert all("pass" in result for result in results)
+    assert control.requeued == 8
+    assert peak[0] <= 3
+    assert control.in_flight == 0
+
+
+def test_positive_fixed_concurrency():
+    """Without adaptive concurrency, the limit stays at max_running"""
+    config = SimpleNamespace(rizza=SimpleNamespace(genetics=SimpleNamespace()))
+    assert concurrency.get_concurrency(config, 40).limit == 10
+    config.rizza.genetics.adaptive_concurrency = False
+    control = concurrency.get_concurrency(config, 40)
+    assert not control.adaptive
+    for _ in range(100):
+        control.limiter.record(1.0, overloaded=True)
+    assert control.limit == 40
@@ -0,0 +1,116 @@
+"""Tests for rizza.helpers.constraints."""
+
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from rizza.helpers import constraints, genetics
+
+PARAMS = ["name", "label", "organization_id", "content_type"]
+
+
+def _http_422(errors):
+    return {
+        "fail": {
+            "HTTPError": {
+                "response": {"error": {"message": "Validation failed", "errors": errors}},
+            }
+        }
+    }
+
+
+def test_positive_classify():
+    assert constraints.classify("Name can't be blank") == "required"
+    assert constraints.classify("organization_id is required") == "required"
+    assert constraints.classify("Content type is not included in the list") == "invalid"
+    assert constraints.classify("create() got an unexpected keyword argument 'foo'") == "unknown"
+    assert constraints.classify("Name has already been taken") is None
+    assert constraints.classify("Resource organization not found by id '41'") == "missing"
+
+
+def test_positive_match_field():
+    assert constraints.match_field("organization", "can't be blank", PARAMS) == "organization_id"
+    assert constraints.match_field(None, "Organization id is required", PARAMS) == (
+        "organization_id"
+    )
+    assert constraints.match_field(None, "Name can't be blank", PARAMS) == "name"
+    assert constraints.match_field(None, "Something else broke", PARAMS) is None
+
+
+def test_positive_learn_required_and_forbidden():
+    """Missing fields become required; repeatedly rejected inputs become forbidden"""
+    found = constraints.Constraints(strike_limit=2)
+    arg_dict = {"label": "gen_alpha", "content_type": "gen_html"}
+    result = _http_422(
+        {
+            "name": ["can't be blank"],
+            "content_type": ["is not included in the list"],
+        }
+    )
+    assert found.learn(arg_dict, result, PARAMS)
+    assert found.required == {"name"}
+    assert not found.forbidden_inputs
+    found.learn(arg_dict, result, PARAMS)
+    assert found.forbidden_inputs == {"content_type": {"gen_html"}}
+    found.learn({}, {"fail": {"TypeError": ("unexpected keyword argument 'label'",)}}, PARAMS)
+    assert found.forbidden_params == {"label"}
+
+
+def test_positive_pass_clears_strikes():
+    """A passing result clears the strikes and ban of each param=input it used"""
+    found = constraints.Constraints(strike_limit=2)
+    arg_dict = {"content_type": "gen_html"}
+    rejected = _http_422({"content_type": ["is not included in the list"]})
+    found.learn(arg_dict, rejected, PARAMS)
+    assert found.learn({"content_type": "gen_html", "name": "gen_alpha"}, {"pass": {}}, PARAMS)
+    assert not found.strikes
+    found.learn(arg_dict, rejected, PARAMS)
+    assert not found.forbidden_inputs
+    found.learn(arg_dict, rejected, PARAMS)
+    assert found.forbidden_inputs == {"content_type": {"gen_html"}}
+    found.learn(arg_dict, {"pass": {}}, PARAMS)
+    assert found.allowed("content_type", "gen_html")
+
+
+def test_negative_missing_dependency_not_struck():
+    """A dependency whose record is gone doesn't count against its input"""
+    found = constraints.Constraints(strike_limit=1)
+    missing = _http_422({"organization": ["not found"]})
+    assert not found.learn({"organization_id": "genetic_known"}, missing, PARAMS)
+    assert found.allowed("organization_id", "genetic_known")
+    found.learn({"organization_id": "gen_integer"}, missing, PARAMS)
+    assert not found.allowed("organization_id", "gen_integer")
+
+
+def test_positive_repair():
+    """Repaired genes drop forbidden pairs and add required params"""
+    found = constraints.Constraints(
+        required={"name"},
+        forbidden_params={"label"},
+        forbidden_inputs={"content_type": {"gen_html"}},
+    )
+    pools = {"name": ["gen_alpha"], "content_type": ["gen_html", "gen_utf8"]}
+    genes = found.repair([["label", "content_type"], ["gen_alpha", "gen_html"]], pools)
+    assert genes == [["content_type", "name"], ["gen_utf8", "gen_alpha"]]
+    org = genetics.Organism(genes=[["label"], ["gen_alpha"]])
+    org.mutate(type_pools=pools, available_genes=["label"], constraints=found)
+    assert "label" not in org.genes[0]
+    assert "name" in org.genes[0]
+
+
+def test_positive_store_round_trip(tmp_path):
+    """Learned constraints survive a save and reload"""
+    path = tmp_path / "constraints.json"
+    store = constraints.ConstraintStore(path=path)
+    store.learn("Organization", "create", {}, _http_422({"name": ["can't be blank"]}), PARAMS)
+    store.save()
+    reloaded = constraints.ConstraintStore(path=path)
+    assert reloaded.get("Organization", "create").required == {"name"}
+    assert not reloaded.get("Organization", "update")
+
+
+def test_positive_get_constraint_store_shared(tmp_path):
+    """Threads asking for the store at once all get the same one"""
+    config = SimpleNamespace(base_dir=tmp_path, rizza=SimpleNamespace(genetics=SimpleNamespace()))
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        stores = list(pool.map(lambda _: constraints.get_constraint_store(config), range(16)))
+    assert all(store is stores[0] for store in stores)
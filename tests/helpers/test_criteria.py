@@ -0,0 +1,43 @@
+"""Tests for rizza.helpers.criteria."""
+
+from rizza.helpers import criteria
+from rizza.helpers.config import DEFAULT_CONFIG
+from rizza.helpers.misc import dict_search
+
+CRITERIA = DEFAULT_CONFIG["genetics"]["criteria"]
+
+RESULTS = [
+    {"pass": {"id": 4, "name": "created org"}},
+    {"fail": {"HTTPError": "422 Client Error", "errors": ["Name has already been taken"]}},
+    {"fail": {"HTTPError": "404 Client Error: Not Found"}},
+    {"fail": {"TypeError": "create() missing 1 required positional argument"}},
+    {"fail": {"BadValueError": {"nested": {500: "Internal"}}}},
+    "Unhandled Exception",
+    None,
+]
+
+
+def _slow_score(result):
+    return sum(points for crit, points in CRITERIA.items() if dict_search(crit, result))
+
+
+def test_positive_matches_dict_search():
+    """The compiled matcher scores every result exactly like dict_search does"""
+    matcher = criteria.CriteriaMatcher(CRITERIA)
+    for result in RESULTS:
+        assert matcher.score(result) == _slow_score(result)
+
+
+def test_positive_no_match_across_pieces():
+    """A criterion can't match across a key and its value"""
+    matcher = criteria.CriteriaMatcher({"ab": 1})
+    assert matcher.score({"a": "b"}) == 0
+    assert matcher.score({"xab": "c"}) == 1
+    assert matcher.matches({"c": {"d": ["ab"]}}) == ["ab"]
+
+
+def test_positive_score_many():
+    """Batch scoring matches one-at-a-time scoring, including repeated results"""
+    matcher = criteria.CriteriaMatcher(CRITERIA)
+    batch = RESULTS + RESULTS[:3]
+    assert matcher.score_many(batch) == [matcher.score(result) for result in batch]
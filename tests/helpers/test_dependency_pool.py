@@ -0,0 +1,179 @@
+"""Tests for rizza.helpers.dependency_pool."""
+
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import itertools
+import threading
+from types import SimpleNamespace
+
+from rizza.helpers.dependency_pool import (
+    DependencyPool,
+    current_depth,
+    get_dependency_pool,
+    nested,
+    recursion,
+    recursion_allowed,
+    stale_ids,
+    tracking_leases,
+)
+
+
+def _factory():
+    """Return a factory that hands out increasing IDs, counting its calls."""
+    counter = itertools.count(1)
+
+    def factory():
+        factory.calls += 1
+        return next(counter)
+
+    factory.calls = 0
+    return factory
+
+
+def test_positive_acquire_creates_one_batch():
+    """Leases after the first refill reuse the batch instead of creating more"""
+    pool = DependencyPool(size=10, batch=3, ttl=600)
+    factory = _factory()
+    leased = [pool.acquire("Organization", factory) for _ in range(100)]
+    assert factory.calls == 3
+    assert set(leased) == {1, 2, 3}
+    assert pool.leased == 100
+
+
+def test_positive_expired_ids_are_replaced():
+    """IDs past their TTL are dropped and a new batch is created"""
+    pool = DependencyPool(size=10, batch=2, ttl=0)
+    factory = _factory()
+    assert pool.acquire("Organization", factory) == 1
+    assert pool.acquire("Organization", factory) == 3
+    assert factory.calls == 4
+
+
+def test_positive_exclusive_lease_removes_id():
+    """An exclusive lease takes the ID out of the pool"""
+    pool = DependencyPool(size=10, batch=2, ttl=600)
+    factory = _factory()
+    value = pool.acquire("Organization", factory, exclusive=True)
+    assert value not in pool.ids("Organization")
+    assert len(pool.ids("Organization")) == 1
+
+
+def test_positive_harvest():
+    """IDs from passing create results are pooled without calling the factory"""
+    pool = DependencyPool(size=2, batch=3, ttl=600)
+    factory = _factory()
+    assert pool.harvest("Organization", {"id": 41, "name": "org"})
+    assert pool.harvest("Organization", {"id": 42})
+    assert not pool.harvest("Organization", {"id": 43})
+    assert not pool.harvest("Organization", {"name": "no id"})
+    assert pool.acquire("Organization", factory) in (41, 42)
+    assert factory.calls == 0
+
+
+def test_negative_failed_creation():
+    """A factory that can't create the entity yields -1 and pools nothing"""
+    pool = DependencyPool(size=10, batch=3, ttl=600)
+    assert pool.acquire("Organization", lambda: -1) == -1
+    assert pool.ids("Organization") == []
+
+
+def test_positive_invalidate():
+    """Invalidated IDs are no longer leased"""
+    pool = DependencyPool(size=10, batch=2, ttl=600)
+    factory = _factory()
+    pool.acquire("Organization", factory)
+    pool.invalidate("Organization", 1)
+    assert pool.ids("Organization") == [2]
+
+
+def test_positive_stale_ids():
+    """Only leased IDs a not-found failure mentions are reported stale"""
+    pool = DependencyPool(size=10, batch=2, ttl=600)
+    factory = _factory()
+    with tracking_leases() as leases:
+        pool.acquire("Organization", factory)
+        pool.acquire("Location", factory)
+    assert leases == [("Organization", 1), ("Location", 3)]
+    not_found = {"fail": {"HTTPError": "404 Client Error: Not Found for url: /organizations/1"}}
+    assert stale_ids(not_found, leases) == [("Organization", 1)]
+    assert stale_ids({"fail": {"HTTPError": "422 Client Error: organization 1"}}, leases) == []
+    assert stale_ids({"pass": {"id": 1}}, leases) == []
+
+
+def test_positive_get_dependency_pool():
+    """The pool is shared through the config and can be disabled"""
+    genetics = SimpleNamespace(dependency_pool=True, dependency_pool_batch=5)
+    conf = SimpleNamespace(rizza=SimpleNamespace(genetics=genetics))
+    pool = get_dependency_pool(conf)
+    assert pool.batch == 5
+    assert get_dependency_pool(conf) is pool
+    genetics.dependency_pool = False
+    assert get_dependency_pool(conf) is None
+
+
+def test_positive_get_dependency_pool_shared():
+    """Threads asking for the pool at once all get the same one"""
+    conf = SimpleNamespace(rizza=SimpleNamespace(genetics=SimpleNamespace()))
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        pools = list(executor.map(lambda _: get_dependency_pool(conf), range(16)))
+    assert all(pool is pools[0] for pool in pools)
+
+
+def test_positive_factory_runs_outside_lock():
+    """Leases aren't blocked by a slow refill, and concurrent refills wait for it"""
+    pool = DependencyPool(size=10, batch=1, ttl=600)
+    started, release = threading.Event(), threading.Event()
+    factory = _factory()
+
+    def slow_factory():
+        started.set()
+        release.wait(5)
+        return factory()
+
+    pool.harvest("Location", {"id": 7})
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        first = executor.submit(pool.acquire, "Organization", slow_factory)
+        assert started.wait(5)
+        waiting = executor.submit(pool.acquire, "Organization", slow_factory)
+        # Other entities and the pool's bookkeeping stay usable during the refill
+        assert pool.acquire("Location", factory) == 7
+        assert pool.ids("Organization") == []
+        assert not waiting.done()
+        release.set()
+        assert first.result(5) == waiting.result(5) == 1
+    assert factory.calls == 1
+
+
+def test_negative_factory_needing_own_entity():
+    """A factory that leases its own entity type gets -1 instead of deadlocking"""
+    pool = DependencyPool(size=10, batch=1, ttl=600)
+    nested = []
+
+    def factory():
+        nested.append(pool.acquire("Organization", lambda: 99))
+        return 5
+
+    assert pool.acquire("Organization", factory) == 5
+    assert nested == [-1]
+
+
+def test_positive_nested_depth_is_per_context():
+    """Each thread counts its own depth, and a failed creation still unwinds it"""
+    with nested("unknown") as depth:
+        assert depth == 1
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            assert executor.submit(current_depth, "unknown").result() == 0
+        with contextlib.suppress(RuntimeError), nested("unknown"):
+            raise RuntimeError("creation failed")
+        assert current_depth("unknown") == 1
+        assert current_depth("known") == 0
+    assert current_depth("unknown") == 0
+
+
+def test_positive_recursion_stays_disabled():
+    """An inner recursion block can't turn recursion back on"""
+    with recursion(False):
+        with recursion(True):
+            assert not recursion_allowed()
+        assert not recursion_allowed()
+    assert recursion_allowed()
@@ -0,0 +1,75 @@
+"""Tests for rizza.helpers.events."""
+
+import gzip
+import json
+from types import SimpleNamespace
+
+from rizza.helpers import events
+
+
+def _read(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_positive_emit_and_flush(tmp_path):
+    """Emitted events are written as compact JSON lines once flushed"""
+    event_log = events.EventLog(tmp_path / "events.jsonl", batch_size=3, flush_interval=60)
+    for index in range(5):
+        event_log.emit({"type": "evaluation", "points": index, "path": tmp_path})
+    event_log.flush()
+    written = _read(tmp_path / "events.jsonl")
+    assert [event["points"] for event in written] == list(range(5))
+    assert written[0]["path"] == str(tmp_path)
+    assert '", "' not in (tmp_path / "events.jsonl").read_text()
+    event_log.close()
+    assert event_log.written == 5
+
+
+def test_positive_drop_when_full(tmp_path):
+    """A full queue drops new events instead of blocking the caller"""
+    event_log = events.EventLog(tmp_path / "events.jsonl", max_queue=2)
+    event_log.close()
+    event_log._thread = SimpleNamespace(is_alive=lambda: False)
+    for index in range(5):
+        event_log.emit({"points": index})
+    assert event_log.dropped == 3
+
+
+def test_positive_rotate(tmp_path):
+    """Past the rotation size the file is gzipped aside and a new one started"""
+    event_log = events.EventLog(tmp_path / "events.jsonl", batch_size=1, rotate_bytes=50)
+    for index in range(3):
+        event_log.emit({"type": "evaluation", "points": index, "padding": "x" * 40})
+    event_log.close()
+    rotated = sorted(tmp_path.glob("events.*.jsonl.gz"))
+    assert len(rotated) == 3
+    points = []
+    for path in rotated:
+        with gzip.open(path, "rt") as rotated_file:
+            points.extend(json.loads(line)["points"] for line in rotated_file)
+    assert sorted(points) == [0, 1, 2]
+    assert (tmp_path / "events.jsonl").read_text() == ""
+
+
+def test_negative_rotate_fails(tmp_path, monkeypatch):
+    """A failed rotation keeps the events and goes on writing to the current file"""
+
+    def fail(*args, **kwargs):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(events.shutil, "copyfileobj", fail)
+    event_log = events.EventLog(tmp_path / "events.jsonl", batch_size=1, rotate_bytes=50)
+    for index in range(3):
+        event_log.emit({"type": "evaluation", "points": index, "padding": "x" * 40})
+    event_log.close()
+    assert not list(tmp_path.glob("events.*.jsonl.gz"))
+    lines = (tmp_path / "events.jsonl").read_text().splitlines()
+    assert [json.loads(line)["points"] for line in lines] == [0, 1, 2]
+    assert event_log.written == 3
+
+
+def test_negative_disabled():
+    """With events disabled, no EventLog is created"""
+    config = SimpleNamespace(rizza=SimpleNamespace(genetics=SimpleNamespace(events=False)))
+    assert events.get_event_log(config) is None
+    events.flush(config)
@@ -0,0 +1,51 @@
+"""Tests for rizza.helpers.executors."""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from rizza.helpers import executors
+
+
+def test_positive_runtime_concurrency():
+    """The runtime's default executor really runs max_workers calls at once."""
+    workers = 8
+    barrier = threading.Barrier(workers, timeout=5)
+
+    async def _all_at_once(loop):
+        await asyncio.gather(*(loop.run_in_executor(None, barrier.wait) for _ in range(workers)))
+
+    with executors.async_runtime(max_workers=workers) as runtime:
+        runtime.run(_all_at_once(runtime.loop))
+
+
+def test_positive_runtime_shared_through_config():
+    """Nested callers reuse the outer runtime; only the owner closes it."""
+    config = SimpleNamespace()
+    with executors.async_runtime(config, max_workers=2) as outer:
+        with executors.async_runtime(config, max_workers=50) as inner:
+            assert inner is outer
+        assert config._runtime is outer
+        assert not outer.loop.is_closed()
+    assert config._runtime is None
+    assert outer.loop.is_closed()
+
+
+def test_positive_runtime_run_from_worker_threads():
+    """Coroutines can be submitted from any thread, e.g. nested dependency searches."""
+
+    async def _value(value):
+        await asyncio.sleep(0)
+        return value
+
+    with executors.async_runtime(max_workers=4) as runtime:
+        results = []
+        threads = [
+            threading.Thread(target=lambda i=i: results.append(runtime.run(_value(i))))
+            for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert sorted(results) == [0, 1, 2, 3]
@@ -270,3 +270,47 @@ def test_variable_length_gene_floor():
         test_org.mutate(available_genes=["p1"])
         assert len(test_org.genes[0]) >= 1
         assert len(test_org.genes[1]) >= 1
+
+
+def test_positive_steady_state_reach_goal():
+    """Breed and replace one organism at a time until the population improves"""
+    test_pop = genetics.Population(gene_base=BASE_GENOME, population_count=10)
+    for org in test_pop.population:
+        org.points = grade_single_list(org.genes)
+    initial_points = min(org.points for org in test_pop.population)
+    for _ in range(DEFAULT_GEN_COUNT * 10):
+        child = test_pop.breed_offspring()
+        child.points = grade_single_list(child.genes)
+        test_pop.replace_worst(child)
+        assert len(test_pop.population) == test_pop.population_count
+    assert min(org.points for org in test_pop.population) < initial_points
+
+
+def test_positive_replace_worst():
+    """replace_worst fills an empty population, then only swaps out the worst member"""
+    test_pop = genetics.Population(gene_base=BASE_GENOME, population_count=3)
+    test_pop.population = []
+    for points in (5, 1, 9):
+        assert test_pop.replace_worst(genetics.Organism(genes=BASE_GENOME[:], points=points))
+    assert not test_pop.replace_worst(genetics.Organism(genes=BASE_GENOME[:], points=10))
+    assert test_pop.replace_worst(genetics.Organism(genes=BASE_GENOME[:], points=2))
+    assert sorted(org.points for org in test_pop.population) == [1, 2, 5]
+
+
+def test_positive_migrate():
+    """Each island's best organisms replace the worst of the next island in the ring"""
+    islands = []
+    for offset in (0, 10, 20):
+        island = genetics.Population(
+            gene_base=BASE_GENOME, population_count=4, rev_pop_sort=True
+        )
+        for points, organism in enumerate(island.population):
+            organism.points = offset + points
+        islands.append(island)
+    genetics.migrate(islands, count=2)
+    assert [org.points for org in islands[0].population] == [23, 22, 3, 2]
+    assert [org.points for org in islands[1].population] == [13, 12, 3, 2]
+    assert [org.points for org in islands[2].population] == [23, 22, 13, 12]
+    # Migrants are copies, not shared organisms
+    assert islands[0].population[0] is not islands[2].population[0]
+    assert all(len(island.population) == 4 for island in islands)
@@ -0,0 +1,60 @@
+"""Tests for rizza.helpers.genome."""
+
+import pytest
+
+from rizza.helpers import genetics
+from rizza.helpers.genome import NAMES, Genome
+
+
+def test_positive_order_independent():
+    """Genes that only differ in pair order give equal genomes with equal hashes"""
+    first = Genome.from_genes([["name", "label"], ["gen_alpha", "gen_utf8"]])
+    second = Genome.from_genes([["label", "name"], ["gen_utf8", "gen_alpha"]])
+    assert first == second
+    assert hash(first) == hash(second)
+    assert len({first: 1, second: 2}) == 1
+
+
+def test_positive_dedupe_keeps_first():
+    """Repeated params keep their first input, like _genes_to_task always has"""
+    genome = Genome.from_genes([["name", "name", "label"], ["gen_alpha", "gen_html", "gen_utf8"]])
+    assert len(genome) == 2
+    assert genome.arg_dict() == {"name": "gen_alpha", "label": "gen_utf8"}
+    assert genome == Genome.from_arg_dict({"label": "gen_utf8", "name": "gen_alpha"})
+
+
+def test_positive_copy_on_write():
+    """Operators return new genomes and leave the original untouched"""
+    genome = Genome.from_arg_dict({"name": "gen_alpha"})
+    grown = genome.with_pair("label", "gen_utf8")
+    changed = grown.with_pair("name", "gen_html")
+    assert "label" not in genome
+    assert grown.arg_dict() == {"name": "gen_alpha", "label": "gen_utf8"}
+    assert changed.arg_dict() == {"name": "gen_html", "label": "gen_utf8"}
+    assert changed.without("label") == Genome.from_arg_dict({"name": "gen_html"})
+    with pytest.raises(AttributeError):
+        genome.pairs = ()
+
+
+def test_positive_round_trip():
+    """to_genes rebuilds equivalent [param_names, param_inputs] lists"""
+    genome = Genome.from_genes([["b", "a"], ["y", "x"]])
+    genes = genome.to_genes()
+    assert sorted(zip(*genes, strict=True)) == [("a", "x"), ("b", "y")]
+    assert Genome.from_genes(genes) == genome
+    assert NAMES.value(NAMES.code("a")) == "a"
+
+
+def test_positive_organism_genome_cache():
+    """An organism's genome is cached until its genes are replaced or mutated"""
+    org = genetics.Organism(genes=[["a", "b"], ["x", "y"]])
+    genome = org.genome
+    assert org.genome is genome
+    clone = org.copy()
+    assert clone.genome is genome
+    assert clone.genes == org.genes
+    assert clone.genes[0] is not org.genes[0]
+    org.genes = [["a"], ["x"]]
+    assert org.genome == Genome.from_arg_dict({"a": "x"})
+    clone.mutate(available_genes=["a", "b", "c"])
+    assert clone.genome == Genome.from_genes(clone.genes)
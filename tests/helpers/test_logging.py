@@ -0,0 +1,89 @@
+"""Tests for rizza.helpers.logging."""
+
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import threading
+import time
+
+import pytest
+
+from rizza.helpers import executors, logging as rizza_logging
+from rizza.helpers.logging import (
+    flush_logs,
+    log_file,
+    log_to,
+    setup_logging,
+    setup_worker_logging,
+    worker_queue,
+)
+
+logger = logging.getLogger("rizza.tests")
+
+
+def _log_from_worker(message):
+    logger.warning(message)
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = tmp_path / "rizza.log"
+    setup_logging(console_level="critical", file_level="info", log_path=path)
+    yield path
+    setup_logging()
+
+
+def test_positive_route_by_context(log_path, tmp_path):
+    """Records go to the log_to() file of the block they're logged in"""
+    logger.info("default before")
+    with log_to(tmp_path / "Organization create positive.log"):
+        logger.info("organization %s", "record")
+        with executors.ContextThreadPoolExecutor(max_workers=2) as pool:
+            pool.submit(logger.info, "from a pool thread").result()
+        thread = threading.Thread(target=logger.info, args=("from a plain thread",))
+        thread.start()
+        thread.join()
+    logger.debug("below the file level")
+    flush_logs()
+    assert log_file() == log_path
+    default = log_path.read_text()
+    routed = (tmp_path / "Organization create positive.log").read_text()
+    assert "default before" in default
+    assert "from a plain thread" in default
+    assert "below the file level" not in default
+    assert "organization record" in routed
+    assert "from a pool thread" in routed
+    assert "default before" not in routed
+
+
+def test_positive_write_off_the_calling_thread(log_path, monkeypatch):
+    """Log calls only enqueue; the listener thread formats and writes the record"""
+    file_handler = rizza_logging._file_handler
+    writers = []
+    emit = file_handler.emit
+
+    def record_writer(record):
+        writers.append(threading.current_thread())
+        emit(record)
+
+    monkeypatch.setattr(file_handler, "emit", record_writer)
+    logger.warning("queued %d", 1)
+    flush_logs()
+    assert writers
+    assert threading.current_thread() not in writers
+    assert "queued 1" in log_path.read_text()
+
+
+def test_positive_process_worker_records(log_path):
+    """Records logged in a process-pool worker reach the parent's log file"""
+    with ProcessPoolExecutor(
+        max_workers=1,
+        initializer=setup_worker_logging,
+        initargs=(worker_queue(), logging.INFO),
+    ) as pool:
+        pool.submit(_log_from_worker, "from a worker process").result()
+    # Worker records cross a process queue and a forwarding thread before the listener
+    deadline = time.monotonic() + 5
+    while "from a worker process" not in log_path.read_text() and time.monotonic() < deadline:
+        flush_logs()
+        time.sleep(0.05)
+    assert "from a worker process" in log_path.read_text()
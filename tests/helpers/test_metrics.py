@@ -0,0 +1,111 @@
+"""Tests for rizza.helpers.metrics."""
+
+import json
+import os
+import signal
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from rizza.helpers import metrics
+
+
+def test_positive_histogram_percentiles():
+    """Percentiles stay within 1% of the exact values across a wide range"""
+    histogram = metrics.Histogram()
+    values = [index / 1000 for index in range(1, 10001)]
+    for value in values:
+        histogram.record(value)
+    assert histogram.count == len(values)
+    for fraction in metrics.PERCENTILES:
+        exact = values[round(len(values) * fraction) - 1]
+        assert histogram.percentile(fraction) == pytest.approx(exact, rel=0.01)
+    assert histogram.percentile(1.0) == histogram.max == 10.0
+
+
+def test_positive_histogram_merge():
+    """Merging histograms matches recording everything into one"""
+    first, second, both = metrics.Histogram(), metrics.Histogram(), metrics.Histogram()
+    for index in range(100):
+        (first if index % 2 else second).record(index / 100)
+        both.record(index / 100)
+    first.merge(second)
+    assert first.summary() == both.summary()
+
+
+def test_positive_outcome():
+    """Results are filed under pass, an HTTP status or the error's name"""
+    assert metrics.outcome({"pass": {"id": 1}}) == "pass"
+    assert metrics.outcome({"fail": {"HTTPError": "422 Client Error: Unprocessable"}}) == "422"
+    assert metrics.outcome({"fail": {"TypeError": ["bad args"]}}) == "TypeError"
+    assert metrics.outcome("Unhandled Exception") == "error"
+
+
+def test_positive_timer_and_report():
+    """Timed blocks, counters and in-flight tracking all show up in the report"""
+    now = [0.0]
+    recorder = metrics.Metrics(clock=lambda: now[0])
+    with recorder.tracking(), recorder.timer("call", "Organization", "create") as timing:
+        now[0] += 0.5
+        assert recorder.in_flight == 1
+        timing.status = "pass"
+
+    def failed_call():
+        with recorder.timer("call", "Organization", "create"):
+            now[0] += 0.25
+            raise ValueError("call failed")
+
+    with pytest.raises(ValueError, match="call failed"):
+        failed_call()
+    recorder.count("evaluations", 4)
+    recorder.count("cache_hits")
+    recorder.count("cache_misses", 3)
+    now[0] = 2.0
+
+    report = recorder.report()
+    assert report["evaluations_per_second"] == 2.0
+    assert report["cache"]["hit_rate"] == 0.25
+    assert report["in_flight"] == {"current": 0, "peak": 1}
+    statuses = {row["status"]: row for row in report["latency"]}
+    assert statuses["pass"]["count"] == 1
+    assert statuses["pass"]["p50"] == pytest.approx(0.5, rel=0.01)
+    assert statuses["ValueError"]["count"] == 1
+
+    text = recorder.to_openmetrics()
+    assert text.endswith("# EOF\n")
+    assert (
+        'rizza_latency_seconds_bucket{stage="call",entity="Organization",method="create",'
+        'status="pass",le="+Inf"} 1'
+    ) in text
+    assert "rizza_evaluations_total 4" in text
+
+
+def test_positive_write_report(tmp_path):
+    """write_report writes JSON and OpenMetrics files next to the other run data"""
+    config = SimpleNamespace(base_dir=tmp_path)
+    assert metrics.write_report(config) is None
+    metrics.get_metrics(config).observe("evaluation", "Host", "create", "pass", 0.1)
+    path = metrics.write_report(config)
+    assert json.loads(path.read_text())["latency"][0]["entity"] == "Host"
+    assert (tmp_path / "data" / "metrics.prom").read_text().endswith("# EOF\n")
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="SIGUSR1 isn't available")
+def test_positive_report_on_signal_while_locked(tmp_path):
+    """SIGUSR1 arriving while the metrics lock is held writes the report without deadlock"""
+    config = SimpleNamespace(base_dir=tmp_path)
+    recorder = metrics.get_metrics(config)
+    recorder.count("evaluations")
+    previous = signal.getsignal(signal.SIGUSR1)
+    metrics.report_on_signal(config)
+    try:
+        with recorder._lock:
+            os.kill(os.getpid(), signal.SIGUSR1)
+        report = tmp_path / "data" / "metrics.json"
+        deadline = time.monotonic() + 5
+        while not report.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert report.exists()
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
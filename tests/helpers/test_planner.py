@@ -0,0 +1,77 @@
+"""Tests for rizza.helpers.planner."""
+
+from types import SimpleNamespace
+
+from rizza.helpers import planner
+
+ANNOTATIONS = {
+    "Organization": {"__init__": {"name": {"type": "str"}}},
+    "Location": {"__init__": {"organization_ids": {"type": "list"}}},
+    "Host": {
+        "__init__": {"location_id": {"type": "int"}},
+        "create": {"owner": {"type": "int", "entity": "User"}},
+    },
+    "User": {"create": {"default_organization_id": {"type": "int"}}},
+}
+
+
+def _index(annotations=ANNOTATIONS):
+    return SimpleNamespace(
+        entity_names=lambda: list(annotations),
+        annotations=lambda entity, method: annotations[entity].get(method),
+    )
+
+
+def test_positive_entity_from_param_name():
+    """Parameter names ending in _id or _ids map to known entities"""
+    known = {"organization": "Organization"}
+    assert planner.entity_from_param_name("organization_id", known) == "Organization"
+    assert planner.entity_from_param_name("Organization_IDS", known) == "Organization"
+    assert planner.entity_from_param_name("organization", known) is None
+    assert planner.entity_from_param_name("location_id", known) is None
+
+
+def test_positive_dependency_graph():
+    """Annotated entity references and *_id parameter names both count"""
+    graph = planner.dependency_graph(_index(), ANNOTATIONS)
+    assert graph == {
+        "Organization": set(),
+        "Location": {"Organization"},
+        "Host": {"Location", "User"},
+        "User": set(),
+    }
+    assert planner.dependencies_of(graph) == {"Organization", "Location", "User"}
+
+
+def test_positive_dependency_graph_subset():
+    """Dependencies on entities that aren't being tested are dropped"""
+    graph = planner.dependency_graph(_index(), ["Location", "Host"])
+    assert graph == {"Location": set(), "Host": {"Location"}}
+
+
+def test_positive_plan_levels():
+    """Every entity is planned after its dependencies"""
+    levels = planner.plan_levels(planner.dependency_graph(_index(), ANNOTATIONS))
+    assert levels == [["Organization", "User"], ["Location"], ["Host"]]
+
+
+def test_negative_plan_levels_cycle():
+    """A cycle shares one level, between what it depends on and what depends on it"""
+    graph = {"A": {"B"}, "B": {"A", "C"}, "C": set(), "D": {"A"}, "E": {"D"}, "F": set()}
+    assert planner.plan_levels(graph) == [["C", "F"], ["A", "B"], ["D"], ["E"]]
+    assert planner.plan_levels({"A": {"B"}, "B": {"A"}, "C": set()}) == [["A", "B", "C"]]
+
+
+def test_positive_strongly_connected():
+    """Cycles come out as one component each, dependencies first"""
+    graph = {"A": {"B"}, "B": {"C"}, "C": {"A"}, "D": {"C", "E"}, "E": {"D"}, "F": {"G"}}
+    components = planner.strongly_connected(graph)
+    assert sorted(map(sorted, components)) == [["A", "B", "C"], ["D", "E"], ["F"]]
+    assert components.index({"A", "B", "C"}) < components.index({"D", "E"})
+
+
+def test_positive_method_levels():
+    """Create comes first, destructive methods last and the rest in between"""
+    methods = ["update", "delete", "create", "list", "read"]
+    assert planner.method_levels(methods) == [["create"], ["list", "read", "update"], ["delete"]]
+    assert planner.method_levels(["list", "read"]) == [["list", "read"]]
@@ -0,0 +1,85 @@
+"""Tests for rizza.helpers.profiling."""
+
+import marshal
+import threading
+
+from rizza.helpers import profiling
+
+
+def _fib(number):
+    return number if number < 2 else _fib(number - 1) + _fib(number - 2)
+
+
+def _work():
+    return sum(_fib(12) for _ in range(5))
+
+
+def test_positive_counted():
+    """Counted functions add their calls and time to the shared counters"""
+    wrapped = profiling.counted("test_work")(_work)
+    before = profiling.call_counts().get("test_work", {"calls": 0})["calls"]
+    assert wrapped() == _work()
+    wrapped()
+    counts = profiling.call_counts()["test_work"]
+    assert counts["calls"] == before + 2
+    assert counts["seconds"] > 0
+
+
+def test_positive_sections(tmp_path):
+    """Sections are profiled separately, combined, and nested sections fold into the outer"""
+    profiler = profiling.Profiler(directory=tmp_path, keep=1)
+    for index in range(3):
+        with profiler.section(f"gen {index}"), profiler.section("nested"):
+            _work()
+    assert [name for _, name, _, _ in profiler._sections] == ["gen 0", "gen 1", "gen 2"]
+    assert any("_fib" in name for name, *_ in profiler.hot_functions())
+
+    directory = profiler.write()
+    assert len(list(directory.glob("0000* gen *.pstats"))) == 1
+    stats = marshal.loads(directory.joinpath("combined.pstats").read_bytes())
+    assert any(func[2] == "_fib" for func in stats)
+    assert len(directory.joinpath("sections.tsv").read_text().splitlines()) == 4
+    stacks = directory.joinpath("combined.collapsed").read_text().splitlines()
+    assert any(
+        "_work" in line and line.split(";")[-1].startswith("test_profiling.py") for line in stacks
+    )
+    assert "_fib" in profiler.summary()
+
+
+def test_positive_sections_one_thread_at_a_time(tmp_path):
+    """A section started while another thread's section runs is skipped, not an error"""
+    profiler = profiling.Profiler(directory=tmp_path, keep=0)
+    started, finish = threading.Event(), threading.Event()
+
+    def hold_section():
+        with profiler.section("held"):
+            started.set()
+            finish.wait(5)
+
+    thread = threading.Thread(target=hold_section)
+    thread.start()
+    started.wait(5)
+    with profiler.section("skipped"):
+        _work()
+    finish.set()
+    thread.join()
+    with profiler.section("after"):
+        _work()
+    assert [name for _, name, _, _ in profiler._sections] == ["held", "after"]
+    assert profiler.skipped == 1
+
+
+def test_positive_collapse():
+    """Collapsed stacks split a shared callee's time between its callers"""
+    root, left, right, leaf = (("f.py", line, name) for line, name in enumerate("abcd"))
+    stats = {
+        root: (1, 1, 1.0, 10.0, {}),
+        left: (1, 1, 1.0, 5.0, {root: (1, 1, 1.0, 5.0)}),
+        right: (1, 1, 1.0, 4.0, {root: (1, 1, 1.0, 4.0)}),
+        leaf: (2, 2, 7.0, 7.0, {left: (1, 1, 4.0, 4.0), right: (1, 1, 3.0, 3.0)}),
+    }
+    stacks = profiling.collapse(stats)
+    assert stacks["f.py:0(a)"] == 1_000_000
+    assert stacks["f.py:0(a);f.py:1(b);f.py:3(d)"] == 4_000_000
+    assert stacks["f.py:0(a);f.py:2(c);f.py:3(d)"] == 3_000_000
+    assert sum(stacks.values()) == 10_000_000
@@ -0,0 +1,92 @@
+"""Tests for rizza.helpers.result_cache."""
+
+from concurrent.futures import ThreadPoolExecutor
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from rizza.entity_tester import EntityTestTask
+from rizza.helpers import result_cache
+
+RESULT = {"fail": {"HTTPError": {"response": {"error": "Name can't be blank"}}}}
+
+
+def _task(**arg_dict):
+    return EntityTestTask(entity="Organization", method="create", arg_dict=arg_dict)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = result_cache.ResultCache(path=tmp_path / "results.db", apix_hash="abc")
+    yield cache
+    cache.close()
+
+
+def test_positive_round_trip(cache):
+    """A stored result comes back unchanged, regardless of arg order."""
+    cache.put(_task(name="gen_alpha", label="gen_uuid"), RESULT)
+    assert cache.get(_task(label="gen_uuid", name="gen_alpha")) == RESULT
+    assert cache.hits == 1
+
+
+def test_negative_different_genotype_or_hash(cache, tmp_path):
+    """Different args or a different apix hash miss the cache."""
+    cache.put(_task(name="gen_alpha"), RESULT)
+    assert cache.get(_task(name="gen_utf8")) is None
+    other = result_cache.ResultCache(path=tmp_path / "results.db", apix_hash="def")
+    assert other.get(_task(name="gen_alpha")) is None
+    other.close()
+
+
+def test_negative_non_dict_not_cached(cache):
+    """Non-dict results such as 'Unhandled Exception' are never stored."""
+    cache.put(_task(name="gen_alpha"), "Unhandled Exception")
+    assert len(cache) == 0
+
+
+def test_positive_ttl_eviction(tmp_path):
+    """Expired entries are neither returned nor kept."""
+    cache = result_cache.ResultCache(path=tmp_path / "results.db", ttl=0.01)
+    cache.put(_task(name="gen_alpha"), RESULT)
+    time.sleep(0.02)
+    assert cache.get(_task(name="gen_alpha")) is None
+    cache.evict()
+    assert len(cache) == 0
+    cache.close()
+
+
+def test_positive_size_eviction(tmp_path):
+    """Least recently used entries are evicted beyond max_entries."""
+    cache = result_cache.ResultCache(path=tmp_path / "results.db", max_entries=2)
+    for name in ("a", "b", "c"):
+        cache.put(_task(name=name), RESULT)
+        time.sleep(0.001)
+    cache.get(_task(name="a"))
+    cache.evict()
+    assert len(cache) == 2
+    assert cache.get(_task(name="b")) is None
+    assert cache.get(_task(name="a")) == RESULT
+    cache.close()
+
+
+def test_positive_entries_round_trip(tmp_path, cache):
+    """Entries exported from one cache can be stored in another."""
+    cache.put(_task(name="gen_alpha"), RESULT)
+    entries = cache.entries()
+    assert len(entries) == 1
+    other = result_cache.ResultCache(path=tmp_path / "other.db", apix_hash="abc")
+    for entry in entries:
+        other.put_entry(entry)
+    assert other.get(_task(name="gen_alpha")) == RESULT
+    assert not cache.entries(since=entries[0]["created"] + 1)
+    other.close()
+
+
+def test_positive_get_result_cache_shared(tmp_path):
+    """Threads asking for the cache at once all get the same one"""
+    config = SimpleNamespace(base_dir=tmp_path, rizza=SimpleNamespace(genetics=SimpleNamespace()))
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        caches = list(pool.map(lambda _: result_cache.get_result_cache(config), range(16)))
+    assert all(cache is caches[0] for cache in caches)
+    caches[0].close()
@@ -0,0 +1,82 @@
+"""Tests for rizza.helpers.storage."""
+
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+from rizza.helpers import storage
+
+TASK = {"entity": "Organization", "method": "create", "arg_dict": {"name": "gen_alpha"}}
+
+
+@pytest.fixture(params=["sqlite", "yaml"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        store = storage.SQLiteStore(tmp_path / "tests.db")
+        yield store
+        store.close()
+    else:
+        yield storage.YAMLStore(tmp_path / "genetic_tests")
+
+
+def test_positive_put_get(store):
+    """A saved test is returned by a point lookup."""
+    store.put("Organization", "create", "positive", TASK)
+    assert store.get("Organization", "create", "positive") == TASK
+    assert store.get("Organization", "create", "negative") is None
+    assert store.entities() == ["Organization"]
+
+
+def test_positive_upsert(store):
+    """Saving the same test again replaces it."""
+    store.put("Organization", "create", "positive", TASK)
+    updated = {**TASK, "arg_dict": {"name": "gen_utf8"}}
+    store.put("Organization", "create", "positive", updated)
+    assert store.tests("Organization") == {("create", "positive"): updated}
+
+
+def test_positive_delete(store):
+    """Deleted tests are gone, and the entity drops out once empty."""
+    store.put("Organization", "create", "positive", TASK)
+    store.delete("Organization", "create", "positive")
+    assert store.get("Organization", "create", "positive") is None
+    assert store.entities() == []
+
+
+def test_positive_concurrent_writers(store):
+    """Writers on many threads don't lose each other's tests."""
+    methods = [f"method{i}" for i in range(20)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda m: store.put("Host", m, "positive", TASK), methods))
+    assert len(store.tests("Host")) == len(methods)
+
+
+def test_positive_yaml_import_export(tmp_path):
+    """Tests round-trip between the YAML layout and SQLite."""
+    yaml_dir = tmp_path / "genetic_tests"
+    yaml_dir.mkdir()
+    (yaml_dir / "Organization.yaml").write_text(yaml.dump({"Organization create positive": TASK}))
+    store = storage.SQLiteStore(tmp_path / "tests.db")
+    assert store.import_yaml(yaml_dir) == 1
+    assert store.get("Organization", "create", "positive") == TASK
+    assert store.export_yaml(tmp_path / "exported") == 1
+    exported = yaml.safe_load((tmp_path / "exported" / "Organization.yaml").read_text())
+    assert exported == {"Organization create positive": TASK}
+    store.close()
+
+
+def test_negative_abstract_store():
+    """The store interface can't be used without a backend"""
+    with pytest.raises(TypeError, match="abstract"):
+        storage.GeneticTestStore()
+
+
+def test_positive_get_test_store_shared(tmp_path):
+    """Threads asking for the store at once all get the same one"""
+    config = SimpleNamespace(base_dir=tmp_path, rizza=SimpleNamespace(test_store="sqlite"))
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        stores = list(pool.map(lambda _: storage.get_test_store(config), range(16)))
+    assert all(store is stores[0] for store in stores)
+    stores[0].close()
@@ -0,0 +1,42 @@
+"""Tests for rizza.helpers.surrogate."""
+
+from rizza.helpers import genetics, surrogate
+from rizza.helpers.genome import Genome
+
+GOOD = Genome.from_arg_dict({"name": "gen_alpha", "label": "gen_alpha"})
+BAD = Genome.from_arg_dict({"name": "gen_html", "label": "gen_utf8"})
+
+
+def test_positive_model_learns():
+    """Repeated observations pull the predictions apart"""
+    model = surrogate.SurrogateModel()
+    assert model.predict(GOOD) == model.predict(BAD) == 0
+    for _ in range(50):
+        model.update(GOOD, 1000)
+        model.update(BAD, -500)
+    assert model.predict(GOOD) > 500
+    assert model.predict(BAD) < 0
+    assert model.observations == 100
+
+
+def test_positive_filter_warmup():
+    """Nothing is skipped before the model has seen warmup results"""
+    sfilter = surrogate.SurrogateFilter(warmup=5)
+    organisms = [genetics.Organism(genes=GOOD.to_genes()) for _ in range(4)]
+    assert sfilter.select(organisms) == organisms
+    assert sfilter.skipped == 0
+
+
+def test_positive_filter_select():
+    """Only the best predicted fraction runs; the rest get predicted points"""
+    sfilter = surrogate.SurrogateFilter(fraction=0.5, exploration=0, warmup=1)
+    for _ in range(50):
+        sfilter.model.update(GOOD, 1000)
+        sfilter.model.update(BAD, -500)
+    good = [genetics.Organism(genes=GOOD.to_genes()) for _ in range(3)]
+    bad = [genetics.Organism(genes=BAD.to_genes()) for _ in range(3)]
+    chosen = sfilter.select(bad + good)
+    assert chosen == good
+    assert all(org.points < 0 for org in bad)
+    assert (sfilter.executed, sfilter.skipped) == (3, 3)
+    assert "skipped 3 of 6" in sfilter.report()
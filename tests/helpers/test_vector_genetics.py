@@ -0,0 +1,120 @@
+"""Tests for rizza.helpers.vector_genetics."""
+
+import pytest
+
+from rizza.helpers import genetics
+
+np = pytest.importorskip("numpy")
+vector_genetics = pytest.importorskip("rizza.helpers.vector_genetics")
+
+BASE_GENOME = list(range(25))
+TWO_LIST_GENOME = [["p1", "p2", "p3", "p4"], ["i1", "i2", "i3", "i4"]]
+
+
+def grade_single_list(submitted):
+    return sum(abs(BASE_GENOME[i] - gene) * (25 - i) for i, gene in enumerate(submitted)) ** 3
+
+
+@pytest.fixture
+def engine():
+    return vector_genetics.VectorEngine(seed=1)
+
+
+def test_positive_encode_decode_round_trip(engine):
+    """Encoding then decoding gives back the same genomes and points"""
+    organisms = [
+        genetics.Organism(genes=[["a", "b", "c"], ["x", "y", "z"]], points=3),
+        genetics.Organism(genes=[["d"], ["u"]], points=-1),
+    ]
+    genes, lengths, points = engine.encode(organisms)
+    assert genes.shape == (2, 2, 3)
+    assert lengths.tolist() == [3, 1]
+    assert points.tolist() == [3, -1]
+    decoded = engine.decode(genes, lengths)
+    assert [org.genes for org in decoded] == [org.genes for org in organisms]
+    # Decoded organisms are re-encoded from the cached block, unless their genes change
+    decoded[1].genes = [["e"], ["v"]]
+    genes, lengths, _ = engine.encode(decoded)
+    assert [org.genes for org in engine.decode(genes, lengths)] == [
+        [["a", "b", "c"], ["x", "y", "z"]],
+        [["e"], ["v"]],
+    ]
+
+
+def test_positive_crossover_preserves_pairing(engine):
+    """Children keep each param paired with the input from the same parent"""
+    parents = [
+        genetics.Organism(genes=[["a", "b", "c"], ["x", "y", "z"]]),
+        genetics.Organism(genes=[["d", "e"], ["u", "v"]]),
+    ]
+    genes, lengths, _ = engine.encode(parents)
+    first, second = np.zeros(500, dtype=int), np.ones(500, dtype=int)
+    for method in ("single_point", "uniform"):
+        engine.crossover_method = method
+        children = engine.decode(
+            *engine.crossover(genes[first], lengths[first], genes[second], lengths[second])
+        )
+        for child in children:
+            assert len(child.genes[0]) == len(child.genes[1]) >= 2
+            for param, value in zip(*child.genes, strict=True):
+                assert (param in "abc") == (value in "xyz")
+
+
+def test_positive_tournament_favors_fittest(engine):
+    """Tournament winners score better than the population average"""
+    points = np.arange(100, dtype=float)
+    assert engine.tournament(points, 1000, tournament_size=3).mean() < 40
+    engine.rev_pop_sort = True
+    assert engine.tournament(points, 1000, tournament_size=3).mean() > 60
+
+
+def test_positive_mutate_uses_type_pools(engine):
+    """Mutated inputs come from the param's type pool, and pairs stay aligned"""
+    type_pools = {"p1": ["t1"], "p2": ["t2"], "p3": ["t3"], "p4": ["t4"], "p5": ["t5"]}
+    organisms = [genetics.Organism(genes=[row[:] for row in TWO_LIST_GENOME]) for _ in range(300)]
+    genes, lengths, _ = engine.encode(organisms)
+    genes, lengths = engine.mutate(
+        genes,
+        lengths,
+        np.ones(len(organisms), dtype=bool),
+        type_pools=type_pools,
+        available_genes=["p1", "p2", "p3", "p4", "p5"],
+    )
+    mutated = engine.decode(genes, lengths)
+    assert {len(org.genes[0]) for org in mutated} >= {3, 4, 5}
+    for org in mutated:
+        assert len(org.genes[0]) == len(org.genes[1]) >= 1
+    inputs = {value for org in mutated for value in org.genes[1]}
+    assert inputs <= {"i1", "i2", "i3", "i4", "t1", "t2", "t3", "t4", "t5"}
+    assert inputs & {"t1", "t2", "t3", "t4", "t5"}
+
+
+def test_positive_vector_population_reach_goal():
+    """A vector-engine population improves like the list engine does"""
+    test_pop = genetics.Population(gene_base=BASE_GENOME, population_count=50, engine="vector")
+    for org in test_pop.population:
+        org.points = grade_single_list(org.genes)
+    test_pop.sort_population()
+    initial_points = test_pop.population[0].points
+    for _ in range(30):
+        test_pop.breed_population()
+        assert len(test_pop.population) == test_pop.population_count
+        for org in test_pop.population:
+            org.points = grade_single_list(org.genes)
+    test_pop.sort_population()
+    assert test_pop.population[0].points < initial_points
+
+
+def test_positive_vector_population_large():
+    """Tens of thousands of nested genomes breed in one pass"""
+    test_pop = genetics.Population(
+        gene_base=TWO_LIST_GENOME, population_count=20000, engine="vector"
+    )
+    for i, org in enumerate(test_pop.population):
+        org.points = i % 997
+    test_pop.breed_population(
+        type_pools={"p1": ["t1", "t2"]}, available_genes=["p1", "p2", "p3", "p4", "p5"]
+    )
+    assert len(test_pop.population) == 20000
+    assert all(len(org.genes[0]) == len(org.genes[1]) for org in test_pop.population)
+    assert test_pop.population[0].points == 0  # an elite keeps its score
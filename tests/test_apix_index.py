@@ -0,0 +1,173 @@
+"""Tests for rizza.apix_index."""
+
+import json
+from types import ModuleType
+from unittest.mock import patch
+
+import pytest
+
+from rizza import apix_index, apix_loader
+from rizza.entity_tester import EntityTester
+
+APIX_SOURCE = """
+class APIConnection:
+    pass
+
+
+class Satellite:
+    def clean_session(self):
+        pass
+
+
+class Organization(Satellite):
+    _api_methods = ["create", "index"]
+
+    def __init__(self, name: str = None, label: "str | None" = None):
+        self.name = name
+
+    def create(self, name: str, location_ids: "list[Location.id] | None" = None):
+        pass
+
+    def index(self, search: "str | None" = None):
+        pass
+
+
+class Location(Satellite):
+    _api_methods = ["create"]
+
+    def create(self, name: str, organization_id: "Organization.id"):
+        pass
+"""
+
+TYPED_SOURCE = """
+import typing
+from typing import Dict, List, Literal, Optional, Union
+
+
+class Satellite:
+    pass
+
+
+class Host(Satellite):
+    _api_methods = ["create"]
+
+    def create(self, name: str, ratio: float = None):
+        pass
+
+
+class Organization(Satellite):
+    _api_methods = ["create"]
+
+    def create(
+        self,
+        ids: list[int],
+        labels: dict[str, int],
+        size: typing.Optional[int],
+        host: Optional[Host],
+        count: int | None,
+        either: Union[int, str],
+        kind: Literal["yum", 1],
+        names: List[str],
+        extra: Dict[str, int],
+        host_ids: list[Host],
+        anything: typing.Any,
+        flag: bool,
+    ):
+        pass
+"""
+
+
+@pytest.fixture
+def apix_module(tmp_path, monkeypatch):
+    """Load a small apix module from disk with the index stored under tmp_path."""
+    source = tmp_path / "apix_generated.py"
+    source.write_text(APIX_SOURCE)
+    monkeypatch.setattr(apix_index, "INDEX_DIR", tmp_path / "index")
+    apix_loader.reset()
+    yield apix_loader.get_apix_module(path=str(source))
+    apix_loader.reset()
+
+
+def test_positive_build_index(apix_module):
+    """The index holds entities, methods, args and parsed annotations."""
+    index = apix_index.get_index()
+    assert set(index.entities()) == {"Organization", "Location"}
+    assert index.entity("Organization") is apix_module.Organization
+    assert index.method_names("Organization") == ["create", "index"]
+    assert index.init_params("Organization") == ["name", "label"]
+    assert index.args("Organization", "create") == ["name", "location_ids"]
+    annotations = index.annotations("Location", "create")
+    assert annotations["organization_id"]["entity"] == "Organization"
+
+
+def test_positive_index_persisted(apix_module, tmp_path):
+    """A saved index is reused by the next load without introspecting again."""
+    index = apix_index.get_index()
+    index_file = tmp_path / "index" / f"{index.apix_hash}.json"
+    assert json.loads(index_file.read_text())["version"] == apix_index.INDEX_VERSION
+    apix_index.reset()
+    with patch("inspect.getmembers", side_effect=AssertionError("re-introspected")):
+        reloaded = apix_index.get_index()
+    assert reloaded.data == index.data
+    assert reloaded.entity("Location") is apix_module.Location
+
+
+def test_positive_entity_tester_reads_index(apix_module):
+    """EntityTester static methods are answered from the index."""
+    org = apix_module.Organization
+    assert list(EntityTester.pull_entities()) == list(apix_index.get_index().entities())
+    assert list(EntityTester.pull_methods(org)) == ["create", "index"]
+    with patch("inspect.signature", side_effect=AssertionError("re-introspected")):
+        assert EntityTester.pull_args(org.create) == ["name", "location_ids"]
+    assert EntityTester.pull_fields(org, method="create")["name"]["type"] == "str"
+
+
+def test_negative_changed_source_rebuilds(apix_module, tmp_path):
+    """Editing the apix file produces a new hash and a fresh index."""
+    first_hash = apix_index.get_index().apix_hash
+    source = tmp_path / "apix_generated.py"
+    source.write_text(APIX_SOURCE + "\n\nclass Host(Satellite):\n    pass\n")
+    apix_loader.reset()
+    apix_loader.get_apix_module(path=str(source))
+    index = apix_index.get_index()
+    assert index.apix_hash != first_hash
+    assert "Host" in index.entities()
+
+
+def test_positive_extract_matches_introspection(apix_module):
+    """Reading the source with ast gives the same index as introspecting the module."""
+    built = apix_index.ApixIndex.build(apix_module, apix_module.Satellite)
+    assert apix_index.extract(APIX_SOURCE) == built.data
+
+
+def test_positive_index_without_import(tmp_path, monkeypatch):
+    """Metadata is read from the source; the module is only imported for its classes."""
+    source = tmp_path / "apix_generated.py"
+    source.write_text("import not_an_installed_module\n" + APIX_SOURCE)
+    monkeypatch.setattr(apix_index, "INDEX_DIR", tmp_path / "index")
+    apix_loader.reset()
+    apix_loader.use_path(str(source))
+    try:
+        index = apix_index.get_index()
+        assert index.entity_names() == ["Location", "Organization"]
+        assert index.method_names("Organization") == ["create", "index"]
+        assert index.args("Location", "create") == ["name", "organization_id"]
+        assert index.fields("Organization")["search"]["required"] is False
+        assert EntityTester.pull_entity_names() == ["Location", "Organization"]
+        assert EntityTester.pull_method_names("Organization") == ["create", "index"]
+        assert EntityTester.pull_method_names("Host") == []
+        assert apix_loader.loaded_module() is None
+        with pytest.raises(ModuleNotFoundError):
+            index.entity("Organization")
+    finally:
+        apix_loader.reset()
+
+
+@pytest.mark.parametrize("header", ["", "from __future__ import annotations\n"])
+def test_positive_extract_matches_real_annotations(header):
+    """The ast-based metadata matches the runtime parse of real annotation objects."""
+    source = header + TYPED_SOURCE
+    module = ModuleType("apix_typed")
+    exec(compile(source, "apix_typed.py", "exec"), module.__dict__)
+    built = apix_index.ApixIndex.build(module, module.Satellite)
+    assert apix_index.extract(source) == built.data
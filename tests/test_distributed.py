@@ -0,0 +1,151 @@
+"""Tests for rizza.distributed."""
+
+import multiprocessing
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from rizza import distributed, genetic_tester
+from rizza.helpers import storage
+
+
+def _runner(job):
+    return {"test": {"entity": job["entity"], "method": job["method"], "arg_dict": {}}}
+
+
+def _work(address):
+    distributed.Worker(address=address, runner=_runner, poll=0.05).run()
+
+
+def _die(address):
+    """Lease one job, then crash without reporting back."""
+
+    def crash(job):
+        os._exit(1)
+
+    distributed.Worker(address=address, runner=crash, poll=0.05).run_one()
+
+
+def _jobs(count, levels=1):
+    return [
+        distributed.Job(id=i, entity=f"Entity{i}", method="create", level=i % levels)
+        for i in range(count)
+    ]
+
+
+def test_positive_worker_processes():
+    """Several local worker processes finish every job, including a crashed worker's"""
+    context = multiprocessing.get_context("fork")
+    with distributed.Coordinator(jobs=_jobs(8, levels=2), lease=1) as coordinator:
+        crashed = context.Process(target=_die, args=(coordinator.address,))
+        crashed.start()
+        crashed.join(10)
+        workers = [context.Process(target=_work, args=(coordinator.address,)) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        assert coordinator.wait(timeout=30)
+        for worker in workers:
+            worker.join(10)
+    assert sorted(coordinator.completed) == list(range(8))
+    assert not coordinator.failed
+    assert coordinator.completed[0]["test"] is True
+
+
+def test_positive_levels_in_order():
+    """The next level's jobs wait until the current level has finished"""
+    coordinator = distributed.Coordinator(jobs=_jobs(2, levels=2))
+    try:
+        first = coordinator.dispatch({"op": "get"})
+        assert first["job"]["id"] == 0
+        assert coordinator.dispatch({"op": "get"}) == {"job": None, "done": False}
+        coordinator.dispatch({"op": "result", "job": 0, "ok": True})
+        assert coordinator.dispatch({"op": "get"})["job"]["id"] == 1
+    finally:
+        coordinator.stop()
+
+
+def test_positive_dependency_tests_sent():
+    """A job carries its dependencies' saved create tests; completed keeps only counts"""
+    jobs = [
+        distributed.Job(id=0, entity="Organization", method="create"),
+        distributed.Job(
+            id=1, entity="Location", method="create", level=1, dependencies=["Organization"]
+        ),
+    ]
+    test = {"entity": "Organization", "method": "create", "arg_dict": {"name": "gen_alpha"}}
+    coordinator = distributed.Coordinator(jobs=jobs)
+    try:
+        assert coordinator.dispatch({"op": "get"})["job"]["tests"] == {}
+        coordinator.dispatch({"op": "result", "job": 0, "ok": True, "test": test, "cache": []})
+        assert coordinator.dispatch({"op": "get"})["job"]["tests"] == {"Organization": test}
+        assert coordinator.completed == {0: {"worker": "a worker", "test": True, "cache": 0}}
+    finally:
+        coordinator.stop()
+
+
+def test_positive_run_job_saves_dependency_tests(tmp_path, monkeypatch):
+    """A worker saves the shipped dependency tests before running its job"""
+    store = storage.SQLiteStore(tmp_path / "genetic_tests.db")
+    conf = SimpleNamespace(
+        _test_store=store,
+        rizza=SimpleNamespace(genetics=SimpleNamespace(result_cache=False)),
+    )
+    test = {"entity": "Organization", "method": "create", "arg_dict": {"name": "gen_alpha"}}
+    seen = []
+
+    class Tester:
+        def __init__(self, **kwargs):
+            pass
+
+        def run(self, mock=False):
+            seen.append(store.get("Organization", "create", "positive"))
+
+    monkeypatch.setattr(genetic_tester, "GeneticEntityTester", Tester)
+    job = {"id": 1, "entity": "Location", "method": "create", "mode": "positive"}
+    distributed.run_job(conf, {**job, "tests": {"Organization": test}}, mock=True)
+    assert seen == [test]
+
+
+def test_negative_failed_job_gives_up():
+    """A job that keeps failing is requeued, then given up on after max_attempts"""
+    coordinator = distributed.Coordinator(jobs=_jobs(1), max_attempts=2, token="s3cret")
+    try:
+        assert "error" in coordinator.dispatch({"op": "get"})
+        for _ in range(2):
+            job = coordinator.dispatch({"op": "get", "token": "s3cret"})["job"]
+            coordinator.dispatch(
+                {"op": "result", "job": job["id"], "ok": False, "token": "s3cret"}
+            )
+        assert [job.id for job in coordinator.failed] == [0]
+        assert coordinator.wait(timeout=1)
+    finally:
+        coordinator.stop()
+
+
+def test_negative_bad_messages():
+    """Wrong tokens and messages that aren't JSON objects are refused"""
+    coordinator = distributed.Coordinator(jobs=_jobs(1), token="s3cret")
+    try:
+        assert "error" in coordinator.dispatch({"op": "get", "token": "s3cre"})
+        assert "error" in coordinator.dispatch({"op": "get", "token": 1})
+        assert "error" in coordinator.dispatch(["op", "get"])
+        assert "error" in coordinator.dispatch("get")
+        assert coordinator.dispatch({"op": "get", "token": "s3cret"})["job"]
+    finally:
+        coordinator.stop()
+
+
+def test_negative_public_bind_without_token():
+    """Only a loopback coordinator may run without a token"""
+    with pytest.raises(ValueError, match="Set a token"):
+        distributed.Coordinator(jobs=_jobs(1), host="0.0.0.0")
+    assert distributed.is_loopback("localhost")
+    assert distributed.is_loopback("::1")
+    assert not distributed.is_loopback("10.0.0.1")
+
+
+def test_negative_worker_stops_when_done():
+    """A worker with nothing to do returns right away"""
+    with distributed.Coordinator(jobs=[]) as coordinator:
+        assert distributed.Worker(address=coordinator.address, runner=_runner).run() == 0
@@ -205,3 +205,11 @@ def test_entity_test_task_mock_execute():
     assert result["entity"] == "Organization"
     assert result["method"] == "create"
     assert "arg_dict" in result
+
+
+def test_entity_test_task_execute_without_module():
+    """Execute reports why the apix module couldn't be loaded, not a missing entity."""
+    task = EntityTestTask(entity="Organization", method="create", arg_dict={})
+    with patch("rizza.apix_index.get_index", side_effect=FileNotFoundError("library not found")):
+        result = task.execute()
+    assert result == {"fail": {"ApixLoadError": "library not found"}}
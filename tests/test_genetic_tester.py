@@ -1,11 +1,23 @@
 """Tests for rizza.genetic_tester."""
+import asyncio
+import json
 from pathlib import Path
 import tempfile
+from types import SimpleNamespace
 
 import pytest
 
-from rizza import genetic_tester
-from rizza.helpers import config
+from rizza import entity_tester, genetic_tester
+from rizza.helpers import (
+    checkpoint,
+    config,
+    constraints,
+    dependency_pool,
+    events,
+    genetics,
+    profiling,
+)
+from rizza.helpers.genome import Genome
 
 _EXAMPLE_DIR = Path(__file__).parent.parent / "config"
 RECURSE_LIMIT = 1337
@@ -66,3 +78,338 @@ def test_positive_mock_judge(conf):
     """Make sure that the mock judge function return an integer"""
     gen_test = genetic_tester.GeneticEntityTester(conf, "Organization", "create")
     assert isinstance(gen_test._judge(mock=True), int)
+
+
+def test_positive_mock_run_process_executor(conf):
+    """Run a mock async genetic test with organisms evaluated in worker processes"""
+    gen_test = genetic_tester.AsyncGeneticEntityTester(
+        conf,
+        "Organization",
+        "create",
+        population_count=10,
+        max_generations=2,
+        max_running=4,
+        executor="process",
+    )
+    gen_test.run(mock=True)
+    assert gen_test._process_pool is None
+    assert len(gen_test._population.population) == gen_test.population_count
+
+
+def test_positive_mock_run_surrogate(conf):
+    """Run a mock genetic test that lets the surrogate model skip evaluations"""
+    conf.rizza.genetics.surrogate = True
+    conf.rizza.genetics.surrogate_warmup = 10
+    try:
+        gen_test = genetic_tester.GeneticEntityTester(
+            conf, "Organization", "create", population_count=10, max_generations=5
+        )
+        gen_test.run(mock=True)
+    finally:
+        conf.rizza.genetics.surrogate = False
+    assert gen_test._surrogate.skipped > 0
+    assert gen_test._surrogate.executed + gen_test._surrogate.skipped == 50
+
+
+def test_positive_gene_base_constraints(conf):
+    """Generated genes always satisfy the learned constraints"""
+    gen_test = genetic_tester.GeneticEntityTester(conf, "Organization", "create")
+    gen_test._available_params = ["name", "label", "description"]
+    gen_test._type_pools = {"label": ["gen_alpha"]}
+    gen_test._constraints = constraints.Constraints(
+        required={"name"}, forbidden_params={"description"}
+    )
+    for _ in range(20):
+        params = gen_test._create_gene_base()[0]
+        assert "name" in params
+        assert "description" not in params
+
+
+def test_negative_seek_bad_ignores_constraints(conf, monkeypatch, tmp_path):
+    """Negative runs don't repair genes with the learned constraints"""
+    store = constraints.ConstraintStore(path=tmp_path / "constraints.json")
+    store._constraints["Organization create"] = constraints.Constraints(
+        required={"name"}, forbidden_params={"description"}
+    )
+    monkeypatch.setattr(conf, "_constraint_store", store, raising=False)
+    positive = genetic_tester.GeneticEntityTester(conf, "Organization", "create")
+    assert positive._constraints is store.get("Organization", "create")
+    negative = genetic_tester.GeneticEntityTester(conf, "Organization", "create", seek_bad=True)
+    assert negative._constraints is None
+    negative._available_params = ["description"]
+    negative._type_pools = {"description": ["gen_alpha"]}
+    assert negative._create_gene_base() == [["description"], ["gen_alpha"]]
+
+
+def test_positive_resume_from_checkpoint(conf, monkeypatch, tmp_path):
+    """An interrupted run checkpoints its generation and a resumed run continues from it"""
+    ckpt = checkpoint.Checkpoint(tmp_path / "run.ckpt")
+    breed = genetics.Population.breed_population
+    calls = []
+
+    def interrupt_third(self, **kwargs):
+        calls.append(1)
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        breed(self, **kwargs)
+
+    monkeypatch.setattr(genetics.Population, "breed_population", interrupt_third)
+    gen_test = genetic_tester.GeneticEntityTester(
+        conf, "Organization", "create", population_count=5, max_generations=6
+    )
+    gen_test._checkpoint = ckpt
+    with pytest.raises(KeyboardInterrupt):
+        gen_test.run(mock=True)
+    assert ckpt.load()["generation"] == 2
+
+    monkeypatch.setattr(genetics.Population, "breed_population", breed)
+    resumed = genetic_tester.GeneticEntityTester(
+        conf, "Organization", "create", population_count=5, max_generations=6, resume=True
+    )
+    resumed._checkpoint = ckpt
+    population = genetics.Population(gene_base=[[[], []]], population_count=1)
+    assert resumed._load_checkpoint(population) == 2
+    assert len(population.population) == 5
+    resumed.run(mock=True)
+    assert not ckpt.path.exists()
+
+
+def test_positive_resume_results_from_result_cache(conf, monkeypatch, tmp_path):
+    """A resumed run gets checkpointed organisms' raw results back from the result cache"""
+    kept, lost = (Genome.from_arg_dict({"name": name}) for name in ("gen_alpha", "gen_utf8"))
+    state = checkpoint.capture(
+        "Organization create positive",
+        3,
+        genetics.Population(gene_base=[[["name"], ["gen_alpha"]]], population_count=1),
+        {kept: ({"pass": {"id": 1}}, 500), lost: ({"fail": {}}, -200)},
+    )
+    ckpt = checkpoint.Checkpoint(tmp_path / "run.ckpt")
+    ckpt.save(state)
+
+    class Cache:
+        def get(self, task):
+            return {"pass": {"id": 1}} if task.arg_dict == {"name": "gen_alpha"} else None
+
+    monkeypatch.setattr(genetic_tester.result_cache, "get_result_cache", lambda _: Cache())
+    resumed = genetic_tester.GeneticEntityTester(conf, "Organization", "create", resume=True)
+    resumed._checkpoint = ckpt
+    population = genetics.Population(gene_base=[[[], []]], population_count=1)
+    assert resumed._load_checkpoint(population) == 3
+    assert resumed._fitness_cache == {kept: ({"pass": {"id": 1}}, 500)}
+
+
+def test_positive_mock_run_islands(conf, monkeypatch):
+    """An island run splits the population and migrates between its islands"""
+    migrations = []
+    migrate = genetics.migrate
+    monkeypatch.setattr(
+        genetics,
+        "migrate",
+        lambda islands, count: migrations.append(len(islands)) or migrate(islands, count),
+    )
+    gen_test = genetic_tester.GeneticEntityTester(
+        conf, "Organization", "create", population_count=9, max_generations=10, islands=3
+    )
+    assert gen_test.islands == 3
+    gen_test.run(mock=True)
+    assert migrations == [3, 3]
+
+
+def test_positive_mock_run_profiled(conf):
+    """With a profiler attached, each generation is profiled as its own section"""
+    profiler = profiling.start(conf, "test")
+    try:
+        genetic_tester.GeneticEntityTester(
+            conf, "Organization", "create", population_count=4, max_generations=3
+        ).run(mock=True)
+    finally:
+        assert profiling.finish(conf) is profiler
+    assert [name for _, name, _, _ in profiler._sections] == [
+        f"Organization create positive gen {generation}" for generation in range(3)
+    ]
+    assert profiler.directory.joinpath("combined.collapsed").exists()
+
+
+def test_positive_mock_run_events(conf, tmp_path):
+    """Every judged organism is written to the event log"""
+    previous = getattr(conf, "_event_log", None)
+    conf._event_log = events.EventLog(tmp_path / "events.jsonl")
+    try:
+        genetic_tester.GeneticEntityTester(
+            conf, "Organization", "create", population_count=4, max_generations=2
+        ).run(mock=True)
+        conf._event_log.close()
+    finally:
+        conf._event_log = previous
+    written = [json.loads(line) for line in (tmp_path / "events.jsonl").read_text().splitlines()]
+    assert written
+    assert {event["generation"] for event in written} <= {0, 1}
+    assert all(event["entity"] == "Organization" for event in written)
+    assert all(event["status"] in {"pass", "fail", "skipped"} for event in written)
+    assert all(isinstance(event["genotype"], dict) for event in written)
+
+
+def test_positive_mock_run_steady_state(conf):
+    """Run a mock async genetic test that replaces organisms as they finish"""
+    gen_test = genetic_tester.AsyncGeneticEntityTester(
+        conf,
+        "Organization",
+        "create",
+        population_count=10,
+        max_generations=3,
+        max_running=4,
+        steady_state=True,
+    )
+    gen_test.run(mock=True)
+    assert len(gen_test._population.population) == gen_test.population_count
+
+
+def test_positive_drop_overloaded_organism(conf, monkeypatch):
+    """An organism still overloaded after its retries is dropped rather than scored"""
+    gen_test = genetic_tester.AsyncGeneticEntityTester(
+        conf, "Organization", "create", population_count=4, max_running=2
+    )
+    overloaded = {"fail": {"HTTPError": "503 Server Error: Service Unavailable for url"}}
+
+    async def execute(task, mock=False, info=None):
+        return overloaded
+
+    monkeypatch.setattr(gen_test, "_execute_task_async", execute)
+    organism = genetics.Organism(genes=[["name"], ["alpha"]])
+    result, dropped = asyncio.run(gen_test._evaluate(organism))
+    assert result is None
+    assert dropped is organism
+    assert organism.points == 0
+
+
+def test_positive_drop_overloaded_organism_sync(conf, monkeypatch):
+    """The sync evaluation drops overloaded organisms without scoring or caching them"""
+    gen_test = genetic_tester.GeneticEntityTester(conf, "Organization", "create")
+    overloaded = {"fail": {"HTTPError": "503 Server Error: Service Unavailable for url"}}
+    monkeypatch.setattr(gen_test, "_execute_task", lambda task, mock=False, info=None: overloaded)
+    population = genetics.Population(gene_base=[[[], []]], population_count=1)
+    population.population = [genetics.Organism(genes=[["name"], ["gen_alpha"]])]
+    progress = SimpleNamespace(advance=lambda task: None)
+    assert gen_test._evaluate_population(population, progress, None) is None
+    assert population.population == []
+    assert gen_test._fitness_cache == {}
+
+
+def test_negative_overload_not_cached(conf, monkeypatch):
+    """Overloaded results aren't stored in the result cache, sync or async"""
+    overloaded = {"fail": {"ReadTimeout": ["Read timed out."]}}
+    stored = []
+    cache = SimpleNamespace(get=lambda task: None, put=lambda task, result: stored.append(result))
+    monkeypatch.setattr(genetic_tester.result_cache, "get_result_cache", lambda config: cache)
+    monkeypatch.setattr(
+        entity_tester.EntityTestTask, "execute", lambda self, mock=False: overloaded
+    )
+    gen_test = genetic_tester.AsyncGeneticEntityTester(
+        conf, "Organization", "create", population_count=4, max_running=2
+    )
+    gen_test._control.retries = 0
+
+    async def dispatch(task, mock=False):
+        return task.execute(mock)
+
+    monkeypatch.setattr(gen_test, "_dispatch", dispatch)
+    task = gen_test._genes_to_task([["name"], ["alpha"]])
+    assert gen_test._execute_task(task) == overloaded
+    assert asyncio.run(gen_test._execute_task_async(task)) == overloaded
+    assert stored == []
+
+
+def test_negative_missing_dependency_invalidated(conf, monkeypatch):
+    """A leased dependency ID the server can't find is dropped from the pool"""
+    pool = dependency_pool.DependencyPool(size=10, batch=2, ttl=600)
+    monkeypatch.setattr(conf, "_dependency_pool", pool, raising=False)
+    ids = iter(range(41, 50))
+    missing = {"fail": {"error": {"message": "Resource organization not found by id '41'"}}}
+
+    def execute(self, mock=False):
+        pool.acquire("Organization", lambda: next(ids))
+        return missing
+
+    monkeypatch.setattr(entity_tester.EntityTestTask, "execute", execute)
+    gen_test = genetic_tester.GeneticEntityTester(conf, "Organization", "create")
+    task = gen_test._genes_to_task([["organization_id"], ["genetic_known"]])
+    assert gen_test._run_task(task) == missing
+    assert pool.ids("Organization") == [42]
+
+
+def test_positive_run_best_leaves_config_alone(conf, monkeypatch):
+    """Replaying a saved test turns recursion off for the replay only, not in the config"""
+    genetics_cfg = conf.rizza.genetics
+    before = (genetics_cfg.allow_recursion, genetics_cfg.max_generations)
+    seen = []
+
+    def execute(self, mock=False):
+        seen.append(
+            (
+                dependency_pool.recursion_allowed(),
+                genetics_cfg.allow_recursion,
+                genetics_cfg.max_generations,
+            )
+        )
+        return {"pass": {"id": 5}}
+
+    monkeypatch.setattr(entity_tester.EntityTestTask, "execute", execute)
+    gen_test = genetic_tester.GeneticEntityTester(conf, "Organization", "create")
+    monkeypatch.setattr(gen_test, "_load_test", lambda: [["name"], ["gen_alpha"]])
+    assert gen_test.run_best() == 5
+    assert seen == [(False, *before)]
+    assert dependency_pool.recursion_allowed()
+
+
+def test_positive_cache_hits_not_learned(conf, monkeypatch, tmp_path):
+    """Only fresh executions teach the constraint store; replayed cache hits don't"""
+    store = constraints.ConstraintStore(path=tmp_path / "constraints.json", strike_limit=2)
+    monkeypatch.setattr(conf, "_constraint_store", store, raising=False)
+    rejected = {"fail": {"errors": {"name": ["is invalid"]}}}
+    cached = []
+
+    class Cache:
+        def get(self, task):
+            return cached[0] if cached else None
+
+        def put(self, task, result):
+            cached.append(result)
+
+    monkeypatch.setattr(genetic_tester.result_cache, "get_result_cache", lambda _: Cache())
+    monkeypatch.setattr(entity_tester.EntityTestTask, "execute", lambda self, mock=False: rejected)
+    gen_test = genetic_tester.GeneticEntityTester(conf, "Organization", "create")
+    gen_test._available_params = ["name"]
+    task = gen_test._genes_to_task([["name"], ["gen_alpha"]])
+    for _ in range(3):
+        assert gen_test._execute_task(task) == rejected
+    assert store.get("Organization", "create").strikes == {"name=gen_alpha": 1}
+
+
+def test_positive_campaign_order(conf, monkeypatch):
+    """A campaign tests create first and delete last"""
+    ran = []
+    monkeypatch.setattr(
+        entity_tester.EntityTester, "pull_entity_names", staticmethod(lambda: ["Widget"])
+    )
+    monkeypatch.setattr(
+        entity_tester.EntityTester,
+        "pull_method_names",
+        staticmethod(lambda entity: ["delete", "update", "create", "read"]),
+    )
+    monkeypatch.setattr(
+        genetic_tester.GeneticEntityTester, "__attrs_post_init__", lambda self: None
+    )
+    monkeypatch.setattr(
+        genetic_tester.GeneticEntityTester,
+        "run",
+        lambda self: ran.append(self.method) or self.method != "read",
+    )
+    outcomes = genetic_tester.run_campaign(
+        debug=False,
+        async_mode=False,
+        config=conf,
+        entity="Widget",
+        max_running=1,
+    )
+    assert ran == ["create", "read", "update", "delete"]
+    assert outcomes == {"create": True, "read": False, "update": True, "delete": True}
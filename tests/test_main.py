@@ -0,0 +1,101 @@
+"""Tests for rizza.__main__."""
+
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+from click.testing import CliRunner
+import pytest
+
+from rizza import __main__, apix_index, apix_loader
+
+# Modules only the commands that need them should import
+HEAVY_MODULES = (
+    "fauxfactory",
+    "pygments",
+    "pytest",
+    "requests",
+    "rich.progress",
+    "rizza.entity_tester",
+    "rizza.genetic_tester",
+    "rizza.helpers.prune",
+    "yaml",
+)
+APIX_SOURCE = """
+import not_an_installed_module
+
+
+class Satellite:
+    pass
+
+
+class Organization(Satellite):
+    _api_methods = ["create"]
+
+    def create(self, name: str):
+        pass
+
+
+class Location(Satellite):
+    _api_methods = ["create"]
+
+    def create(self, name: str, organization_id: "Organization.id"):
+        pass
+"""
+# Cumulative import time allowed for rizza.__main__, in milliseconds. Timings depend on
+# the machine, so the check only runs when a budget is set.
+IMPORT_BUDGET_MS = os.environ.get("RIZZA_IMPORT_BUDGET_MS")
+
+
+def _python(*args):
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True)
+
+
+def test_positive_lazy_imports():
+    """Importing the CLI doesn't import any command's heavy dependencies"""
+    loaded = _python(
+        "-c",
+        "import sys, rizza.__main__; print(' '.join(sys.modules))",
+    ).stdout.split()
+    assert not [module for module in HEAVY_MODULES if module in loaded]
+
+
+@pytest.mark.skipif(
+    IMPORT_BUDGET_MS is None, reason="Set RIZZA_IMPORT_BUDGET_MS to check the import time"
+)
+def test_positive_import_time():
+    """The CLI imports within the startup budget"""
+    timings = _python("-X", "importtime", "-c", "import rizza.__main__").stderr
+    cumulative = [
+        int(line.split("|")[1])
+        for line in timings.splitlines()
+        if line.rstrip().endswith("| rizza.__main__")
+    ]
+    assert cumulative
+    assert cumulative[0] / 1000 < int(IMPORT_BUDGET_MS)
+
+
+def test_positive_list_without_import(tmp_path, monkeypatch):
+    """rizza list reads the apix file without importing it"""
+    source = tmp_path / "apix_generated.py"
+    source.write_text(APIX_SOURCE)
+    monkeypatch.setattr(apix_index, "INDEX_DIR", tmp_path / "index")
+    monkeypatch.setattr(
+        __main__,
+        "Config",
+        lambda: SimpleNamespace(
+            rizza=SimpleNamespace(apix_lib_path=str(source)),
+            load_cli_args=lambda args: None,
+        ),
+    )
+    apix_loader.reset()
+    try:
+        runner = CliRunner()
+        entities = runner.invoke(__main__.cli, ["list", "entities"])
+        args = runner.invoke(__main__.cli, ["list", "args", "-e", "Location", "-m", "create"])
+        assert apix_loader.loaded_module() is None
+    finally:
+        apix_loader.reset()
+    assert entities.output.split() == ["Location", "Organization"]
+    assert args.output.split() == ["name", "organization_id"]